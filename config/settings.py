@@ -2,7 +2,57 @@ import os
 
 class AppSettings:
     DEFAULT_CONFIG_FILE = "config.json"
-    MAX_SWITCHES = 10
+    PRESET_BANK_DIR = "presets"
+    SETLIST_STATE_FILE = "setlist_state.json"
+    AUTOSAVE_FILE = "autosave.json"
+    AUTOSAVE_DELAY_MS = 1000
+    AUTOSAVE_REPORT_MS = 60000
+    SESSION_STATE_FILE = "session.state"
+    PRESET_LIBRARY_DIR = "presets"
+    PRESET_INDEX_FILE = "preset_index.json"
+    PRESET_SCAN_POLL_MS = 50  # La ventana de la biblioteca revisa si terminó el indexado
+    RECORDING_ENABLED = False  # Grabar todo el tráfico MIDI en RECORDINGS_DIR (diagnóstico / replay)
+    RECORDINGS_DIR = "recordings"
+    RECORDING_MAX_BYTES = 4 * 1024 * 1024
+    RECORDING_MAX_FILES = 8
+    NETWORK_MIDI_PORT = 5004
+    NETWORK_REDUNDANCY = 2
+    NETWORK_JOURNAL_MS = 1000
+    OSC_DEFAULT_PORT = 9000
+    VIRTUAL_OUTPUT_NAME = "Mvave Bridge"
+    VIRTUAL_INPUT_NAME = "Mvave Bridge In"
+    CONTROL_SOCKET = "mvave_bridge.sock"
+    CONTROL_PORT = 5005  # TCP en 127.0.0.1 donde no hay sockets Unix
+    CONTROL_MAX_LINE = 65536  # Bytes de una línea sin terminar; un cliente que lo supera se desconecta
+    LOOP_LAG_PROBE_MS = 250
+    PROFILE_DIR = "profiles"
+    PROFILE_SECONDS = 30
+    RESOURCE_CACHE_FILE = "resources.cache"
+    BANNER_DELAY_MS = 300
+    AUTO_CONNECT = True  # Abrir al iniciar los puertos guardados si están disponibles
+    FEEDBACK_PACE_MS = 2     # Espacio entre escrituras de LED al controlador
+    FEEDBACK_BATCH_MS = 5    # Ventana para agrupar cambios en una sola ráfaga
+    FEEDBACK_DEVICE_ECHOES = False  # El controlador devuelve cada LED escrito como CC de entrada
+    FEEDBACK_DAW_ECHOES = True      # El DAW devuelve cada CC recibido por el puerto de feedback
+    FEEDBACK_ECHO_TTL_MS = 300      # Un eco que no volvió en este tiempo ya no se filtra
+    SCENE_PACE_MS = 1        # Espacio entre los CC de la ráfaga de una escena
+    TRANSFORM_SLOW_US = 200  # Una transformación que tarda más se avisa en consola
+    # Tap tempo y reloj MIDI
+    TAP_HISTORY = 4                # Intervalos promediados
+    TAP_TIMEOUT_MS = 2000          # Una pausa más larga empieza un tap nuevo
+    CLOCK_MIN_BPM = 30
+    CLOCK_MAX_BPM = 300
+    CLOCK_SPIN_US = 0              # Último tramo antes de cada pulso esperado activamente (opcional: gasta CPU)
+    CLOCK_FREE_RUNNING = False     # Pulsos también con el transporte detenido (receptores que siguen el tempo sin Start)
+    CLOCK_REALTIME_PRIORITY = 10   # SCHED_FIFO para el hilo del reloj si el sistema lo permite (0 = no)
+    CLOCK_JITTER_BOUND_US = 1000   # Cota de jitter del reloj; los pulsos que la superan se cuentan
+    CLOCK_JITTER_WINDOW = 4096     # Pulsos recientes para los percentiles de jitter
+    CLOCK_SWITCH_INTERVAL = 0.0005 # sys.setswitchinterval mientras el reloj manda pulsos
+    CONSOLE_MAX_LINES = 1000  # La consola descarta las líneas más viejas
+    IDLE_AFTER_MS = 30000  # Sin MIDI ni interacción: reposo de bajo consumo
+    LONG_PRESS_MS = 600
+    MAX_SWITCHES = 128
+    VISIBLE_SWITCH_ROWS = 8
     DEFAULT_SWITCHES = 4
     CC_OUT_START = 10
-    MAX_PORT_NAME_LENGTH = 30
\ No newline at end of file
+    MAX_PORT_NAME_LENGTH = 30
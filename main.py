@@ -1,5 +1,42 @@
-from ui.main_window import MidiBridgeApp
+import time
+
+STARTED = time.perf_counter()  # Antes de importar customtkinter y el resto de la app
+
+import argparse
+from config.settings import AppSettings
+from utils.startup import StartupTimeline
+from midi.bridge import BridgeCore
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Mvave Chocolate MIDI Bridge")
+    parser.add_argument(
+        "--profile", nargs="?", type=float, const=AppSettings.PROFILE_SECONDS, metavar="SEGUNDOS",
+        help="Perfila todos los hilos durante la ventana indicada y guarda el resultado en profiles/"
+    )
+    parser.add_argument(
+        "--startup-report", nargs="?", type=int, const=AppSettings.NETWORK_MIDI_PORT, metavar="PUERTO_UDP",
+        help="Escucha MIDI de red en el puerto UDP, imprime los hitos del arranque al primer mensaje ruteado y sale"
+    )
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    app = MidiBridgeApp()
-    app.mainloop()
\ No newline at end of file
+    startup = StartupTimeline(STARTED)
+    startup.mark("imports")
+    args = parse_args()
+    profile = None
+    if args.profile:
+        from utils.profiler import ProfileSession
+        profile = ProfileSession(AppSettings.PROFILE_DIR, args.profile)
+        profile.install()  # Antes de crear la ventana para medir todos los callbacks
+
+    # El pedal rutea antes de importar customtkinter y de crear la ventana
+    core = BridgeCore(startup, args.startup_report)
+    from ui.main_window import MidiBridgeApp
+    app = MidiBridgeApp(core)
+    if profile:
+        profile.start(app)
+    app.mainloop()
+    if profile:
+        profile.finish()
\ No newline at end of file
@@ -1,4 +1,7 @@
 from .manager import MidiManager
 from .learning import LearningManager
+from .routing import RoutingTable
+from .engine import RoutingEngine
+from .preset_bank import PresetBank
 
-__all__ = ['MidiManager', 'LearningManager', 'MidiMapper']
\ No newline at end of file
+__all__ = ['MidiManager', 'LearningManager', 'MidiMapper', 'RoutingTable', 'RoutingEngine', 'PresetBank']
@@ -0,0 +1,136 @@
+import functools
+import os
+from config.settings import AppSettings
+from midi.engine import RoutingEngine
+from midi.manager import MidiManager
+from midi.preset_bank import PresetBank
+from midi.preset_loader import load_preset, PresetValidationError
+from midi.recorder import SessionRecorder, DIRECTION_OUT_EXTRA
+from midi.routing import switch_slot
+from midi.scenes import ScenePlayer
+from utils.localization import Localization
+from utils.resources import ResourceBundle
+from utils.session_state import SessionStateFile
+from utils.startup import StartupTimeline
+
+
+class BridgeCore:
+    """Parte del bridge que no necesita la ventana: se arma y empieza a rutear antes de importar customtkinter.
+
+    MidiBridgeApp se construye después sobre este núcleo y toma el manejo de los mensajes con
+    attach(); hasta entonces los CC entrantes solo pasan por el motor.
+    """
+
+    def __init__(self, startup=None, startup_report=None):
+        self.startup = startup or StartupTimeline()
+        self.startup_report = startup_report  # Puerto UDP del benchmark de arranque (o None)
+        self.startup_log = []  # Mensajes para la consola, que todavía no existe
+        self.is_connected = False
+        self.session_routed = False  # Estados de la sesión ya aplicados al motor en el arranque
+        self.routed = False  # Algún mensaje se ruteó antes de que la ventana tomara el control
+        self.message_handler = None
+
+        # Estilos e idiomas ya combinados y parseados (caché única)
+        self.settings = AppSettings()
+        self.resources = ResourceBundle(self.settings.RESOURCE_CACHE_FILE)
+        self.resources.load()
+        self.localization = Localization(self.resources.get("languages"))
+
+        self.midi_manager = MidiManager()
+        self.routing_engine = RoutingEngine(self.midi_manager)
+        # Las ráfagas de escena no vienen de un press: se graban aparte para el replay
+        self.scene_player = ScenePlayer(functools.partial(self.midi_manager.send_cc, direction=DIRECTION_OUT_EXTRA))
+        self.routing_engine.scene_player = self.scene_player
+        self.routing_engine.on_transform_warning = self.on_transform_warning
+        self.preset_bank = PresetBank()
+
+        # Estado de la sesión anterior (se lee antes de que el motor escriba nada)
+        self.session_state = SessionStateFile(self.settings.SESSION_STATE_FILE)
+        self.previous_session = self.session_state.open()
+        if self.previous_session is not None and self.previous_session.torn:
+            # El proceso murió a mitad de una escritura: el snapshot puede mezclar dos estados
+            self.startup_log.append(self.localization.t("session_torn"))
+            self.previous_session = None
+        self.routing_engine.session = self.session_state
+
+        self.preset_bank.load_directory(self.settings.PRESET_BANK_DIR)
+        self.startup_config = self.load_startup_routing(self.previous_session)
+
+        # Grabación binaria de todo el tráfico MIDI para diagnóstico; el encabezado guarda
+        # el preset y los estados ya restaurados, así que arranca antes de abrir los puertos
+        self.recorder = SessionRecorder(
+            self.settings.RECORDINGS_DIR,
+            self.settings.RECORDING_MAX_BYTES,
+            self.settings.RECORDING_MAX_FILES,
+            engine=self.routing_engine
+        )
+        if self.settings.RECORDING_ENABLED and self.recorder.start():
+            self.midi_manager.recorder = self.recorder
+
+        if self.startup_config is not None:
+            self.connect_startup_ports(self.startup_config[1])
+        if self.startup_report:
+            self.midi_manager.open_network_input(self.startup_report, self.on_midi_message)
+        self.startup.mark("routing")
+
+    def attach(self, handler):
+        """La ventana ya está lista: desde ahora recibe todos los mensajes"""
+        self.message_handler = handler
+
+    def on_midi_message(self, msg):
+        handler = self.message_handler
+        if handler is not None:
+            handler(msg)
+        elif msg.type == "control_change" and self.routing_engine.process_cc(msg.control, msg.value):
+            self.routed = True
+            self.startup.mark("first_route")
+
+    def transform_warning_text(self, kind, control_id, source, detail):
+        if kind == "error":
+            return self.localization.format("transform_error", control_id=control_id, source=source, error=detail)
+        return self.localization.format("transform_slow", control_id=control_id, source=source,
+                                        elapsed_us=detail / 1000)
+
+    def on_transform_warning(self, kind, control_id, source, detail):
+        """Aviso de una transformación antes de que exista la consola (hilo MIDI)"""
+        self.startup_log.append(self.transform_warning_text(kind, control_id, source, detail))
+
+    def load_startup_routing(self, snapshot):
+        """Compila la última configuración y restaura los estados de la sesión.
+
+        Devuelve (ruta, config, ms de carga) para aplicarla luego a la UI, o None.
+        """
+        config_path = self.settings.DEFAULT_CONFIG_FILE
+        if os.path.exists(self.settings.AUTOSAVE_FILE):
+            config_path = self.settings.AUTOSAVE_FILE
+        if not os.path.exists(config_path):
+            return None
+        try:
+            config, table, load_ms = load_preset(config_path)
+        except PresetValidationError as e:
+            self.startup_log.append(self.localization.t("error_loading_config"))
+            self.startup_log.extend(f"  {error}" for error in e.errors)
+            return None
+
+        states = None
+        if snapshot is not None and snapshot.preset_index < 0 and snapshot.matches(table.name):
+            states = {
+                control_id: snapshot.switch_states.get(switch_slot(control_id), False)
+                for control_id in table.initial_states
+            }
+        self.routing_engine.swap_table(table, states)
+        self.session_state.set_preset(-1, table.name)
+        self.session_routed = states is not None
+        return config_path, config, load_ms
+
+    def connect_startup_ports(self, config):
+        """Abre los puertos guardados en la configuración si están disponibles"""
+        input_port = config.get("input_port", "")
+        output_port = config.get("output_port", "")
+        if (self.settings.AUTO_CONNECT
+                and input_port in self.midi_manager.get_input_ports_truncated()
+                and output_port in self.midi_manager.get_output_ports_truncated()):
+            if self.midi_manager.connect_ports(input_port, output_port, self.on_midi_message):
+                self.is_connected = True
+            else:
+                self.startup_log.append(self.localization.t("error_connecting_ports"))
@@ -0,0 +1,216 @@
+import collections
+import os
+import sys
+import threading
+import time
+from config.settings import AppSettings
+from midi.metrics import Histogram
+from midi.stats import percentiles
+
+CLOCK = 0xF8
+START = 0xFA
+STOP = 0xFC
+PPQN = 24  # Pulsos de reloj MIDI por negra
+JITTER_BUCKETS_NS = (50_000, 100_000, 250_000, 500_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+
+
+class TapTempo:
+    """BPM a partir de los intervalos entre presses de un switch.
+
+    Promedia los últimos intervalos; una pausa larga o un intervalo muy distinto empiezan de nuevo.
+    """
+
+    def __init__(self, history=None, timeout_ms=None, min_bpm=None, max_bpm=None):
+        self.intervals = collections.deque(maxlen=AppSettings.TAP_HISTORY if history is None else history)
+        self.timeout_ns = (AppSettings.TAP_TIMEOUT_MS if timeout_ms is None else timeout_ms) * 1_000_000
+        self.min_bpm = AppSettings.CLOCK_MIN_BPM if min_bpm is None else min_bpm
+        self.max_bpm = AppSettings.CLOCK_MAX_BPM if max_bpm is None else max_bpm
+        self.last_tap_ns = None
+
+    def tap(self, now_ns=None):
+        """Registra un press. Devuelve el BPM cuando hay al menos un intervalo válido, si no None"""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        last, self.last_tap_ns = self.last_tap_ns, now_ns
+        if last is None or now_ns - last > self.timeout_ns:
+            self.intervals.clear()
+            return None
+        interval = now_ns - last
+        if self.intervals:
+            average = sum(self.intervals) / len(self.intervals)
+            if not 0.5 * average <= interval <= 1.5 * average:
+                self.intervals.clear()  # Cambio de tempo deliberado: no mezclarlo con el anterior
+        self.intervals.append(interval)
+        bpm = 60e9 / (sum(self.intervals) / len(self.intervals))
+        return min(self.max_bpm, max(self.min_bpm, bpm))
+
+
+class MidiClock:
+    """Reloj MIDI de 24 PPQN en un hilo propio con deadlines absolutos.
+
+    Cada pulso se agenda como ancla + n * período, así el error de un pulso no se acumula en los
+    siguientes (sin deriva). Duerme hasta el deadline; con spin_us espera además el último tramo
+    cediendo el GIL (más preciso, a costa de CPU). Si el proceso se atrasa más de un período, se
+    saltean los pulsos perdidos en lugar de mandarlos en ráfaga. Se mide el jitter de cada pulso.
+
+    Solo hay pulsos mientras el transporte está en marcha (o en marcha libre, fuera del reposo): el
+    resto del tiempo el hilo queda bloqueado sin despertares y el intervalo de cambio de hilo vuelve
+    al que tenía el proceso.
+
+    Donde se permite (Linux con CAP_SYS_NICE o rtprio), el hilo pide prioridad de tiempo real:
+    sin ella, con la CPU ocupada, el planificador del sistema puede demorar un pulso varios ms.
+    """
+
+    def __init__(self, send, spin_us=None, jitter_bound_us=None, window=None, free_running=None):
+        self.send = send  # byte de estado -> envía el mensaje de tiempo real
+        self.spin_ns = (AppSettings.CLOCK_SPIN_US if spin_us is None else spin_us) * 1000
+        self.free_running = AppSettings.CLOCK_FREE_RUNNING if free_running is None else free_running
+        self.bound_ns = (AppSettings.CLOCK_JITTER_BOUND_US if jitter_bound_us is None else jitter_bound_us) * 1000
+        self.bpm = None
+        self.playing = False
+        self.idle = False
+        self.transport = None  # START/STOP pendiente: sale justo antes del próximo pulso
+        self.running = False
+        self.thread = None
+        self.realtime = False
+        self.previous_switch_interval = None  # Se restaura al pausar o cerrar el reloj
+        self.wakeup = threading.Event()
+        self.lock = threading.Lock()
+        # Instrumentación
+        self.ticks = 0
+        self.late = 0      # Pulsos con jitter por encima de la cota
+        self.skipped = 0   # Pulsos salteados por un atraso mayor a un período
+        self.max_jitter_ns = 0
+        self.jitter = Histogram(JITTER_BUCKETS_NS)
+        self.recent = collections.deque(maxlen=AppSettings.CLOCK_JITTER_WINDOW if window is None else window)
+
+    def set_bpm(self, bpm):
+        """Cambia el tempo; el cambio entra en el próximo pulso, sin cortar la secuencia"""
+        with self.lock:
+            self.bpm = float(bpm)
+            if not self.running:
+                self._start_thread()
+        self.wakeup.set()
+
+    def start(self):
+        """Envía Start con el próximo pulso (el receptor cuenta desde ahí el primer tiempo)"""
+        if self.bpm is not None:
+            self.playing = True
+            self.transport = START
+            self.wakeup.set()
+
+    def stop(self):
+        if self.playing:
+            self.playing = False
+            self.transport = STOP
+            self.wakeup.set()
+
+    def set_idle(self, idle):
+        """En reposo se pausa la marcha libre; un transporte en marcha sigue (el receptor está tocando)"""
+        self.idle = idle
+        self.wakeup.set()
+
+    def toggle_transport(self):
+        if self.playing:
+            self.stop()
+        else:
+            self.start()
+        return self.playing
+
+    def _start_thread(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, name="midi-clock", daemon=True)
+        self.thread.start()
+
+    def _raise_priority(self):
+        priority = AppSettings.CLOCK_REALTIME_PRIORITY
+        if not priority or not hasattr(os, "sched_setscheduler"):
+            return False
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))  # 0 = este hilo
+            return True
+        except OSError:
+            return False
+
+    def _fast_switching(self, enabled):
+        # Con el intervalo por defecto (5 ms) un hilo que despierta puede esperar el GIL
+        # todo ese tiempo mientras la UI trabaja; más corto acota el jitter, pero solo hace falta con pulsos
+        if enabled and self.previous_switch_interval is None:
+            if sys.getswitchinterval() > AppSettings.CLOCK_SWITCH_INTERVAL:
+                self.previous_switch_interval = sys.getswitchinterval()
+                sys.setswitchinterval(AppSettings.CLOCK_SWITCH_INTERVAL)
+        elif not enabled and self.previous_switch_interval is not None:
+            sys.setswitchinterval(self.previous_switch_interval)
+            self.previous_switch_interval = None
+
+    def ticking(self):
+        """Hay que mandar pulsos: transporte en marcha, Start/Stop pendiente o marcha libre fuera del reposo"""
+        if self.bpm is None:
+            return False
+        return self.playing or self.transport is not None or (self.free_running and not self.idle)
+
+    def _wait_until(self, target):
+        remaining = target - time.perf_counter_ns()
+        if remaining > self.spin_ns:
+            time.sleep((remaining - self.spin_ns) / 1e9)
+        while time.perf_counter_ns() < target:
+            time.sleep(0)  # Cede el GIL al hilo MIDI mientras espera
+
+    def _loop(self):
+        self.realtime = self._raise_priority()
+        bpm = None
+        anchor = 0
+        index = 0
+        period = 0.0
+        while self.running:
+            if not self.ticking():
+                self._fast_switching(False)
+                self.wakeup.wait()
+                self.wakeup.clear()
+                bpm = None  # Al reanudar se reancla en el momento actual
+                continue
+            self._fast_switching(True)
+            if self.bpm != bpm:
+                bpm = self.bpm
+                # Reancla en el próximo pulso con el período nuevo
+                now = time.perf_counter_ns()
+                anchor = max(now, anchor + round(index * period)) if period else now
+                index = 0
+                period = 60e9 / (bpm * PPQN)
+            target = anchor + round(index * period)
+            self._wait_until(target)
+            if not self.running:
+                break
+            now = time.perf_counter_ns()
+            lateness = now - target
+            if lateness > period:
+                missed = int(lateness // period) + 1  # Hasta el primer deadline que sigue en el futuro
+                self.skipped += missed
+                index += missed
+                continue
+            transport = self.transport
+            if transport is not None:
+                self.transport = None
+                self.send(transport)
+            self.send(CLOCK)
+            self.ticks += 1
+            self.jitter.observe(lateness)
+            self.recent.append(lateness)
+            if lateness > self.max_jitter_ns:
+                self.max_jitter_ns = lateness
+            if lateness > self.bound_ns:
+                self.late += 1
+            index += 1
+
+    def jitter_summary(self):
+        """Percentiles del jitter de los últimos pulsos, en µs"""
+        samples = list(self.recent)
+        if not samples:
+            return {}
+        return {key: value / 1000 for key, value in percentiles(samples).items()}
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        self._fast_switching(False)
@@ -0,0 +1,86 @@
+import argparse
+import threading
+import time
+from config.settings import AppSettings
+from midi.clock import MidiClock, CLOCK
+from midi.loadgen import FakeBackend, build_schedule, passthrough_table, run
+from midi.stats import percentiles
+
+
+def gui_load(stop, busy_ms, pause_ms):
+    """Imita callbacks de la UI: trabajo en Python que retiene el GIL, con pausas entre frames"""
+    while not stop.is_set():
+        end = time.perf_counter() + busy_ms / 1000
+        while time.perf_counter() < end:
+            sum(range(1000))
+        time.sleep(pause_ms / 1000)
+
+
+def measure(bpm, duration, load, routing_rate, spin_us=None):
+    """Corre el reloj contra una salida que solo cuenta, con o sin carga. Devuelve (reloj, pulsos, latencias de ruteo)"""
+    ticks = []
+    clock = MidiClock(lambda status: ticks.append(time.perf_counter_ns()) if status == CLOCK else None, spin_us=spin_us)
+    stop = threading.Event()
+    loaders = []
+    if load:
+        loaders.append(threading.Thread(target=gui_load, args=(stop, 12, 4), daemon=True))
+    for thread in loaders:
+        thread.start()
+    backend = None
+    clock.set_bpm(bpm)
+    clock.start()
+    if routing_rate:
+        # Tráfico en el camino caliente del ruteo en paralelo con el reloj
+        backend = FakeBackend(passthrough_table())
+        run(build_schedule("taps", routing_rate / 2, duration), backend)
+    else:
+        time.sleep(duration)
+    clock.close()
+    stop.set()
+    for thread in loaders:
+        thread.join()
+    latencies = []
+    if backend is not None:
+        backend.close()
+        latencies = backend.latencies_ns
+    return clock, ticks, latencies
+
+
+def tempo_drift_ppm(ticks, bpm):
+    """Desvío del tempo medio respecto del pedido, en partes por millón"""
+    if len(ticks) < 2:
+        return 0.0
+    period = 60e9 / (bpm * 24)
+    actual = (ticks[-1] - ticks[0]) / (len(ticks) - 1)
+    return (actual - period) / period * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del reloj MIDI: jitter con y sin carga de la UI")
+    parser.add_argument("--bpm", type=float, default=120)
+    parser.add_argument("--duration", type=float, default=10, help="Segundos por corrida")
+    parser.add_argument("--routing-rate", type=float, default=200, help="Mensajes/s por el motor de ruteo (0 = sin tráfico)")
+    parser.add_argument("--spin-us", type=float, default=AppSettings.CLOCK_SPIN_US,
+                        help="Espera activa antes de cada pulso (0 = solo dormir)")
+    parser.add_argument("--bound-us", type=float, default=AppSettings.CLOCK_JITTER_BOUND_US,
+                        help="Cota de jitter p99 que debe cumplirse")
+    args = parser.parse_args()
+
+    failed = False
+    for label, load in (("sin carga", False), ("con carga de UI", True)):
+        clock, ticks, latencies = measure(args.bpm, args.duration, load, args.routing_rate, args.spin_us)
+        summary = clock.jitter_summary()
+        print(f"{label}: {clock.ticks} pulsos, {clock.skipped} salteados, {clock.late} sobre la cota, "
+              f"deriva {tempo_drift_ppm(ticks, args.bpm):+.1f} ppm, "
+              f"{'tiempo real' if clock.realtime else 'prioridad normal'}")
+        print("  jitter " + ", ".join(f"{key} {value:.0f} µs" for key, value in summary.items()))
+        if latencies:
+            print(f"  ruteo p99 {percentiles(latencies)['p99'] / 1000:.0f} µs ({len(latencies)} mensajes)")
+        if summary.get("p99", 0) > args.bound_us:
+            print(f"  FALLA: p99 supera la cota de {args.bound_us:.0f} µs")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
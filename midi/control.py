@@ -0,0 +1,344 @@
+import argparse
+import json
+import os
+import selectors
+import socket
+import threading
+import time
+from config.settings import AppSettings
+from midi.preset_loader import parse_json
+from midi.recorder import DIRECTION_OUT_EXTRA
+from midi.stats import percentiles
+
+
+class ControlError(Exception):
+    pass
+
+
+class ControlApi:
+    """Comandos de control sobre el motor de ruteo.
+
+    Un lote (lista JSON) se valida completo contra una copia de la tabla y los estados;
+    si todo es válido se activa con un único intercambio en el motor, si no, no se aplica nada.
+    Todo el lote corre con el lock del motor: un press del pedal no puede colarse entre la copia
+    de los estados y el intercambio.
+    """
+
+    def __init__(self, engine, bank, midi_manager, on_applied=None):
+        self.engine = engine
+        self.bank = bank
+        self.midi_manager = midi_manager
+        self.on_applied = on_applied  # (tabla, índice de preset o None, ns del intercambio)
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.commands = 0
+        self.batches = 0
+        self.errors = 0
+
+    def handle_line(self, line):
+        """Procesa una línea (comando u array de comandos) y devuelve la respuesta como línea JSON"""
+        try:
+            request = parse_json(line)
+        except ValueError as e:
+            self.errors += 1
+            return self._encode({"ok": False, "error": f"JSON inválido: {e}"})
+        try:
+            if isinstance(request, list):
+                response = self.execute(request)
+            else:
+                response = self.execute([request])[0]
+        except Exception as e:
+            # Un comando que rompe algo no debe tumbar el hilo del servidor
+            self.errors += 1
+            print(f"Error procesando comando de control: {e}")
+            return self._encode({"ok": False, "error": f"error interno: {e}"})
+        return self._encode(response)
+
+    @staticmethod
+    def _encode(response):
+        return json.dumps(response, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+    def execute(self, commands):
+        """Valida y aplica un lote de forma atómica. Devuelve una respuesta por comando"""
+        with self.lock, self.engine.lock:
+            self.batches += 1
+            self.commands += len(commands)
+            table, states = self.engine.active
+            staged_table, staged_states = table, dict(states)
+            preset_index = None
+            changed = {}
+            results = []
+            try:
+                for command in commands:
+                    if not isinstance(command, dict):
+                        raise ControlError("cada comando debe ser un objeto")
+                    name = command.get("cmd")
+                    if name == "load_preset":
+                        preset_index, staged_table = self._find_preset(command)
+                        staged_states = dict(staged_table.initial_states)
+                        changed = {}
+                        results.append({"preset": staged_table.name})
+                    elif name == "set_state":
+                        control_id = command.get("switch")
+                        if not isinstance(control_id, str) or control_id not in staged_states:
+                            raise ControlError(f"switch desconocido: {control_id}")
+                        state = command.get("state")
+                        if not isinstance(state, bool):
+                            raise ControlError("state debe ser true/false")
+                        if staged_states[control_id] != state:
+                            staged_states[control_id] = state
+                            changed[control_id] = state
+                        results.append({"switch": control_id, "state": state})
+                    else:
+                        results.append(self._query(name, staged_table, staged_states))
+            except ControlError as e:
+                self.errors += 1
+                failed = len(results)
+                return [
+                    {"id": self._id(other), "ok": False, "error": str(e) if index == failed else "lote rechazado"}
+                    for index, other in enumerate(commands)
+                ]
+
+            if staged_table is not table or changed:
+                swap_ns = self.engine.swap_table(staged_table, staged_states)
+                routes = {route.control_id: route for route in staged_table.routes.values()}
+                for control_id, state in changed.items():
+                    if control_id in routes:
+                        self.engine.emit(routes[control_id], state, DIRECTION_OUT_EXTRA)
+                if changed and self.midi_manager.osc_output is not None:
+                    self.midi_manager.osc_output.flush()  # Fuera del hilo de escucha nadie más lo vacía
+                if preset_index is not None:
+                    self.bank.index = preset_index
+                if self.on_applied:
+                    self.on_applied(staged_table, preset_index, swap_ns)
+
+        return [
+            {"id": self._id(command), "ok": True, "result": result}
+            for command, result in zip(commands, results)
+        ]
+
+    @staticmethod
+    def _id(command):
+        return command.get("id") if isinstance(command, dict) else None
+
+    def _find_preset(self, command):
+        if "index" in command:
+            index = command["index"]
+        else:
+            index = self.bank.find(command.get("name"))
+        if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < len(self.bank.presets):
+            raise ControlError(f"preset desconocido: {command.get('name', command.get('index'))}")
+        return index, self.bank.presets[index]
+
+    def _query(self, name, table, states):
+        """Comandos de solo lectura (dentro de un lote ven los cambios anteriores del lote)"""
+        if name == "ping":
+            return "pong"
+        if name == "get_state":
+            return {"preset": table.name, "switches": dict(states)}
+        if name == "list_presets":
+            return {"presets": self.bank.names(), "index": self.bank.index}
+        if name == "list_ports":
+            return {
+                "inputs": self.midi_manager.get_input_ports_truncated(),
+                "outputs": self.midi_manager.get_output_ports_truncated(),
+            }
+        if name == "stats":
+            return self.stats()
+        raise ControlError(f"comando desconocido: {name}")
+
+    def stats(self):
+        manager = self.midi_manager
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "connected": bool(manager.is_connected()),
+            "commands": self.commands,
+            "batches": self.batches,
+            "errors": self.errors,
+            "recorded": manager.recorder.records_written if manager.recorder else 0,
+            "osc_sent": manager.osc_output.sent if manager.osc_output else 0,
+            "network_sent": manager.network_output.sent if manager.network_output else 0,
+        }
+
+
+class ControlServer:
+    """Servidor local de control: un solo hilo con selectors atiende a todos los clientes.
+
+    Usa un socket Unix; donde no existe (Windows) escucha en TCP solo en 127.0.0.1.
+    """
+
+    def __init__(self, api, path=None, port=None, max_line=None):
+        self.api = api
+        self.path = path or AppSettings.CONTROL_SOCKET
+        self.port = port or AppSettings.CONTROL_PORT
+        self.max_line = AppSettings.CONTROL_MAX_LINE if max_line is None else max_line
+        self.selector = selectors.DefaultSelector()
+        self.server = None
+        self.clients = {}
+        self.waker = None  # Par de sockets para despertar al select() al detener (sin timeout de sondeo)
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        try:
+            if hasattr(socket, "AF_UNIX"):
+                if os.path.exists(self.path):
+                    os.remove(self.path)  # Socket huérfano de una ejecución anterior
+                self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.server.bind(self.path)
+                os.chmod(self.path, 0o600)
+            else:
+                self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.server.bind(("127.0.0.1", self.port))
+            self.server.listen()
+            self.server.setblocking(False)
+        except OSError as e:
+            print(f"Error iniciando el servidor de control: {e}")
+            return False
+        self.selector.register(self.server, selectors.EVENT_READ)
+        self.waker = socket.socketpair()
+        self.selector.register(self.waker[0], selectors.EVENT_READ)
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.running = False
+        if self.waker:
+            self.waker[1].send(b"\0")
+        if self.thread:
+            self.thread.join(timeout=1)
+        if self.waker:
+            for sock in self.waker:
+                sock.close()
+            self.waker = None
+        for conn in list(self.clients):
+            self._close(conn)
+        if self.server:
+            self.server.close()
+            if self.server.family == getattr(socket, "AF_UNIX", None) and os.path.exists(self.path):
+                os.remove(self.path)
+
+    def _loop(self):
+        while self.running:
+            for key, events in self.selector.select():
+                if key.fileobj is self.waker[0]:
+                    return
+                if key.fileobj is self.server:
+                    self._accept()
+                    continue
+                conn = key.fileobj
+                if events & selectors.EVENT_READ:
+                    self._read(conn)
+                if events & selectors.EVENT_WRITE and conn in self.clients:
+                    self._write(conn)
+
+    def _accept(self):
+        try:
+            conn, _ = self.server.accept()
+        except OSError:
+            return
+        conn.setblocking(False)
+        self.clients[conn] = [b"", b""]  # [entrada pendiente, salida pendiente]
+        self.selector.register(conn, selectors.EVENT_READ)
+
+    def _read(self, conn):
+        try:
+            data = conn.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            data = b""
+        if not data:
+            self._close(conn)
+            return
+        buffers = self.clients[conn]
+        buffers[0] += data
+        *lines, buffers[0] = buffers[0].split(b"\n")
+        for line in lines:
+            if line.strip():
+                buffers[1] += self.api.handle_line(line)
+        if len(buffers[0]) > self.max_line:
+            # Sin salto de línea a la vista: se responde el error y se corta antes de acumular más
+            self.api.errors += 1
+            buffers[1] += ControlApi._encode({"ok": False, "error": f"línea de más de {self.max_line} bytes"})
+            self._write(conn)
+            self._close(conn)
+            return
+        self._write(conn)
+
+    def _write(self, conn):
+        buffers = self.clients[conn]
+        if buffers[1]:
+            try:
+                sent = conn.send(buffers[1])
+                buffers[1] = buffers[1][sent:]
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                self._close(conn)
+                return
+        # Solo se pide EVENT_WRITE mientras quede salida pendiente
+        events = selectors.EVENT_READ | (selectors.EVENT_WRITE if buffers[1] else 0)
+        self.selector.modify(conn, events)
+
+    def _close(self, conn):
+        self.clients.pop(conn, None)
+        try:
+            self.selector.unregister(conn)
+        except (KeyError, ValueError):
+            pass
+        conn.close()
+
+
+class ControlClient:
+    """Cliente simple para scripts y para el benchmark de ida y vuelta"""
+
+    def __init__(self, path=None, port=None):
+        path = path or AppSettings.CONTROL_SOCKET
+        if hasattr(socket, "AF_UNIX"):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.socket.connect(path)
+        else:
+            self.socket = socket.create_connection(("127.0.0.1", port or AppSettings.CONTROL_PORT))
+        self.reader = self.socket.makefile("rb")
+
+    def request(self, payload):
+        self.socket.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        return json.loads(self.reader.readline())
+
+    def close(self):
+        self.reader.close()
+        self.socket.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cliente de la API de control local")
+    parser.add_argument("--socket", help="Ruta del socket (por defecto la de la configuración)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    send_parser = subparsers.add_parser("send", help="Envía un comando o lote JSON")
+    send_parser.add_argument("payload", help='p. ej. \'{"cmd": "get_state"}\'')
+    bench_parser = subparsers.add_parser("bench", help="Mide la latencia de ida y vuelta")
+    bench_parser.add_argument("--count", type=int, default=5000)
+    bench_parser.add_argument("--cmd", default="ping")
+    args = parser.parse_args()
+
+    client = ControlClient(args.socket)
+    try:
+        if args.command == "send":
+            print(json.dumps(client.request(json.loads(args.payload)), ensure_ascii=False, indent=2))
+        else:
+            latencies = []
+            for index in range(args.count):
+                start = time.perf_counter_ns()
+                client.request({"id": index, "cmd": args.cmd})
+                latencies.append(time.perf_counter_ns() - start)
+            stats = ", ".join(f"{key} {value / 1000:.1f} µs" for key, value in percentiles(latencies).items())
+            print(f"{args.count} comandos '{args.cmd}': {stats}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import threading
+import time
+from midi.recorder import DIRECTION_OUT, DIRECTION_OUT_EXTRA
+from midi.routing import RoutingTable, switch_slot
+from midi.scenes import NO_VALUE
+from midi.transforms import TransformStats, print_warning, run_transform
+
+
+class RoutingEngine:
+    """Motor de ruteo que corre en el hilo MIDI sobre una tabla precompilada"""
+
+    def __init__(self, midi_manager):
+        self.midi_manager = midi_manager
+        # (tabla, estados) en una sola referencia para poder intercambiarla atómicamente
+        self.active = (RoutingTable(), {})
+        # Serializa los cambios de estado entre el hilo MIDI, el feedback del DAW y la API de control
+        # (reentrante: un recall de escena o una acción intercambian la tabla dentro de process_cc)
+        self.lock = threading.RLock()
+        self.actions = {}
+        self.last_swap_ns = 0
+        self.session = None
+        self.feedback = None  # FeedbackSync opcional (LEDs del controlador / feedback del DAW)
+        # Escenas: último valor enviado por CC de salida (NO_VALUE = desconocido) y ráfagas espaciadas
+        self.sent_values = bytearray([NO_VALUE]) * 128
+        self.scene_player = None
+        self.on_scene = None  # (escena, switches cambiados, capturada) desde el hilo MIDI
+        self.capture_armed = False
+        self.on_capture = None  # (tabla anterior, tabla con la escena capturada) desde el hilo MIDI
+        self.on_transform_warning = print_warning  # (tipo, control_id, fuente, detalle) desde el hilo MIDI
+        # Contadores para las métricas
+        self.activations = {}
+        self.transform_stats = {}  # control_id -> TransformStats
+        self.swaps = 0
+
+    @property
+    def table(self):
+        return self.active[0]
+
+    @property
+    def states(self):
+        return self.active[1]
+
+    def swap_table(self, table, states=None):
+        """Activa una tabla precompilada con un único intercambio de referencia"""
+        start = time.perf_counter_ns()
+        new_states = dict(table.initial_states if states is None else states)
+        with self.lock:
+            self.active = (table, new_states)
+        self.last_swap_ns = time.perf_counter_ns() - start
+        self.swaps += 1
+        if self.session is not None:
+            self.session.set_switches({switch_slot(cid): state for cid, state in new_states.items()})
+        if self.feedback is not None:
+            self.feedback.mirror(table, new_states)
+        return self.last_swap_ns
+
+    def snapshot_config(self):
+        """Configuración activa con los estados actuales de los switches"""
+        table, states = self.active
+        config = dict(table.config)
+        config["switches"] = {
+            control_id: dict(switch_config, state=states.get(control_id, False))
+            for control_id, switch_config in table.config.get("switches", {}).items()
+        }
+        return config
+
+    def bind_action(self, control, callback):
+        """Asocia un CC de entrada a una acción que se dispara al presionar"""
+        self.bind_handler(control, lambda value: callback() if value > 0 else None)
+
+    def bind_handler(self, control, handler):
+        """Asocia un CC de entrada a un manejador que recibe cada valor (press y release)"""
+        try:
+            self.actions[int(control)] = handler
+        except (TypeError, ValueError):
+            pass  # CC sin asignar
+
+    def unbind_action(self, control):
+        try:
+            self.actions.pop(int(control), None)
+        except (TypeError, ValueError):
+            pass
+
+    def clear_actions(self):
+        self.actions = {}
+
+    def process_cc(self, control, value):
+        """Procesa un CC entrante. Devuelve (route, estado) si un switch cambió"""
+        with self.lock:
+            return self._process_cc(control, value)
+
+    def _process_cc(self, control, value):
+        feedback = self.feedback
+        if feedback is not None and feedback.device_echo.is_echo(control, value):
+            return None  # El controlador devolvió un LED que escribimos nosotros
+
+        session = self.session
+        if session is not None:
+            session.set_cc(control, value)
+
+        action = self.actions.get(control)
+        if action is not None:
+            action(value)
+            return None
+
+        table, states = self.active
+        route = table.routes.get(control)
+        if route is None:
+            scene = table.scenes.get(control)
+            if scene is not None and value > 0:
+                if self.capture_armed:
+                    self.capture_armed = False
+                    self.capture_scene(scene)
+                else:
+                    self.recall_scene(scene)
+            return None
+
+        old_state = states.get(route.control_id, False)
+        transform = route.transform
+        if transform is not None:
+            stats = self.transform_stats.get(route.control_id)
+            if stats is None:
+                stats = self.transform_stats[route.control_id] = TransformStats()
+            value = run_transform(transform, stats, route.control_id, control, value, old_state, states,
+                                  self.on_transform_warning)
+            if value is None:
+                return None
+
+        if route.is_toggle:
+            # TOGGLE: Solo en press (valor > 0)
+            if value <= 0:
+                return None
+            new_state = not old_state
+        else:
+            # MOMENTARY: Seguir valor
+            new_state = value > 0
+
+        if new_state == old_state:
+            return None
+
+        states[route.control_id] = new_state
+        self.activations[route.control_id] = self.activations.get(route.control_id, 0) + 1
+        if session is not None:
+            session.set_switch(route.slot, new_state)
+        self.emit(route, new_state)
+        if feedback is not None:
+            feedback.show(control, 127 if new_state else 0)  # Después del envío principal
+        return route, new_state
+
+    def apply_feedback(self, output_cc, value):
+        """Estado informado por el DAW para un CC de salida. Devuelve (route, estado) si cambió.
+
+        No reenvía nada al DAW; solo actualiza el estado y el LED del controlador.
+        """
+        with self.lock:
+            return self._apply_feedback(output_cc, value)
+
+    def _apply_feedback(self, output_cc, value):
+        feedback = self.feedback
+        if feedback is not None and feedback.daw_echo.is_echo(output_cc, value):
+            return None  # Eco de lo que enviamos al DAW
+        table, states = self.active
+        entry = table.outputs.get(output_cc)
+        if entry is None:
+            return None
+        input_cc, route = entry
+        new_state = value > 0
+        if states.get(route.control_id, False) == new_state:
+            return None
+        states[route.control_id] = new_state
+        if self.session is not None:
+            self.session.set_switch(route.slot, new_state)
+        if feedback is not None:
+            feedback.show(input_cc, 127 if new_state else 0)
+        return route, new_state
+
+    def arm_capture(self):
+        """El próximo press de una escena la captura en lugar de recuperarla"""
+        self.capture_armed = True
+
+    def recall_scene(self, scene):
+        """Lleva todos los switches a la escena y envía solo los CC que difieren de lo ya enviado"""
+        started_ns = time.perf_counter_ns()
+        table, states = self.active
+        new_states = dict(states)
+        changed = set()
+        for control_id, state in scene.states.items():
+            if control_id in new_states and new_states[control_id] != state:
+                new_states[control_id] = state
+                changed.add(control_id)
+
+        sent_values = self.sent_values
+        burst = []
+        for cc, value in scene.targets:
+            if sent_values[cc] != value:
+                sent_values[cc] = value
+                burst.append((cc, value))
+                if self.feedback is not None:
+                    self.feedback.daw_echo.note(cc, value)
+
+        self.swap_table(table, new_states)
+        for control_id in changed:
+            self.activations[control_id] = self.activations.get(control_id, 0) + 1
+        # OSC de los switches que cambiaron (sale con el flush del lote)
+        for route in table.routes.values():
+            if route.osc_packets is not None and route.control_id in changed:
+                self.midi_manager.send_osc(route.osc_packets[new_states[route.control_id]])
+
+        if self.scene_player is not None:
+            self.scene_player.play(scene, burst, started_ns)
+        else:
+            for cc, value in burst:
+                self.midi_manager.send_cc(cc, value, DIRECTION_OUT_EXTRA)
+        if self.on_scene:
+            self.on_scene(scene, len(changed), False)
+        return burst
+
+    def capture_scene(self, scene):
+        """Guarda en la escena los estados actuales y todo CC de salida con valor conocido.
+
+        Los CC que la escena guardaba y nunca se enviaron conservan su valor. La tabla nueva
+        reemplaza a la activa y se entrega a on_capture para que vuelva al banco o al setlist.
+        """
+        table, states = self.active
+        config = dict(table.config)
+        scenes = dict(config.get("scenes", {}))
+        entry = dict(scenes.get(scene.name, {}))
+        entry["switches"] = {control_id: states.get(control_id, False) for control_id in table.initial_states}
+        values = dict(entry.get("values", {}))
+        for cc, value in enumerate(self.sent_values):
+            if value != NO_VALUE and cc not in table.outputs:  # Los CC de los switches van en "switches"
+                values[str(cc)] = value
+        if values:
+            entry["values"] = values
+        scenes[scene.name] = entry
+        config["scenes"] = scenes
+        captured = RoutingTable(table.name, table.routes, table.initial_states, config)
+        self.swap_table(captured, states)
+        if self.on_capture:
+            self.on_capture(table, captured)
+        if self.on_scene:
+            self.on_scene(scene, 0, True)
+
+    def emit(self, route, state, direction=DIRECTION_OUT):
+        """Envía las salidas (CC y/o OSC) de un switch para el estado dado"""
+        if route.send_midi:
+            value = 127 if state else 0
+            self.midi_manager.send_cc(route.output_cc, value, direction)
+            self.sent_values[route.output_cc] = value
+            if self.feedback is not None:
+                self.feedback.daw_echo.note(route.output_cc, value)
+        if route.osc_packets is not None:
+            self.midi_manager.send_osc(route.osc_packets[state])
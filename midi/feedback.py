@@ -0,0 +1,149 @@
+import threading
+import time
+from config.settings import AppSettings
+
+
+class EchoFilter:
+    """Cuenta cada (CC, valor) escrito: el primer valor igual que vuelve por cada escritura es eco.
+
+    Deshabilitado no filtra nada (el puerto no devuelve lo que se le escribe). Un eco que no
+    vuelve dentro de ttl_ms se da por perdido, para no tragarse después un cambio real.
+    """
+
+    def __init__(self, enabled=True, ttl_ms=None, clock=time.monotonic):
+        self.enabled = enabled
+        self.ttl = (AppSettings.FEEDBACK_ECHO_TTL_MS if ttl_ms is None else ttl_ms) / 1000
+        self.clock = clock
+        self.pending = {}  # (CC, valor) -> [ecos que todavía tienen que volver, vencimiento]
+        self.lock = threading.Lock()
+        self.suppressed = 0
+        self.expired = 0
+
+    def note(self, cc, value):
+        if not self.enabled:
+            return
+        key = (cc, value)
+        now = self.clock()
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is None or entry[1] < now:
+                self.pending[key] = [1, now + self.ttl]  # Nuevo, o los anteriores ya vencieron
+            else:
+                entry[0] += 1
+                entry[1] = now + self.ttl
+
+    def is_echo(self, cc, value):
+        if not self.pending:
+            return False  # Camino rápido: nada escrito sin su eco
+        if not self._consume((cc, value)):
+            return False
+        self.suppressed += 1
+        return True
+
+    def forget(self, cc, value):
+        """Descarta el eco anotado de una escritura que falló"""
+        self._consume((cc, value))
+
+    def _consume(self, key):
+        with self.lock:
+            entry = self.pending.get(key)
+            if entry is None:
+                return False
+            if entry[1] < self.clock():
+                del self.pending[key]
+                self.expired += entry[0]
+                return False
+            if entry[0] == 1:
+                del self.pending[key]
+            else:
+                entry[0] -= 1
+        return True
+
+
+class FeedbackSync:
+    """Espejo de los estados de los switches hacia los LEDs del controlador.
+
+    show() solo anota el valor (se puede llamar desde el hilo MIDI después del envío principal);
+    un hilo propio agrupa lo pendiente y lo escribe como una ráfaga espaciada, ganando el último
+    valor de cada CC. También filtra los ecos del controlador y del DAW.
+    """
+
+    def __init__(self, send=None, pace_ms=None, batch_ms=None, device_echoes=None, daw_echoes=False):
+        self.send = send  # (cc, valor) -> escribe al controlador; None si solo se usa el feedback del DAW
+        self.pace = (AppSettings.FEEDBACK_PACE_MS if pace_ms is None else pace_ms) / 1000
+        self.batch = (AppSettings.FEEDBACK_BATCH_MS if batch_ms is None else batch_ms) / 1000
+        # Solo se filtra el eco del controlador si de verdad devuelve los LEDs escritos: si no,
+        # un press rápido con el mismo valor se confundiría con un eco y se perdería
+        self.device_echo = EchoFilter(AppSettings.FEEDBACK_DEVICE_ECHOES if device_echoes is None else device_echoes)
+        # El eco del DAW solo se espera mientras su puerto de feedback está abierto
+        self.daw_echo = EchoFilter(daw_echoes)
+        self.shown = {}    # Último valor escrito por CC
+        self.pending = {}  # CC -> valor a escribir en la próxima ráfaga
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.queued = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.bursts = 0
+        self.send_errors = 0
+        self.running = send is not None
+        self.thread = None
+        if self.running:
+            self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+            self.thread.start()
+
+    def show(self, cc, value):
+        """Encola el valor del LED de un CC de entrada (se descarta si ya es el que muestra)"""
+        if not self.running:
+            return
+        with self.lock:
+            if cc in self.pending:
+                if self.pending[cc] == value:
+                    return
+                self.coalesced += 1
+                if self.shown.get(cc) == value:
+                    del self.pending[cc]  # Volvió al valor que ya muestra: no hace falta escribir
+                    return
+            elif self.shown.get(cc) == value:
+                return
+            self.pending[cc] = value
+            self.queued += 1
+        if not self.wakeup.is_set():
+            self.wakeup.set()
+
+    def mirror(self, table, states):
+        """Encola los LEDs de todos los switches de una tabla (carga de preset, restauración, API)"""
+        for cc, route in table.routes.items():
+            self.show(cc, 127 if states.get(route.control_id, False) else 0)
+
+    def _writer_loop(self):
+        while self.running:
+            self.wakeup.wait()
+            if not self.running:
+                break
+            # Ventana de agrupación: una carga de preset llega como muchos cambios seguidos
+            time.sleep(self.batch)
+            self.wakeup.clear()
+            with self.lock:
+                burst, self.pending = self.pending, {}
+            if not burst:
+                continue
+            self.bursts += 1
+            for index, (cc, value) in enumerate(burst.items()):
+                if index:
+                    time.sleep(self.pace)  # Ritmo que el controlador (BLE) puede absorber
+                self.device_echo.note(cc, value)  # Antes de escribir: el eco puede volver enseguida
+                try:
+                    self.send(cc, value)
+                    self.shown[cc] = value
+                    self.sent += 1
+                except Exception as e:
+                    self.device_echo.forget(cc, value)
+                    self.send_errors += 1
+                    print(f"Error escribiendo feedback al controlador: {e}")
+
+    def close(self):
+        self.running = False
+        self.wakeup.set()
+        if self.thread:
+            self.thread.join(timeout=1)
@@ -0,0 +1,29 @@
+import time
+from config.settings import AppSettings
+
+
+class GestureDetector:
+    """Clasifica las pulsaciones de un footswitch en tap o pulsación larga"""
+
+    def __init__(self, on_tap, on_long_press, long_press_ms=None, clock=time.monotonic):
+        self.on_tap = on_tap
+        self.on_long_press = on_long_press
+        self.long_press_ms = long_press_ms or AppSettings.LONG_PRESS_MS
+        self.pressed_at = None
+        self.clock = clock  # Reemplazable por un reloj virtual en el replay
+
+    def __call__(self, value):
+        """Recibe cada valor del CC; el gesto se decide al soltar"""
+        now = self.clock()
+        if value > 0:
+            if self.pressed_at is None:
+                self.pressed_at = now
+            return
+        if self.pressed_at is None:
+            return
+        held_ms = (now - self.pressed_at) * 1000
+        self.pressed_at = None
+        if held_ms >= self.long_press_ms:
+            self.on_long_press()
+        else:
+            self.on_tap()
@@ -0,0 +1,243 @@
+import argparse
+import queue
+import random
+import threading
+import time
+import mido
+from midi.engine import RoutingEngine
+from midi.preset_loader import load_preset, PresetValidationError
+from midi.routing import Route, RoutingTable
+from midi.stats import percentiles
+
+PATTERNS = ("taps", "burst", "sweep", "running")
+SPIN_NS = 1_000_000  # Último tramo de espera activo para un pacing preciso
+
+
+def build_schedule(pattern, rate, duration, cc=1, channels=1, burst_size=10, hold_ms=50, jitter_ms=0.0, seed=0):
+    """Precalcula [(offset_ns, bytes)] para que el bucle de envío no genere nada"""
+    interval_ns = int(1e9 / rate)
+    total_ns = int(duration * 1e9)
+    schedule = []
+
+    if pattern == "taps":
+        # Press y release por tap; rate = taps por segundo
+        for index, due in enumerate(range(0, total_ns, interval_ns)):
+            status = 0xB0 | (index % channels)
+            schedule.append((due, (status, cc, 127)))
+            schedule.append((due + int(hold_ms * 1e6), (status, cc, 0)))
+    elif pattern == "burst":
+        # burst_size mensajes seguidos; rate = ráfagas por segundo
+        for burst, due in enumerate(range(0, total_ns, interval_ns)):
+            for index in range(burst_size):
+                schedule.append((due, (0xB0 | (index % channels), cc, 127 if index % 2 == 0 else 0)))
+    else:
+        # Barrido de valores 0-127 recorriendo canales; rate = mensajes por segundo
+        for index, due in enumerate(range(0, total_ns, interval_ns)):
+            status = 0xB0 | ((index // 128) % channels)
+            schedule.append((due, (status, cc, index % 128)))
+
+    if jitter_ms:
+        rng = random.Random(seed)
+        jitter_ns = jitter_ms * 1e6
+        schedule = [(max(0, due + int(rng.uniform(-jitter_ns, jitter_ns))), data) for due, data in schedule]
+    schedule.sort(key=lambda item: item[0])
+
+    if pattern == "running":
+        # Running status: se omite el byte de estado si no cambió respecto del anterior
+        last_status = None
+        compact = []
+        for due, data in schedule:
+            compact.append((due, data if data[0] != last_status else data[1:]))
+            last_status = data[0]
+        schedule = compact
+    return schedule
+
+
+def expand_running_status(data, status):
+    """Completa un mensaje que llegó con running status. Devuelve (bytes completos, estado vigente)"""
+    if data[0] & 0x80:
+        return data, data[0] if data[0] < 0xF0 else status
+    return (status,) + tuple(data), status
+
+
+class PortSink:
+    """Envía a un puerto de salida real (mido siempre envía mensajes completos)"""
+
+    def __init__(self, port_name):
+        self.port = mido.open_output(port_name)
+
+    def prepare(self, schedule):
+        # Los mensajes se arman antes de empezar; el running status se expande aquí
+        prepared = []
+        status = None
+        for due, data in schedule:
+            data, status = expand_running_status(data, status)
+            prepared.append((due, mido.Message.from_bytes(list(data))))
+        return prepared
+
+    def send(self, msg, sent_ns):
+        self.port.send(msg)
+
+    def close(self):
+        self.port.close()
+
+
+class FakeBackend:
+    """Backend en proceso: un hilo entrega los bytes al RoutingEngine como lo haría el puerto real.
+
+    Mide la latencia de extremo a extremo (envío -> CC de salida del motor) sin hardware.
+    """
+
+    def __init__(self, table):
+        self.queue = queue.SimpleQueue()
+        self.engine = RoutingEngine(self)
+        self.engine.swap_table(table)
+        self.current_sent_ns = 0
+        self.latencies_ns = []
+        self.outputs = 0
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def prepare(self, schedule):
+        return schedule
+
+    def send(self, data, sent_ns):
+        self.queue.put((sent_ns, data))
+
+    def _loop(self):
+        status = None
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            self.current_sent_ns, data = item
+            data, status = expand_running_status(data, status)
+            if data[0] & 0xF0 == 0xB0 and len(data) == 3:
+                self.engine.process_cc(data[1], data[2])
+
+    def send_cc(self, control, value, direction=None):
+        """Salida del motor: se cuenta y se mide en lugar de enviarse"""
+        self.latencies_ns.append(time.monotonic_ns() - self.current_sent_ns)
+        self.outputs += 1
+        return True
+
+    def send_osc(self, packet):
+        pass
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=2)
+
+
+class ReturnListener:
+    """Escucha la salida del bridge y empareja cada mensaje con el envío pendiente más antiguo"""
+
+    def __init__(self, port_name):
+        self.sent = queue.SimpleQueue()
+        self.latencies_ns = []
+        self.port = mido.open_input(port_name, callback=self._on_message)
+
+    def track(self, sent_ns):
+        self.sent.put(sent_ns)
+
+    def _on_message(self, msg):
+        received_ns = time.monotonic_ns()
+        try:
+            self.latencies_ns.append(received_ns - self.sent.get_nowait())
+        except queue.Empty:
+            pass
+
+    def close(self):
+        self.port.close()
+
+
+def run(schedule, sink, listener=None):
+    """Envía el schedule con deadlines absolutos. Devuelve (enviados, ns totales, atrasos ns)"""
+    prepared = sink.prepare(schedule)
+    lateness = []
+    start = time.monotonic_ns()
+    for due, payload in prepared:
+        target = start + due
+        remaining = target - time.monotonic_ns()
+        if remaining > SPIN_NS:
+            time.sleep((remaining - SPIN_NS) / 1e9)
+        while time.monotonic_ns() < target:
+            time.sleep(0)  # Cede el GIL al hilo del backend mientras espera
+        sent_ns = time.monotonic_ns()
+        sink.send(payload, sent_ns)
+        if listener is not None:
+            listener.track(sent_ns)
+        lateness.append(sent_ns - target)
+    return len(prepared), time.monotonic_ns() - start, lateness
+
+
+def passthrough_table():
+    """Tabla sintética para el backend falso: cada CC se reenvía al mismo CC (momentary)"""
+    routes = {cc: Route(f"btn_{cc + 1}", cc, False) for cc in range(128)}
+    return RoutingTable("loadgen", routes, {route.control_id: False for route in routes.values()})
+
+
+def _format_ns(stats):
+    return ", ".join(f"{key} {value / 1000:.1f} µs" for key, value in stats.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga MIDI sintética")
+    parser.add_argument("--pattern", choices=PATTERNS, default="taps")
+    parser.add_argument("--rate", type=float, default=10, help="Taps, ráfagas o mensajes por segundo según el patrón")
+    parser.add_argument("--duration", type=float, default=5, help="Segundos")
+    parser.add_argument("--cc", type=int, default=1)
+    parser.add_argument("--channels", type=int, default=1, help="Cantidad de canales a recorrer (1-16)")
+    parser.add_argument("--burst-size", type=int, default=10)
+    parser.add_argument("--hold-ms", type=float, default=50, help="Duración de cada tap")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Jitter aleatorio +/- sobre cada envío")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", help="Puerto de salida; sin él se usa el backend falso en proceso")
+    parser.add_argument("--return-port", help="Puerto de entrada con la salida del bridge (latencia de extremo a extremo)")
+    parser.add_argument("--preset", help="Configuración para el backend falso (por defecto: todos los CC en momentary)")
+    args = parser.parse_args()
+
+    schedule = build_schedule(
+        args.pattern, args.rate, args.duration, args.cc, max(1, min(16, args.channels)),
+        args.burst_size, args.hold_ms, args.jitter_ms, args.seed
+    )
+
+    listener = None
+    if args.port:
+        sink = PortSink(args.port)
+        if args.return_port:
+            listener = ReturnListener(args.return_port)
+        if args.pattern == "running":
+            print("Aviso: el puerto recibe mensajes completos; el running status solo se prueba con el backend falso")
+    else:
+        table = passthrough_table()
+        if args.preset:
+            try:
+                config, table, load_ms = load_preset(args.preset)
+            except PresetValidationError as e:
+                print(f"Preset inválido: {e}")
+                return 1
+        sink = FakeBackend(table)
+
+    sent, elapsed_ns, lateness = run(schedule, sink, listener)
+    time.sleep(0.2)  # Margen para que lleguen las últimas respuestas
+    sink.close()
+    if listener is not None:
+        listener.close()
+
+    requested = len(schedule) / args.duration
+    achieved = sent / (elapsed_ns / 1e9) if elapsed_ns else 0.0
+    print(f"Patrón {args.pattern}: {sent} mensajes en {elapsed_ns / 1e9:.3f} s")
+    print(f"Tasa pedida {requested:.1f} msg/s, lograda {achieved:.1f} msg/s")
+    print(f"Atraso de envío: {_format_ns(percentiles(lateness))}")
+    if listener is not None:
+        latencies = listener.latencies_ns
+    else:
+        latencies = getattr(sink, "latencies_ns", [])
+    if latencies:
+        print(f"Latencia ({len(latencies)} salidas): {_format_ns(percentiles(latencies))}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
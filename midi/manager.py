@@ -1,6 +1,18 @@
 import mido
+import queue
+import sys
 import threading
+import time
 from config.settings import AppSettings
+from midi.metrics import Histogram, LATENCY_BUCKETS_NS
+from midi.recorder import DIRECTION_IN, DIRECTION_OUT
+from midi.network import NetworkInput, NetworkOutput, parse_address
+from midi.osc import OscOutput
+from midi.feedback import FeedbackSync
+
+# Mensajes de tiempo real precreados: el reloj MIDI los envía 24 veces por negra
+REALTIME_MESSAGES = {0xF8: mido.Message("clock"), 0xFA: mido.Message("start"), 0xFC: mido.Message("stop")}
+
 
 class MidiManager:
     def __init__(self):
@@ -8,15 +20,55 @@ class MidiManager:
         self.output_port = None
         self.listening = False
         self.message_callback = None
+        self.recorder = None
+        self.network_output = None
+        self.network_input = None
+        self.network_callback = None
+        self.osc_output = None
+        self.feedback = None
+        self.feedback_port = None
+        self.daw_feedback_port = None
         self.settings = AppSettings()
+        # Contadores pre-agregados para las métricas. Los de entrada solo los toca el hilo de escucha;
+        # los de salida también se incrementan desde escenas, reloj, API de control y red (counter_lock)
+        self.input_name = ""
+        self.output_name = ""
+        self.connects = 0
+        self.messages_in = {}
+        self.messages_out = {}
+        self.send_errors = 0
+        self.counter_lock = threading.Lock()
+        self.wakeups = 0  # Veces que el hilo de escucha despertó (cada lote de mensajes)
+        self.inbox = None
+        self.handling_latency = Histogram(LATENCY_BUCKETS_NS)
     
     def get_input_ports_truncated(self):
         """Obtiene lista de puertos de entrada truncados"""
-        return [self.truncate_port_name(name) for name in mido.get_input_names()]
+        ports = [self.truncate_port_name(name) for name in mido.get_input_names()]
+        if self.supports_virtual_ports():
+            ports.append(self.virtual_label(self.settings.VIRTUAL_INPUT_NAME))
+        return ports
     
     def get_output_ports_truncated(self):
-        """Obtiene lista de puertos de salida truncados"""
-        return [self.truncate_port_name(name) for name in mido.get_output_names()]
+        """Obtiene lista de puertos de salida truncados (el virtual propio va primero)"""
+        ports = [self.truncate_port_name(name) for name in mido.get_output_names()]
+        if self.supports_virtual_ports():
+            ports.insert(0, self.virtual_label(self.settings.VIRTUAL_OUTPUT_NAME))
+        return ports
+
+    @staticmethod
+    def supports_virtual_ports():
+        """rtmidi solo crea puertos virtuales con ALSA (Linux) y CoreMIDI (macOS)"""
+        return sys.platform != "win32"
+
+    def virtual_label(self, name):
+        return self.truncate_port_name(f"{name} (virtual)")
+
+    def _open_port(self, truncated_name, virtual_name, real_ports, open_port):
+        """Abre el puerto virtual propio o el puerto real correspondiente al nombre truncado"""
+        if self.supports_virtual_ports() and truncated_name == self.virtual_label(virtual_name):
+            return open_port(virtual_name, virtual=True)
+        return self._open_real_port(truncated_name, real_ports, open_port)
     
     def truncate_port_name(self, name, max_length=None):
         """Trunca el nombre del puerto MIDI si es muy largo"""
@@ -37,40 +89,67 @@ class MidiManager:
     def connect_ports(self, input_port_truncated, output_port_truncated, message_callback):
         """Conecta a los puertos MIDI usando nombres truncados"""
         try:
-            # Obtener nombres reales
-            input_ports_real = mido.get_input_names()
-            output_ports_real = mido.get_output_names()
-            
-            real_input = self.get_real_port_name(input_port_truncated, input_ports_real)
-            real_output = self.get_real_port_name(output_port_truncated, output_ports_real)
-            
-            if real_input not in input_ports_real:
-                raise Exception(f"Puerto de entrada no encontrado: {real_input}")
-            if real_output not in output_ports_real:
-                raise Exception(f"Puerto de salida no encontrado: {real_output}")
-            
-            self.input_port = mido.open_input(real_input)
-            self.output_port = mido.open_output(real_output)
-            self.message_callback = message_callback
-            self.listening = True
-            
-            # Iniciar hilo de escucha
-            self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
-            self.listen_thread.start()
-            
+            # Puertos reales o virtuales propios (sin hop por loopMIDI)
+            self.input_port = self._open_port(
+                input_port_truncated, self.settings.VIRTUAL_INPUT_NAME, mido.get_input_names(), mido.open_input
+            )
+            self.output_port = self._open_port(
+                output_port_truncated, self.settings.VIRTUAL_OUTPUT_NAME, mido.get_output_names(), mido.open_output
+            )
+            self.attach_ports(self.input_port, self.output_port, message_callback,
+                              input_port_truncated, output_port_truncated)
             return True
             
         except Exception as e:
             print(f"Error conectando puertos MIDI: {e}")
+            if self.input_port:
+                self.input_port.close()  # No dejar la entrada abierta si falló la salida
+                self.input_port = None
             return False
     
+    def attach_ports(self, input_port, output_port, message_callback, input_name, output_name):
+        """Empieza a escuchar sobre puertos ya abiertos (de mido o del backend falso del soak test)"""
+        self.input_port = input_port
+        self.output_port = output_port
+        # El backend entrega cada mensaje en su propio hilo: el de escucha duerme sin sondear
+        self.inbox = queue.SimpleQueue()
+        self.input_port.callback = self.inbox.put
+        self.message_callback = message_callback
+        self.input_name = input_name
+        self.output_name = output_name
+        self.connects += 1
+        self.listening = True
+
+        # Iniciar hilo de escucha
+        self.listen_thread = threading.Thread(target=self._listen_loop, daemon=True)
+        self.listen_thread.start()
+
     def _listen_loop(self):
-        """Bucle de escucha de mensajes MIDI"""
+        """Bucle de escucha: bloquea hasta el próximo mensaje y procesa todo lo pendiente como un lote"""
+        messages_in = self.messages_in
+        port = self.input_name
+        inbox = self.inbox
         while self.listening:
             try:
-                for msg in self.input_port.iter_pending():
+                msg = inbox.get()
+                if msg is None:  # Despertador de disconnect_ports
+                    break
+                self.wakeups += 1
+                while msg is not None:
+                    start = time.perf_counter_ns()
+                    messages_in[port] = messages_in.get(port, 0) + 1
+                    if self.recorder:
+                        self.recorder.record(DIRECTION_IN, msg.bytes())
                     if self.message_callback:
                         self.message_callback(msg)
+                    self.handling_latency.observe(time.perf_counter_ns() - start)
+                    try:
+                        msg = inbox.get_nowait()
+                    except queue.Empty:
+                        msg = None
+                # Los OSC generados por este lote salen juntos en un bundle
+                if self.osc_output is not None:
+                    self.osc_output.flush()
             except Exception as e:
                 if self.listening:  # Solo loguear errores si todavía estamos escuchando
                     print(f"Error en listen_loop: {e}")
@@ -79,8 +158,11 @@ class MidiManager:
     def disconnect_ports(self):
         """Desconecta los puertos MIDI"""
         self.listening = False
+        if self.inbox is not None:
+            self.inbox.put(None)  # Despierta al hilo de escucha para que termine
         try:
             if self.input_port:
+                self.input_port.callback = None
                 self.input_port.close()
             if self.output_port:
                 self.output_port.close()
@@ -91,23 +173,159 @@ class MidiManager:
             self.output_port = None
             self.message_callback = None
     
-    def send_cc(self, control, value):
-        """Envía un mensaje CC"""
-        if self.output_port and self.listening:
+    def send_cc(self, control, value, direction=DIRECTION_OUT):
+        """Envía un mensaje CC al puerto de salida y, si está activa, a la salida de red.
+
+        direction marca en la grabación si la salida viene de un press ruteado o de otra fuente.
+        """
+        if (self.output_port or self.network_output) and self.listening:
             try:
                 control_int = int(control)
                 if 0 <= control_int <= 127 and 0 <= value <= 127:
-                    msg = mido.Message("control_change", control=control_int, value=value)
-                    self.output_port.send(msg)
+                    if self.output_port:
+                        self.output_port.send(mido.Message("control_change", control=control_int, value=value))
+                        self._count_out()
+                    if self.network_output:
+                        self.network_output.send((0xB0, control_int, value))
+                    if self.recorder:
+                        self.recorder.record(direction, (0xB0, control_int, value))
                     return True
                 else:
                     print(f"Valores CC inválidos: control={control_int}, value={value}")
             except ValueError:
                 print(f"CC inválido: {control}")
             except Exception as e:
+                self._count_error()
                 print(f"Error enviando CC: {e}")
         return False
+
+    def _count_out(self):
+        with self.counter_lock:
+            self.messages_out[self.output_name] = self.messages_out.get(self.output_name, 0) + 1
+
+    def _count_error(self):
+        with self.counter_lock:
+            self.send_errors += 1
+
+    def output_counts(self):
+        """Copia de los mensajes enviados por puerto (para las métricas, desde otro hilo)"""
+        with self.counter_lock:
+            return dict(self.messages_out)
+
+    def send_realtime(self, status):
+        """Envía clock/start/stop al puerto de salida (la salida de red solo transporta mensajes de canal)"""
+        if self.output_port and self.listening:
+            try:
+                self.output_port.send(REALTIME_MESSAGES[status])
+                self._count_out()
+                return True
+            except Exception as e:
+                self._count_error()
+                print(f"Error enviando reloj MIDI: {e}")
+        return False
+
+    def open_network_output(self, address):
+        """Activa la salida MIDI por UDP hacia 'host:puerto'"""
+        self.close_network_output()
+        try:
+            host, port = parse_address(address)
+            self.network_output = NetworkOutput(host, port)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error abriendo salida MIDI de red {address}: {e}")
+            return False
+
+    def close_network_output(self):
+        if self.network_output:
+            self.network_output.close()
+            self.network_output = None
+
+    def open_network_input(self, port, callback=None):
+        """Recibe MIDI por UDP como si llegara del puerto de entrada (o hacia su propio callback)"""
+        self.close_network_input()
+        self.network_callback = callback
+        try:
+            self.network_input = NetworkInput(port, self._on_network_message)
+            return True
+        except OSError as e:
+            print(f"Error abriendo entrada MIDI de red {port}: {e}")
+            return False
+
+    def close_network_input(self):
+        if self.network_input:
+            self.network_input.close()
+            self.network_input = None
+
+    def _on_network_message(self, data):
+        if self.recorder:
+            self.recorder.record(DIRECTION_IN, data)
+        callback = self.network_callback or self.message_callback
+        if callback:
+            callback(mido.Message.from_bytes(list(data)))
+        if self.osc_output is not None:
+            self.osc_output.flush()
+
+    def send_osc(self, packet):
+        """Encola un paquete OSC precodificado; se envía al terminar el lote de mensajes"""
+        if self.osc_output is not None:
+            self.osc_output.queue(packet)
+
+    def open_osc_output(self, address):
+        """Activa la salida OSC por UDP hacia 'host:puerto'"""
+        self.close_osc_output()
+        try:
+            host, port = parse_address(address, self.settings.OSC_DEFAULT_PORT)
+            self.osc_output = OscOutput(host, port)
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error abriendo salida OSC {address}: {e}")
+            return False
+
+    def close_osc_output(self):
+        if self.osc_output:
+            self.osc_output.close()
+            self.osc_output = None
     
+    def open_feedback(self, led_port, daw_port, on_daw_message):
+        """Abre la salida a los LEDs del controlador y/o la entrada de feedback del DAW (nombres truncados)"""
+        self.close_feedback()
+        try:
+            if led_port:
+                self.feedback_port = self._open_real_port(led_port, mido.get_output_names(), mido.open_output)
+            if daw_port:
+                self.daw_feedback_port = self._open_real_port(daw_port, mido.get_input_names(), mido.open_input)
+                self.daw_feedback_port.callback = on_daw_message  # Hilo del backend, sin sondeo
+        except Exception as e:
+            print(f"Error abriendo puertos de feedback: {e}")
+            self.close_feedback()
+            return None
+        send = self._send_feedback if self.feedback_port else None
+        daw_echoes = self.daw_feedback_port is not None and self.settings.FEEDBACK_DAW_ECHOES
+        self.feedback = FeedbackSync(send, daw_echoes=daw_echoes)
+        return self.feedback
+
+    def _open_real_port(self, truncated_name, real_ports, open_port):
+        real_name = self.get_real_port_name(truncated_name, real_ports)
+        if real_name not in real_ports:
+            raise Exception(f"Puerto no encontrado: {real_name}")
+        return open_port(real_name)
+
+    def _send_feedback(self, control, value):
+        self.feedback_port.send(mido.Message("control_change", control=control, value=value))
+
+    def close_feedback(self):
+        if self.feedback:
+            self.feedback.close()
+            self.feedback = None
+        for port in (self.daw_feedback_port, self.feedback_port):
+            if port:
+                try:
+                    port.close()
+                except Exception as e:
+                    print(f"Error cerrando puerto de feedback: {e}")
+        self.feedback_port = None
+        self.daw_feedback_port = None
+
     def is_connected(self):
         """Verifica si está conectado"""
         return self.listening and self.input_port and self.output_port
\ No newline at end of file
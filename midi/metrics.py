@@ -0,0 +1,208 @@
+import bisect
+import threading
+from midi.stats import process_usage
+
+# Límites de los histogramas en ns (se exportan en segundos)
+LATENCY_BUCKETS_NS = (10_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 50_000_000)
+LAG_BUCKETS_NS = (1_000_000, 5_000_000, 10_000_000, 25_000_000, 50_000_000, 100_000_000, 250_000_000, 1_000_000_000)
+
+
+class Histogram:
+    """Histograma de buckets fijos: observe() solo incrementa enteros (apto para el hilo MIDI)"""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def render(self, name, help_text, scale=1e-9):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        counts = list(self.counts)  # Copia: el hilo MIDI puede seguir incrementando
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound * scale:g}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum {self.total * scale:g}")
+        lines.append(f"{name}_count {cumulative}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def metric(name, kind, help_text, samples):
+    """Familia de métricas en formato de texto Prometheus. samples: [(labels, valor)]"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+        lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return lines
+
+
+class BridgeMetrics:
+    """Arma la exportación a partir de los contadores que ya mantienen los componentes.
+
+    Solo lee enteros y copias de diccionarios: nunca bloquea ni toca el hilo MIDI.
+    """
+
+    def __init__(self, midi_manager, engine, autosave=None, loop_lag=None, governor=None, scene_player=None,
+                 clock=None):
+        self.midi_manager = midi_manager
+        self.engine = engine
+        self.autosave = autosave
+        self.loop_lag = loop_lag
+        self.governor = governor
+        self.scene_player = scene_player
+        self.clock = clock
+
+    def render(self):
+        manager = self.midi_manager
+        lines = []
+        lines += metric("mvave_connected", "gauge", "1 si los puertos MIDI están conectados",
+                        [({}, int(bool(manager.is_connected())))])
+        lines += metric("mvave_port_connects_total", "counter", "Conexiones (y reconexiones) de puertos",
+                        [({}, manager.connects)])
+        lines += metric("mvave_midi_messages_in_total", "counter", "Mensajes MIDI recibidos por puerto",
+                        [({"port": port}, count) for port, count in dict(manager.messages_in).items()])
+        lines += metric("mvave_midi_messages_out_total", "counter", "Mensajes MIDI enviados por puerto",
+                        [({"port": port}, count) for port, count in manager.output_counts().items()])
+        lines += metric("mvave_midi_send_errors_total", "counter", "Envíos MIDI descartados por error",
+                        [({}, manager.send_errors)])
+        lines += metric("mvave_switch_activations_total", "counter", "Cambios de estado por switch",
+                        [({"switch": control_id}, count) for control_id, count in dict(self.engine.activations).items()])
+        transforms = dict(self.engine.transform_stats).items()
+        if transforms:
+            lines += metric("mvave_transform_calls_total", "counter", "Evaluaciones de la transformación por switch",
+                            [({"switch": control_id}, stats.calls) for control_id, stats in transforms])
+            lines += metric("mvave_transform_seconds_total", "counter", "Tiempo total en la transformación por switch",
+                            [({"switch": control_id}, stats.total_ns / 1e9) for control_id, stats in transforms])
+            lines += metric("mvave_transform_max_seconds", "gauge", "Evaluación más lenta de la transformación por switch",
+                            [({"switch": control_id}, stats.max_ns / 1e9) for control_id, stats in transforms])
+            lines += metric("mvave_transform_blocked_total", "counter", "Mensajes descartados por la transformación",
+                            [({"switch": control_id}, stats.blocked) for control_id, stats in transforms])
+            lines += metric("mvave_transform_errors_total", "counter", "Errores al evaluar la transformación",
+                            [({"switch": control_id}, stats.errors) for control_id, stats in transforms])
+        lines += metric("mvave_preset_swaps_total", "counter", "Cambios de tabla de ruteo (presets)",
+                        [({}, self.engine.swaps)])
+        if manager.osc_output:
+            lines += metric("mvave_osc_packets_sent_total", "counter", "Mensajes OSC enviados",
+                            [({}, manager.osc_output.sent)])
+            lines += metric("mvave_osc_bundles_total", "counter", "Envíos OSC agrupados en un bundle",
+                            [({}, manager.osc_output.bundles)])
+            lines += metric("mvave_osc_send_errors_total", "counter", "Envíos OSC descartados",
+                            [({}, manager.osc_output.send_errors)])
+        if manager.network_output:
+            lines += metric("mvave_network_datagrams_sent_total", "counter", "Datagramas MIDI de red enviados",
+                            [({}, manager.network_output.sent)])
+            lines += metric("mvave_network_send_errors_total", "counter", "Datagramas MIDI de red descartados",
+                            [({}, manager.network_output.send_errors)])
+        if manager.feedback:
+            lines += metric("mvave_feedback_sent_total", "counter", "Escrituras de LED al controlador",
+                            [({}, manager.feedback.sent)])
+            lines += metric("mvave_feedback_bursts_total", "counter", "Ráfagas de escrituras de LED",
+                            [({}, manager.feedback.bursts)])
+            lines += metric("mvave_feedback_coalesced_total", "counter", "Cambios de LED reemplazados antes de escribirse",
+                            [({}, manager.feedback.coalesced)])
+            lines += metric("mvave_feedback_echoes_total", "counter", "Ecos descartados por origen",
+                            [({"source": "device"}, manager.feedback.device_echo.suppressed),
+                             ({"source": "daw"}, manager.feedback.daw_echo.suppressed)])
+        if manager.recorder:
+            lines += metric("mvave_recorder_records_total", "counter", "Mensajes escritos por el grabador",
+                            [({}, manager.recorder.records_written)])
+        if self.autosave:
+            lines += metric("mvave_autosave_writes_total", "counter", "Escrituras del autosave",
+                            [({}, self.autosave.total_writes)])
+            lines += metric("mvave_autosave_coalesced_total", "counter", "Cambios agrupados sin escritura propia",
+                            [({}, max(0, self.autosave.dirty_marks - self.autosave.total_writes))])
+        lines += metric("mvave_midi_listener_wakeups_total", "counter", "Despertares del hilo de escucha MIDI",
+                        [({}, manager.wakeups)])
+        cpu, switches = process_usage()
+        lines += metric("mvave_process_cpu_seconds_total", "counter", "Tiempo de CPU del proceso",
+                        [({}, f"{cpu:g}")])
+        if switches is not None:
+            lines += metric("mvave_process_context_switches_total", "counter",
+                            "Cambios de contexto del proceso (despertares de todos los hilos)", [({}, switches)])
+        if self.governor:
+            lines += metric("mvave_idle", "gauge", "1 si la app está en reposo (bajo consumo)",
+                            [({}, int(self.governor.idle))])
+            lines += metric("mvave_idle_seconds_total", "counter", "Tiempo total en reposo",
+                            [({}, f"{self.governor.total_idle_seconds():g}")])
+            lines += metric("mvave_idle_transitions_total", "counter", "Entradas en reposo",
+                            [({}, self.governor.transitions)])
+        if self.scene_player:
+            lines += metric("mvave_scene_recalls_total", "counter", "Escenas recuperadas",
+                            [({}, self.scene_player.recalls)])
+            lines += metric("mvave_scene_ccs_sent_total", "counter", "CC enviados por recalls de escenas",
+                            [({}, self.scene_player.sent)])
+            lines += self.scene_player.durations.render(
+                "mvave_scene_recall_seconds", "Tiempo desde el press hasta el último CC de la escena")
+        if self.clock and self.clock.bpm is not None:
+            lines += metric("mvave_clock_bpm", "gauge", "Tempo del reloj MIDI", [({}, self.clock.bpm)])
+            lines += metric("mvave_clock_ticks_total", "counter", "Pulsos de reloj MIDI enviados",
+                            [({}, self.clock.ticks)])
+            lines += metric("mvave_clock_late_ticks_total", "counter", "Pulsos con jitter sobre la cota",
+                            [({}, self.clock.late)])
+            lines += metric("mvave_clock_skipped_ticks_total", "counter", "Pulsos salteados por atraso",
+                            [({}, self.clock.skipped)])
+            lines += metric("mvave_clock_realtime", "gauge", "1 si el hilo del reloj tiene prioridad de tiempo real",
+                            [({}, int(self.clock.realtime))])
+            lines += self.clock.jitter.render("mvave_clock_jitter_seconds", "Atraso de cada pulso respecto de su deadline")
+        lines += manager.handling_latency.render(
+            "mvave_message_handling_seconds", "Tiempo de procesamiento de cada mensaje entrante")
+        if self.loop_lag:
+            lines += self.loop_lag.render("mvave_tk_loop_lag_seconds", "Retraso del loop de Tk")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Endpoint HTTP /metrics ligado solo a 127.0.0.1"""
+
+    def __init__(self, port, render):
+        self.port = port
+        self.render = render
+        self.httpd = None
+
+    def start(self):
+        # http.server se importa solo si el endpoint está activado
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        render = self.render
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Sin logs por cada scrape
+
+        try:
+            self.httpd = ThreadingHTTPServer(("127.0.0.1", self.port), Handler)
+        except OSError as e:
+            print(f"Error iniciando el endpoint de métricas en {self.port}: {e}")
+            return False
+        self.httpd.daemon_threads = True
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return True
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
@@ -0,0 +1,221 @@
+import argparse
+import collections
+import socket
+import struct
+import threading
+import time
+from config.settings import AppSettings
+from midi.stats import percentiles
+
+# Cabecera: magic, tipo, cantidad de entradas, secuencia, monotonic ns del emisor
+HEADER = struct.Struct("<2sBxHIQ")
+MAGIC = b"MV"
+KIND_DATA = 0
+KIND_JOURNAL = 1
+ENTRY_SIZE = 3  # Mensajes de canal de hasta 3 bytes (los de 2 se completan con 0)
+MAX_DATAGRAM = 65507
+
+
+def parse_address(address, default_port=None):
+    """'host:puerto' -> (host, puerto)"""
+    host, _, port = str(address).rpartition(":")
+    if not host:
+        host, port = port, default_port or AppSettings.NETWORK_MIDI_PORT
+    return host, int(port)
+
+
+def _entry(data):
+    return bytes(data).ljust(ENTRY_SIZE, b"\0")
+
+
+def _message_length(status):
+    return 2 if status & 0xF0 in (0xC0, 0xD0) else 3
+
+
+class NetworkOutput:
+    """Envía mensajes MIDI por UDP con número de secuencia.
+
+    Cada datagrama repite los últimos `redundancy` mensajes para recuperar pérdidas
+    sueltas, y periódicamente se envía un journal con el último valor de cada CC.
+    """
+
+    def __init__(self, host, port, redundancy=None, journal_ms=None):
+        self.address = (host, port)
+        self.redundancy = AppSettings.NETWORK_REDUNDANCY if redundancy is None else redundancy
+        self.journal_interval = (journal_ms or AppSettings.NETWORK_JOURNAL_MS) / 1000
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.history = collections.deque(maxlen=self.redundancy + 1)
+        self.journal = {}
+        self.seq = 0
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.send_errors = 0
+        self.running = True
+        self.thread = threading.Thread(target=self._journal_loop, daemon=True)
+        self.thread.start()
+
+    def send(self, data):
+        """Envía un mensaje (bytes MIDI). Nunca bloquea: si el socket no puede, se cuenta el error"""
+        entry = _entry(data)
+        with self.lock:
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+            self.history.appendleft(entry)
+            if entry[0] & 0xF0 == 0xB0:
+                self.journal[entry[:2]] = entry
+            packet = HEADER.pack(MAGIC, KIND_DATA, len(self.history), self.seq, time.monotonic_ns())
+            packet += b"".join(self.history)
+        self._sendto(packet)
+
+    def _journal_loop(self):
+        while self.running:
+            time.sleep(self.journal_interval)
+            with self.lock:
+                entries = list(self.journal.values())[:MAX_DATAGRAM // ENTRY_SIZE - 8]
+                packet = HEADER.pack(MAGIC, KIND_JOURNAL, len(entries), self.seq, time.monotonic_ns())
+                packet += b"".join(entries)
+            self._sendto(packet)
+
+    def _sendto(self, packet):
+        try:
+            self.socket.sendto(packet, self.address)
+            self.sent += 1
+        except OSError:
+            self.send_errors += 1
+
+    def close(self):
+        self.running = False
+        self.socket.close()
+
+
+class NetworkInput:
+    """Recibe el flujo UDP, recupera pérdidas y entrega los mensajes en orden a un callback"""
+
+    def __init__(self, port, callback, host="0.0.0.0"):
+        self.callback = callback
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, port))
+        self.socket.settimeout(0.5)
+        self.last_seq = None
+        self.state = {}
+        self.received = 0
+        self.recovered = 0
+        self.lost = 0
+        self.duplicates = 0
+        self.journal_fixes = 0
+        self.latencies_ns = collections.deque(maxlen=10000)
+        self.running = True
+        self.thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self.thread.start()
+
+    def _receive_loop(self):
+        while self.running:
+            try:
+                packet = self.socket.recv(MAX_DATAGRAM)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            received_ns = time.monotonic_ns()
+            try:
+                self._handle(packet, received_ns)
+            except Exception as e:
+                print(f"Paquete MIDI de red inválido: {e}")
+
+    def _handle(self, packet, received_ns):
+        if len(packet) < HEADER.size:
+            return
+        magic, kind, count, seq, sent_ns = HEADER.unpack_from(packet)
+        if magic != MAGIC or kind not in (KIND_DATA, KIND_JOURNAL) or len(packet) < HEADER.size + count * ENTRY_SIZE:
+            return  # Paquete ajeno o truncado: no se entrega nada parcial
+        entries = [
+            packet[offset:offset + ENTRY_SIZE]
+            for offset in range(HEADER.size, HEADER.size + count * ENTRY_SIZE, ENTRY_SIZE)
+        ]
+
+        if kind == KIND_JOURNAL:
+            # Journal: se emiten solo los CC cuyo valor difiere de lo recibido
+            for entry in entries:
+                if self.state.get(entry[:2]) != entry:
+                    self.journal_fixes += 1
+                    self._deliver(entry)
+            return
+
+        self.received += 1
+        # Reloj monotónico compartido: válido en el mismo equipo (p. ej. pruebas en localhost)
+        self.latencies_ns.append(received_ns - sent_ns)
+        if self.last_seq is not None:
+            gap = (seq - self.last_seq) & 0xFFFFFFFF
+            if gap == 0 or gap > 0x7FFFFFFF:
+                self.duplicates += 1  # Duplicado o fuera de orden: ya entregado
+                return
+            missing = gap - 1
+            recoverable = min(missing, len(entries) - 1)
+            # Las entradas van de la más nueva a la más vieja; se entregan en orden
+            for entry in reversed(entries[1:recoverable + 1]):
+                self._deliver(entry)
+            self.recovered += recoverable
+            self.lost += missing - recoverable
+        self.last_seq = seq
+        if entries:
+            self._deliver(entries[0])
+
+    def _deliver(self, entry):
+        if entry[0] & 0xF0 == 0xB0:
+            self.state[entry[:2]] = entry
+        self.callback(tuple(entry[:_message_length(entry[0])]))
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "recovered": self.recovered,
+            "lost": self.lost,
+            "duplicates": self.duplicates,
+            "journal_fixes": self.journal_fixes,
+            "latency_ns": percentiles(list(self.latencies_ns)),
+        }
+
+    def close(self):
+        self.running = False
+        self.socket.close()
+
+
+def main():
+    import mido
+
+    parser = argparse.ArgumentParser(description="Receptor MIDI de red: expone el flujo UDP como un puerto local")
+    parser.add_argument("--listen", type=int, default=AppSettings.NETWORK_MIDI_PORT, help="Puerto UDP")
+    parser.add_argument("--port", help="Puerto MIDI de salida local (p. ej. loopMIDI)")
+    parser.add_argument("--virtual", help="Crea un puerto virtual con este nombre (macOS / Linux)")
+    parser.add_argument("--report-s", type=float, default=5, help="Intervalo del reporte de estadísticas")
+    args = parser.parse_args()
+
+    if args.virtual:
+        output = mido.open_output(args.virtual, virtual=True)
+    elif args.port:
+        output = mido.open_output(args.port)
+    else:
+        output = None
+
+    def forward(data):
+        if output is not None:
+            output.send(mido.Message.from_bytes(list(data)))
+
+    receiver = NetworkInput(args.listen, forward)
+    print(f"Escuchando MIDI de red en UDP {args.listen}")
+    try:
+        while True:
+            time.sleep(args.report_s)
+            stats = receiver.stats()
+            latency = ", ".join(f"{key} {value / 1000:.0f} µs" for key, value in stats.pop("latency_ns").items())
+            print(" ".join(f"{key}={value}" for key, value in stats.items()) + (f" | latencia {latency}" if latency else ""))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
+        if output is not None:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import socket
+import struct
+import threading
+
+BUNDLE_HEADER = b"#bundle\0" + struct.pack(">Q", 1)  # Timetag 1 = inmediato
+
+
+def encode_string(text):
+    """String OSC: UTF-8 terminado en nulo y alineado a 4 bytes"""
+    data = text.encode("utf-8")
+    return data + b"\0" * (4 - len(data) % 4)
+
+
+def encode_message(address, *args):
+    """Codifica un mensaje OSC con argumentos int, float o str"""
+    tags = ","
+    payload = b""
+    for arg in args:
+        if isinstance(arg, int):
+            tags += "i"
+            payload += struct.pack(">i", int(arg))
+        elif isinstance(arg, float):
+            tags += "f"
+            payload += struct.pack(">f", arg)
+        else:
+            tags += "s"
+            payload += encode_string(str(arg))
+    return encode_string(address) + encode_string(tags) + payload
+
+
+def encode_bundle(packets):
+    return BUNDLE_HEADER + b"".join(struct.pack(">i", len(packet)) + packet for packet in packets)
+
+
+def is_valid_address(address):
+    return isinstance(address, str) and address.startswith("/") and not any(c in address for c in " #,")
+
+
+class OscOutput:
+    """Salida OSC por UDP. Los paquetes ya vienen codificados; se encolan en el hilo MIDI
+    y flush() los envía juntos (en un bundle si hay más de uno) sin bloquear en el socket.
+
+    queue/flush también se llaman desde la red, la API de control y las escenas: el lock
+    evita perder un paquete encolado justo durante el intercambio de la lista.
+    """
+
+    def __init__(self, host, port):
+        self.address = (host, port)
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+        self.pending = []
+        self.lock = threading.Lock()
+        self.sent = 0
+        self.bundles = 0
+        self.send_errors = 0
+
+    def queue(self, packet):
+        with self.lock:
+            self.pending.append(packet)
+
+    def flush(self):
+        if not self.pending:
+            return
+        # El envío también va dentro del lock: socket no bloqueante, orden y contadores consistentes
+        with self.lock:
+            packets, self.pending = self.pending, []
+            if not packets:
+                return
+            if len(packets) == 1:
+                data = packets[0]
+            else:
+                data = encode_bundle(packets)
+                self.bundles += 1
+            try:
+                self.socket.sendto(data, self.address)
+                self.sent += len(packets)
+            except OSError:
+                self.send_errors += 1  # Buffer lleno o destino inalcanzable: se descarta
+
+    def close(self):
+        self.socket.close()
@@ -0,0 +1,62 @@
+import argparse
+import threading
+import time
+import mido
+from config.settings import AppSettings
+from midi.manager import MidiManager
+from midi.stats import percentiles
+
+
+def measure(output, input_port, count, interval_ms):
+    """Envía CCs por `output` y mide cuánto tardan en llegar a `input_port`"""
+    latencies = []
+    received = threading.Event()
+    sent_at = [0]
+
+    def on_message(msg):
+        latencies.append(time.monotonic_ns() - sent_at[0])
+        received.set()
+
+    input_port.callback = on_message
+    time.sleep(0.2)  # Dar tiempo a que se establezca la conexión
+    for index in range(count):
+        received.clear()
+        sent_at[0] = time.monotonic_ns()
+        output.send(mido.Message("control_change", control=1, value=index % 128))
+        received.wait(1)
+        time.sleep(interval_ms / 1000)
+    input_port.callback = None
+    return latencies
+
+
+def report(label, latencies, count):
+    stats = ", ".join(f"{key} {value / 1000:.1f} µs" for key, value in percentiles(latencies).items())
+    print(f"{label}: {len(latencies)}/{count} recibidos | {stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latencia: puerto virtual propio vs puerto loopback")
+    parser.add_argument("--loopback", help="Puerto loopback a comparar (p. ej. mvave_midi o Midi Through)")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--interval-ms", type=float, default=2)
+    args = parser.parse_args()
+
+    if MidiManager.supports_virtual_ports():
+        name = AppSettings.VIRTUAL_OUTPUT_NAME + " Bench"
+        with mido.open_output(name, virtual=True) as output:
+            # El puerto virtual aparece como entrada para los demás clientes
+            real_name = next((port for port in mido.get_input_names() if port.startswith(name)), name)
+            with mido.open_input(real_name) as input_port:
+                report("Virtual", measure(output, input_port, args.count, args.interval_ms), args.count)
+    else:
+        print("Este sistema no admite puertos virtuales (Windows)")
+
+    if args.loopback:
+        output_name = next((port for port in mido.get_output_names() if port.startswith(args.loopback)), args.loopback)
+        input_name = next((port for port in mido.get_input_names() if port.startswith(args.loopback)), args.loopback)
+        with mido.open_output(output_name) as output, mido.open_input(input_name) as input_port:
+            report("Loopback", measure(output, input_port, args.count, args.interval_ms), args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import os
+from midi.preset_loader import compile_preset, load_preset, PresetValidationError
+
+
+class PresetBank:
+    """Banco de presets con las tablas de ruteo compiladas de antemano"""
+
+    def __init__(self):
+        self.presets = []
+        self.index = -1
+
+    def load_directory(self, directory):
+        """Compila todos los presets .json de un directorio"""
+        self.presets = []
+        self.index = -1
+        if not os.path.isdir(directory):
+            return 0
+        for file_name in sorted(os.listdir(directory)):
+            if not file_name.lower().endswith(".json"):
+                continue
+            try:
+                config, table, load_ms = load_preset(os.path.join(directory, file_name))
+            except PresetValidationError as e:
+                print(f"Preset inválido {file_name}: {e}")
+                continue
+            self.presets.append(table)
+        return len(self.presets)
+
+    def add(self, name, config):
+        """Agrega un preset al banco validando y compilando su tabla"""
+        config, table = compile_preset(config, name)
+        self.presets.append(table)
+
+    def names(self):
+        return [table.name for table in self.presets]
+
+    def find(self, name):
+        for index, table in enumerate(self.presets):
+            if table.name == name:
+                return index
+        return -1
+
+    def replace(self, old, new):
+        """Reemplaza una tabla del banco (una escena capturada); devuelve si estaba"""
+        for index, table in enumerate(self.presets):
+            if table is old:
+                self.presets[index] = new
+                return True
+        return False
+
+    def select(self, index):
+        """Selecciona un preset por índice y devuelve su tabla compilada"""
+        if not 0 <= index < len(self.presets):
+            return None
+        self.index = index
+        return self.presets[index]
+
+    def step(self, offset):
+        """Avanza (o retrocede) en el banco de forma circular"""
+        if not self.presets:
+            return None
+        return self.select((self.index + offset) % len(self.presets))
@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import time
+from config.settings import AppSettings
+from midi.osc import is_valid_address
+from midi.routing import Route, RoutingTable
+from midi.transforms import Transform, TransformError
+
+try:
+    import orjson  # Parser JSON más rápido si está instalado
+except ImportError:
+    orjson = None
+
+SWITCH_ID = re.compile(r"^btn_(\d+)$")
+MODES = ("toggle", "momentary")
+OPTIONAL_CC_KEYS = ("preset_next_cc", "preset_prev_cc", "scene_capture_cc", "tap_tempo_cc", "clock_start_cc")
+
+
+class PresetValidationError(Exception):
+    """Preset rechazado: contiene la lista completa de errores encontrados"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def parse_json(raw):
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def cc_value(value, field, errors, allow_unassigned=False):
+    """Normaliza un número de CC (int o texto numérico) a int, o None si está sin asignar"""
+    if isinstance(value, bool):
+        errors.append(f"{field}: valor inválido {value!r}")
+        return None
+    if isinstance(value, int):
+        cc = value
+    elif isinstance(value, str) and value.strip().isdigit():
+        cc = int(value)
+    elif value is None or (allow_unassigned and isinstance(value, str)):
+        return None  # "No asignado" / "Not assigned" o ausente
+    else:
+        errors.append(f"{field}: valor inválido {value!r}")
+        return None
+    if not 0 <= cc <= 127:
+        errors.append(f"{field}: fuera de rango (0-127): {cc}")
+        return None
+    return cc
+
+
+def compile_preset(data, name=""):
+    """Valida, normaliza y compila un preset en una sola pasada.
+
+    Devuelve (config normalizada, RoutingTable). Si hay cualquier error se lanza
+    PresetValidationError y no se devuelve nada parcial.
+    """
+    errors = []
+    if not isinstance(data, dict):
+        raise PresetValidationError(["el preset debe ser un objeto JSON"])
+
+    config = {}
+    for key in ("language", "input_port", "output_port", "name", "device", "network_output", "osc_output",
+                "feedback_port", "daw_feedback_port"):
+        if key in data:
+            if not isinstance(data[key], str):
+                errors.append(f"{key}: debe ser texto")
+            else:
+                config[key] = data[key]
+    if data.get("metrics_port") is not None:
+        port = data["metrics_port"]
+        if isinstance(port, bool) or not isinstance(port, int) or not 1 <= port <= 65535:
+            errors.append(f"metrics_port: puerto inválido {port!r}")
+        else:
+            config["metrics_port"] = port
+    for key in OPTIONAL_CC_KEYS:
+        if data.get(key) is not None:
+            config[key] = cc_value(data[key], key, errors)
+
+    switches = data.get("switches", {})
+    if not isinstance(switches, dict):
+        errors.append("switches: debe ser un objeto")
+        switches = {}
+    if len(switches) > AppSettings.MAX_SWITCHES:
+        errors.append(f"switches: como máximo {AppSettings.MAX_SWITCHES} (hay {len(switches)})")
+
+    routes = {}
+    input_owners = {}  # CC de entrada -> switch que lo usa
+    initial_states = {}
+    normalized_switches = {}
+    for control_id, switch_config in switches.items():
+        if not SWITCH_ID.match(str(control_id)):
+            errors.append(f"{control_id}: id de switch inválido (se espera btn_N)")
+            continue
+        if not isinstance(switch_config, dict):
+            errors.append(f"{control_id}: debe ser un objeto")
+            continue
+
+        input_cc = cc_value(switch_config.get("input_cc"), f"{control_id}.input_cc", errors, allow_unassigned=True)
+        if input_cc is not None:
+            owner = input_owners.setdefault(input_cc, control_id)
+            if owner != control_id:
+                errors.append(f"{control_id}.input_cc: el CC {input_cc} ya lo usa {owner}")
+                input_cc = None
+        output_cc = cc_value(switch_config.get("output_cc"), f"{control_id}.output_cc", errors)
+        mode = str(switch_config.get("mode", "toggle")).lower()
+        if mode not in MODES:
+            errors.append(f"{control_id}.mode: debe ser toggle o momentary")
+        state = switch_config.get("state", False)
+        if not isinstance(state, bool):
+            errors.append(f"{control_id}.state: debe ser true/false")
+            state = False
+
+        osc_address = switch_config.get("osc_address")
+        if osc_address is not None and not is_valid_address(osc_address):
+            errors.append(f"{control_id}.osc_address: dirección OSC inválida {osc_address!r}")
+            osc_address = None
+        osc_only = switch_config.get("osc_only", False)
+        if not isinstance(osc_only, bool):
+            errors.append(f"{control_id}.osc_only: debe ser true/false")
+            osc_only = False
+        transform = None
+        if switch_config.get("transform") is not None:
+            try:
+                transform = Transform(switch_config["transform"])
+            except TransformError as e:
+                errors.append(f"{control_id}.transform: {e}")
+
+        normalized = {"mode": mode, "state": state}
+        if input_cc is not None:
+            normalized["input_cc"] = str(input_cc)
+        if output_cc is not None:
+            normalized["output_cc"] = str(output_cc)
+        if osc_address is not None:
+            normalized["osc_address"] = osc_address
+            normalized["osc_only"] = osc_only
+        if transform is not None:
+            normalized["transform"] = transform.source
+        normalized_switches[control_id] = normalized
+        initial_states[control_id] = state
+
+        if input_cc is not None and (output_cc is not None or osc_address):
+            routes[input_cc] = Route(control_id, output_cc, mode == "toggle", osc_address, osc_only, transform)
+
+    scenes = data.get("scenes")
+    if scenes is not None:
+        config["scenes"] = _validate_scenes(scenes, normalized_switches, routes, errors)
+
+    if errors:
+        raise PresetValidationError(errors)
+
+    config["switches"] = normalized_switches
+    return config, RoutingTable(name, routes, initial_states, config)
+
+
+def _validate_scenes(scenes, switches, routes, errors):
+    """Normaliza {nombre: {recall_cc, switches, values}}; el CC de recall no puede ser el de un switch"""
+    if not isinstance(scenes, dict):
+        errors.append("scenes: debe ser un objeto")
+        return {}
+    normalized = {}
+    recall_ccs = set()
+    for name, scene in scenes.items():
+        if not isinstance(scene, dict):
+            errors.append(f"scenes.{name}: debe ser un objeto")
+            continue
+        recall_cc = cc_value(scene.get("recall_cc"), f"scenes.{name}.recall_cc", errors)
+        if recall_cc is None:
+            if scene.get("recall_cc") is None:
+                errors.append(f"scenes.{name}.recall_cc: falta el CC de recall")
+            continue
+        if recall_cc in routes or recall_cc in recall_ccs:
+            errors.append(f"scenes.{name}.recall_cc: el CC {recall_cc} ya está en uso")
+            continue
+        recall_ccs.add(recall_cc)
+        states = {}
+        for control_id, state in (scene.get("switches") or {}).items():
+            if control_id not in switches:
+                errors.append(f"scenes.{name}.switches: switch desconocido {control_id}")
+            elif not isinstance(state, bool):
+                errors.append(f"scenes.{name}.switches.{control_id}: debe ser true/false")
+            else:
+                states[control_id] = state
+        values = {}
+        for cc, value in (scene.get("values") or {}).items():
+            cc = cc_value(cc, f"scenes.{name}.values", errors)
+            value = cc_value(value, f"scenes.{name}.values.{cc}", errors)
+            if cc is not None and value is not None:
+                values[str(cc)] = value
+        normalized[name] = {"recall_cc": recall_cc, "switches": states}
+        if values:
+            normalized[name]["values"] = values
+    return normalized
+
+
+def load_preset(file_path, name=None):
+    """Lee, valida y compila un preset desde disco. Devuelve (config, tabla, ms de carga)"""
+    start = time.perf_counter()
+    try:
+        with open(file_path, 'rb') as f:
+            data = parse_json(f.read())
+    except (OSError, ValueError) as e:
+        raise PresetValidationError([f"{os.path.basename(file_path)}: {e}"])
+    if name is None:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+    config, table = compile_preset(data, name)
+    return config, table, (time.perf_counter() - start) * 1000
@@ -0,0 +1,255 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+# Cabecera de archivo: magic, versión, hora de inicio (epoch ns), monotonic ns de referencia y
+# largo del bloque JSON que sigue con el estado inicial ({"preset": nombre, "states": {id: bool}})
+FILE_HEADER = struct.Struct("<5sB2xQQI")
+FILE_HEADER_V1 = struct.Struct("<5sB2xQQ")  # Sin estado inicial
+# Registro fijo de 16 bytes: timestamp monotonic ns, dirección, longitud y hasta 3 bytes MIDI
+RECORD = struct.Struct("<QBB3s3x")
+RECORD_V2 = struct.Struct("<QBB3s2x")  # Versiones 1 y 2: registros de 15 bytes
+MAGIC = b"MVREC"
+VERSION = 3
+DIRECTION_IN = 0
+DIRECTION_OUT = 1        # Salida de un mensaje ruteado desde el pedal
+DIRECTION_OUT_EXTRA = 2  # Salida que no sale de un press (ráfaga de escena, API de control)
+
+
+class SessionRecorder:
+    """Graba todos los mensajes MIDI en archivos binarios de registros fijos.
+
+    En el hilo MIDI solo se agrega una tupla a una lista; un hilo de fondo
+    empaqueta y escribe por lotes, rotando los archivos por tamaño. También graban
+    los hilos de escenas, API de control y red: el lock protege el intercambio de la lista.
+    """
+
+    def __init__(self, directory, max_file_bytes, max_files, flush_interval_ms=200, engine=None):
+        self.directory = directory
+        self.engine = engine  # RoutingEngine cuyo estado va en la cabecera de cada archivo
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+        self.flush_interval = flush_interval_ms / 1000
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.recording = False
+        self.file = None
+        self.file_path = None
+        self.file_bytes = 0
+        self.records_written = 0
+        self.awake = threading.Event()  # Sin marcar: en reposo el hilo no se despierta a vaciar
+        self.awake.set()
+        self.thread = None
+
+    def start(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+        except OSError as e:
+            print(f"Error creando directorio de grabaciones: {e}")
+            return False
+        try:
+            self._rotate(self._initial_state())  # El primer archivo parte del estado actual del motor
+        except OSError as e:
+            print(f"Error creando grabación MIDI: {e}")
+            return False
+        self.recording = True
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self):
+        self.recording = False
+        self.awake.set()
+        if self.thread:
+            self.thread.join(timeout=1)
+        self._flush(final=True)
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def record(self, direction, data):
+        """Hot path: registra bytes MIDI (los de más de 3 bytes, como sysex, se ignoran)"""
+        if self.recording and len(data) <= 3:
+            with self.lock:
+                self.buffer.append((time.monotonic_ns(), direction, data))
+
+    def set_idle(self, idle):
+        """En reposo se suspende el vaciado periódico (lo pendiente se escribe al despertar)"""
+        if idle:
+            self.awake.clear()
+        else:
+            self.awake.set()
+
+    def _writer_loop(self):
+        while self.recording:
+            self.awake.wait()
+            time.sleep(self.flush_interval)
+            self._flush()
+
+    def _initial_state(self):
+        """Preset y estados activos del motor (se llama con su lock tomado o antes de rutear)"""
+        if self.engine is None:
+            return {}
+        table, states = self.engine.active
+        return {"preset": table.name, "states": dict(states)}
+
+    def _flush(self, final=False):
+        rotate = not final and self.file is not None and self.file_bytes >= self.max_file_bytes
+        if rotate and self.engine is not None:
+            # El estado para la cabecera del archivo siguiente se toma junto con el intercambio de la
+            # lista: lo pendiente (que va al archivo actual) ya está reflejado en él. Un mensaje grabado
+            # pero todavía sin procesar en este instante queda del lado del archivo anterior.
+            with self.engine.lock, self.lock:
+                pending, self.buffer = self.buffer, []
+                state = self._initial_state()
+        else:
+            # Intercambio de la lista: los que graban siguen agregando a la nueva
+            with self.lock:
+                pending, self.buffer = self.buffer, []
+            state = self._initial_state() if rotate else None
+        try:
+            if pending:
+                if self.file is None:
+                    self._rotate(self._initial_state())
+                chunk = b"".join(
+                    RECORD.pack(timestamp, direction, len(data), bytes(data))
+                    for timestamp, direction, data in pending
+                )
+                self.file.write(chunk)
+                self.file.flush()
+                self.file_bytes += len(chunk)
+                self.records_written += len(pending)
+            if rotate:
+                self._rotate(state)
+        except Exception as e:
+            print(f"Error escribiendo grabación MIDI: {e}")
+
+    def _rotate(self, state):
+        if self.file:
+            self.file.close()
+            self.file = None
+        name = time.strftime("session-%Y%m%d-%H%M%S") + f"-{time.monotonic_ns() % 1000000:06d}.mvrec"
+        self.file_path = os.path.join(self.directory, name)
+        meta = json.dumps(state, ensure_ascii=False).encode("utf-8")
+        self.file = open(self.file_path, "wb")
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, time.time_ns(), time.monotonic_ns(), len(meta)) + meta)
+        self.file_bytes = FILE_HEADER.size + len(meta)
+
+        # Conservar solo los archivos más recientes
+        recordings = sorted(
+            entry for entry in os.listdir(self.directory) if entry.endswith(".mvrec")
+        )
+        for old in recordings[:-self.max_files]:
+            try:
+                os.remove(os.path.join(self.directory, old))
+            except OSError:
+                pass
+
+
+class SessionReader:
+    """Lee una grabación .mvrec mapeándola en memoria"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        with open(file_path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = self.map[:5], self.map[5]
+        self.initial_state = None  # Las grabaciones v1 no guardan el estado inicial
+        self.record = RECORD if version == VERSION else RECORD_V2
+        if magic == MAGIC and version == 1:
+            _, _, self.start_epoch_ns, self.start_monotonic_ns = FILE_HEADER_V1.unpack_from(self.map, 0)
+            self.offset = FILE_HEADER_V1.size
+        elif magic == MAGIC and version in (2, VERSION):
+            _, _, self.start_epoch_ns, self.start_monotonic_ns, meta_size = FILE_HEADER.unpack_from(self.map, 0)
+            self.offset = FILE_HEADER.size + meta_size
+            self.initial_state = json.loads(self.map[FILE_HEADER.size:self.offset].decode("utf-8"))
+        else:
+            self.map.close()
+            raise ValueError(f"{file_path}: no es una grabación válida")
+        self.count = (len(self.map) - self.offset) // self.record.size
+
+    def close(self):
+        self.map.close()
+
+    def __iter__(self):
+        """Itera (timestamp_ns, dirección, bytes MIDI)"""
+        end = self.offset + self.count * self.record.size
+        for timestamp, direction, length, data in self.record.iter_unpack(memoryview(self.map)[self.offset:end]):
+            yield timestamp, direction, data[:length]
+
+    def summary(self):
+        counts = {DIRECTION_IN: 0, DIRECTION_OUT: 0, DIRECTION_OUT_EXTRA: 0}
+        by_type = {}
+        first = last = None
+        for timestamp, direction, data in self:
+            counts[direction] = counts.get(direction, 0) + 1
+            kind = data[0] & 0xF0 if data and data[0] < 0xF0 else (data[0] if data else 0)
+            by_type[kind] = by_type.get(kind, 0) + 1
+            first = timestamp if first is None else first
+            last = timestamp
+        duration = (last - first) / 1e9 if first is not None else 0.0
+        return {
+            "records": self.count,
+            "in": counts[DIRECTION_IN],
+            "out": counts[DIRECTION_OUT],
+            "out_extra": counts[DIRECTION_OUT_EXTRA],
+            "duration_s": duration,
+            "by_status": {f"0x{kind:02X}": n for kind, n in sorted(by_type.items())},
+        }
+
+    def export_midi(self, output_path, ticks_per_beat=480, tempo=500000):
+        """Exporta a un archivo MIDI estándar (tipo 1: pista 0 entrada, pista 1 salida)"""
+        import mido
+
+        midi_file = mido.MidiFile(type=1, ticks_per_beat=ticks_per_beat)
+        tracks = {DIRECTION_IN: mido.MidiTrack(), DIRECTION_OUT: mido.MidiTrack()}
+        tracks[DIRECTION_IN].append(mido.MetaMessage("track_name", name="MIDI IN", time=0))
+        tracks[DIRECTION_IN].append(mido.MetaMessage("set_tempo", tempo=tempo, time=0))
+        tracks[DIRECTION_OUT].append(mido.MetaMessage("track_name", name="MIDI OUT", time=0))
+        last_tick = {DIRECTION_IN: 0, DIRECTION_OUT: 0}
+
+        for timestamp, direction, data in self:
+            seconds = (timestamp - self.start_monotonic_ns) / 1e9
+            tick = max(0, int(mido.second2tick(seconds, ticks_per_beat, tempo)))
+            try:
+                msg = mido.Message.from_bytes(list(data))
+            except ValueError:
+                continue
+            if direction == DIRECTION_OUT_EXTRA:
+                direction = DIRECTION_OUT  # El archivo MIDI no distingue el origen de la salida
+            msg.time = max(0, tick - last_tick[direction])
+            last_tick[direction] = max(tick, last_tick[direction])
+            tracks[direction].append(msg)
+
+        midi_file.tracks.extend([tracks[DIRECTION_IN], tracks[DIRECTION_OUT]])
+        midi_file.save(output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumen / exportación de grabaciones MIDI (.mvrec)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    summary_parser = subparsers.add_parser("summary")
+    summary_parser.add_argument("recording")
+    export_parser = subparsers.add_parser("export")
+    export_parser.add_argument("recording")
+    export_parser.add_argument("output")
+    args = parser.parse_args()
+
+    reader = SessionReader(args.recording)
+    try:
+        if args.command == "summary":
+            for key, value in reader.summary().items():
+                print(f"{key}: {value}")
+        else:
+            reader.export_midi(args.output)
+            print(f"Exportado: {args.output}")
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import time
+from config.settings import AppSettings
+from midi.engine import RoutingEngine
+from midi.gestures import GestureDetector
+from midi.preset_bank import PresetBank
+from midi.preset_loader import load_preset, PresetValidationError
+from midi.recorder import SessionReader, DIRECTION_IN, DIRECTION_OUT
+
+STATUS_CONTROL_CHANGE = 0xB0
+STATUS_PROGRAM_CHANGE = 0xC0
+
+
+class VirtualClock:
+    """Reloj que solo avanza con los timestamps grabados (comportamiento temporal determinista)"""
+
+    def __init__(self):
+        self.now_ns = 0
+
+    def monotonic(self):
+        return self.now_ns / 1e9
+
+
+class CaptureOutput:
+    """Reemplaza a MidiManager en el replay: guarda cada CC ruteado desde el pedal en lugar de enviarlo"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.sent = []
+
+    def send_cc(self, control, value, direction=DIRECTION_OUT):
+        # Las ráfagas de escena y la API se graban aparte y no entran en la comparación
+        if direction == DIRECTION_OUT:
+            self.sent.append((self.clock.now_ns, (STATUS_CONTROL_CHANGE, int(control), value)))
+        return True
+
+    def send_osc(self, packet):
+        pass  # Solo se comparan las salidas MIDI grabadas
+
+
+def load_events(file_path):
+    """Lee una grabación (.mvrec) o un archivo MIDI estándar.
+
+    Devuelve ([(ns, dirección, bytes)], estado inicial o None). Solo las grabaciones .mvrec
+    actuales guardan el estado inicial ({"preset": nombre, "states": {id: bool}}).
+    """
+    if file_path.lower().endswith((".mid", ".midi")):
+        return _load_midi_file(file_path), None
+    reader = SessionReader(file_path)
+    try:
+        return [(timestamp, direction, tuple(data)) for timestamp, direction, data in reader], reader.initial_state
+    finally:
+        reader.close()
+
+
+def _load_midi_file(file_path):
+    import mido
+
+    midi_file = mido.MidiFile(file_path)
+    tempo = 500000
+    for msg in midi_file.tracks[0] if midi_file.tracks else []:
+        if msg.type == "set_tempo":
+            tempo = msg.tempo
+            break
+
+    events = []
+    for track in midi_file.tracks:
+        # Las exportaciones del grabador separan la salida en la pista "MIDI OUT"
+        direction = DIRECTION_IN
+        ticks = 0
+        for msg in track:
+            ticks += msg.time
+            if msg.is_meta:
+                if msg.type == "track_name" and msg.name == "MIDI OUT":
+                    direction = DIRECTION_OUT
+                continue
+            seconds = mido.tick2second(ticks, midi_file.ticks_per_beat, tempo)
+            events.append((int(seconds * 1e9), direction, tuple(msg.bytes())))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+class ReplayResult:
+    def __init__(self, produced, expected, processed, elapsed_ns, engine_ns):
+        self.produced = produced
+        self.expected = expected
+        self.processed = processed
+        self.elapsed_ns = elapsed_ns
+        self.engine_ns = engine_ns
+        self.mismatches = [
+            (index, expected_msg, produced_msg)
+            for index, (expected_msg, produced_msg) in enumerate(zip(expected, produced))
+            if expected_msg != produced_msg
+        ]
+
+    @property
+    def matches(self):
+        return not self.mismatches and len(self.produced) == len(self.expected)
+
+    def report(self, max_mismatches=10):
+        lines = [
+            f"Entradas procesadas: {self.processed}",
+            f"Salidas: producidas {len(self.produced)} / grabadas {len(self.expected)}",
+            f"Tiempo total: {self.elapsed_ns / 1e6:.1f} ms",
+        ]
+        if self.processed and self.engine_ns:
+            lines.append(
+                f"Motor: {self.engine_ns / self.processed:.0f} ns/mensaje "
+                f"({self.processed * 1e9 / self.engine_ns:.0f} mensajes/s)"
+            )
+        if self.matches:
+            lines.append("Salidas idénticas a la grabación")
+        for index, expected_msg, produced_msg in self.mismatches[:max_mismatches]:
+            lines.append(f"  #{index}: grabado {_hex(expected_msg)} / producido {_hex(produced_msg)}")
+        if len(self.produced) != len(self.expected):
+            lines.append(f"  Diferencia de cantidad: {len(self.produced) - len(self.expected):+d}")
+        return "\n".join(lines)
+
+
+def _hex(data):
+    return " ".join(f"{byte:02X}" for byte in data)
+
+
+class ReplayEngine:
+    """Alimenta un RoutingEngine con eventos grabados usando un reloj virtual"""
+
+    def __init__(self, table, bank=None, gesture_cc=None, initial_state=None):
+        self.clock = VirtualClock()
+        self.output = CaptureOutput(self.clock)
+        self.engine = RoutingEngine(self.output)
+        self.bank = bank
+        states = None
+        if initial_state:
+            # Se parte del preset y los estados que había al empezar a grabar (p. ej. la sesión restaurada)
+            if bank is not None and bank.find(initial_state.get("preset")) >= 0:
+                table = bank.presets[bank.find(initial_state["preset"])]
+            recorded = initial_state.get("states", {})
+            states = {control_id: bool(recorded.get(control_id, state)) for control_id, state in table.initial_states.items()}
+        self.engine.swap_table(table, states)
+
+        if bank is not None:
+            bank.index = bank.find(table.name)
+            config = table.config
+            self.engine.bind_action(config.get("preset_next_cc"), lambda: self.step_preset(1))
+            self.engine.bind_action(config.get("preset_prev_cc"), lambda: self.step_preset(-1))
+            if gesture_cc is not None:
+                self.engine.bind_handler(gesture_cc, GestureDetector(
+                    lambda: self.step_preset(1), lambda: self.step_preset(-1),
+                    clock=self.clock.monotonic
+                ))
+
+    def step_preset(self, offset):
+        table = self.bank.step(offset)
+        if table is not None:
+            self.engine.swap_table(table)
+
+    def select_preset(self, index):
+        table = self.bank.select(index) if self.bank is not None else None
+        if table is not None:
+            self.engine.swap_table(table)
+
+    def run(self, events, speed=None):
+        """Reproduce los eventos. speed=None: lo más rápido posible; 1.0: tiempo original"""
+        self.output.sent = []
+        expected = [data for timestamp, direction, data in events if direction == DIRECTION_OUT]
+        process_cc = self.engine.process_cc
+        clock = self.clock
+        processed = 0
+        engine_ns = 0
+        start = time.perf_counter_ns()
+        origin = events[0][0] if events else 0
+
+        for timestamp, direction, data in events:
+            if direction != DIRECTION_IN or not data:
+                continue
+            clock.now_ns = timestamp
+            if speed:
+                # Pacing real: el reloj virtual no depende de qué tan puntual sea el sleep
+                delay = (timestamp - origin) / speed - (time.perf_counter_ns() - start)
+                if delay > 0:
+                    time.sleep(delay / 1e9)
+
+            status = data[0] & 0xF0
+            if status == STATUS_CONTROL_CHANGE and len(data) == 3:
+                before = time.perf_counter_ns()
+                process_cc(data[1], data[2])
+                engine_ns += time.perf_counter_ns() - before
+                processed += 1
+            elif status == STATUS_PROGRAM_CHANGE and len(data) == 2:
+                self.select_preset(data[1])
+
+        produced = [data for timestamp, data in self.output.sent]
+        return ReplayResult(produced, expected, processed, time.perf_counter_ns() - start, engine_ns)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay determinista de sesiones MIDI grabadas")
+    parser.add_argument("recording", help="Grabación .mvrec o archivo .mid")
+    parser.add_argument("--preset", default=AppSettings.DEFAULT_CONFIG_FILE, help="Configuración a usar")
+    parser.add_argument("--bank", help="Directorio de presets para Program Change / preset_next_cc")
+    parser.add_argument("--gesture-cc", type=int, help="CC de gesto tap / pulsación larga")
+    parser.add_argument("--speed", type=float, default=0, help="Multiplicador de velocidad (0 = lo más rápido posible)")
+    parser.add_argument("--repeat", type=int, default=1, help="Repeticiones (para medir throughput)")
+    args = parser.parse_args()
+
+    try:
+        config, table, load_ms = load_preset(args.preset)
+    except PresetValidationError as e:
+        print(f"Preset inválido: {e}")
+        return 1
+    bank = None
+    if args.bank:
+        bank = PresetBank()
+        bank.load_directory(args.bank)
+
+    events, initial_state = load_events(args.recording)
+    print(f"{len(events)} eventos cargados de {args.recording}")
+    if initial_state is None:
+        print("Aviso: la grabación no guarda el estado inicial; se parte de los estados del preset")
+    result = None
+    for run in range(args.repeat):
+        # Motor nuevo en cada pasada para partir siempre del mismo estado
+        result = ReplayEngine(table, bank, args.gesture_cc, initial_state).run(events, args.speed or None)
+        if args.repeat > 1:
+            print(f"Pasada {run + 1}: {result.engine_ns / max(result.processed, 1):.0f} ns/mensaje")
+    print(result.report())
+    return 0 if result.matches else 2
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
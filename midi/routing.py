@@ -0,0 +1,42 @@
+from midi.osc import encode_message
+from midi.scenes import compile_scenes
+
+
+def switch_slot(control_id):
+    """Posición numérica de un switch a partir de su id ('btn_3' -> 3)"""
+    try:
+        return int(str(control_id).rsplit('_', 1)[1])
+    except (IndexError, ValueError):
+        return -1
+
+
+class Route:
+    """Entrada precompilada de la tabla de ruteo para un CC de entrada"""
+    __slots__ = ("control_id", "output_cc", "is_toggle", "slot", "osc_address", "osc_packets", "send_midi", "transform")
+
+    def __init__(self, control_id, output_cc, is_toggle, osc_address=None, osc_only=False, transform=None):
+        self.control_id = control_id
+        self.output_cc = output_cc
+        self.is_toggle = is_toggle
+        self.slot = switch_slot(control_id)
+        self.osc_address = osc_address
+        # Paquetes OSC precodificados por estado: (apagado, encendido)
+        self.osc_packets = (encode_message(osc_address, 0), encode_message(osc_address, 1)) if osc_address else None
+        self.send_midi = output_cc is not None and not (osc_only and osc_address)
+        self.transform = transform  # Transform compilada o None
+
+
+class RoutingTable:
+    """Tabla de ruteo inmutable compilada a partir de una configuración"""
+
+    def __init__(self, name="", routes=None, initial_states=None, config=None):
+        self.name = name
+        self.routes = routes or {}
+        self.initial_states = initial_states or {}
+        self.config = config or {}
+        # CC de salida -> (CC de entrada, Route), para aplicar el feedback que llega del DAW
+        self.outputs = {route.output_cc: (cc, route) for cc, route in self.routes.items() if route.send_midi}
+        # CC de recall -> Scene, con sus salidas ya resueltas contra estas rutas
+        scenes = self.config.get("scenes")
+        self.scenes = compile_scenes(scenes, self.routes) if isinstance(scenes, dict) else {}
+
@@ -0,0 +1,91 @@
+import queue
+import threading
+import time
+from config.settings import AppSettings
+from midi.metrics import Histogram, LAG_BUCKETS_NS
+
+NO_VALUE = 255  # La escena no fija ese CC de salida
+
+
+class Scene:
+    """Escena precompilada: estados de los switches y valor de salida por CC (bytearray de 128)"""
+    __slots__ = ("name", "recall_cc", "states", "outputs", "targets")
+
+    def __init__(self, name, recall_cc, states, outputs):
+        self.name = name
+        self.recall_cc = recall_cc
+        self.states = states
+        self.outputs = outputs
+        # Solo los CC que la escena fija, para no recorrer los 128 en cada recall
+        self.targets = [(cc, value) for cc, value in enumerate(outputs) if value != NO_VALUE]
+
+
+def compile_scenes(scenes_config, routes):
+    """Compila {nombre: {recall_cc, switches, values}} en {CC de recall: Scene} con las rutas de la tabla"""
+    by_control = {route.control_id: route for route in routes.values()}
+    scenes = {}
+    for name, scene_config in scenes_config.items():
+        try:
+            recall_cc = int(scene_config.get("recall_cc"))
+        except (AttributeError, TypeError, ValueError):
+            continue
+        if not 0 <= recall_cc <= 127 or recall_cc in routes or recall_cc in scenes:
+            continue
+        outputs = bytearray([NO_VALUE]) * 128
+        states = {}
+        for control_id, state in scene_config.get("switches", {}).items():
+            states[control_id] = bool(state)
+            route = by_control.get(control_id)
+            if route is not None and route.send_midi:
+                outputs[route.output_cc] = 127 if state else 0
+        for cc, value in scene_config.get("values", {}).items():
+            try:
+                cc, value = int(cc), int(value)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= cc <= 127 and 0 <= value <= 127:
+                outputs[cc] = value
+        scenes[recall_cc] = Scene(name, recall_cc, states, outputs)
+    return scenes
+
+
+class ScenePlayer:
+    """Envía la ráfaga de cada recall en su propio hilo, espaciada, sin bloquear el hilo MIDI.
+
+    Las ráfagas se envían en orden; on_done recibe (escena, CCs enviados, ns desde el press).
+    """
+
+    def __init__(self, send_cc, pace_ms=None, on_done=None):
+        self.send_cc = send_cc
+        self.pace = (AppSettings.SCENE_PACE_MS if pace_ms is None else pace_ms) / 1000
+        self.on_done = on_done
+        self.queue = queue.SimpleQueue()
+        self.recalls = 0
+        self.sent = 0
+        self.durations = Histogram(LAG_BUCKETS_NS)
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def play(self, scene, burst, started_ns):
+        self.queue.put((scene, burst, started_ns))
+
+    def _loop(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            scene, burst, started_ns = item
+            for index, (cc, value) in enumerate(burst):
+                if index and self.pace:
+                    time.sleep(self.pace)
+                self.send_cc(cc, value)
+            elapsed_ns = time.perf_counter_ns() - started_ns
+            self.recalls += 1
+            self.sent += len(burst)
+            self.durations.observe(elapsed_ns)
+            if self.on_done:
+                self.on_done(scene, len(burst), elapsed_ns)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join(timeout=1)
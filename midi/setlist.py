@@ -0,0 +1,127 @@
+import os
+import queue
+import threading
+from midi.preset_loader import cc_value, load_preset, PresetValidationError
+from utils.file_utils import FileManager
+
+
+class SetlistSong:
+    def __init__(self, title, preset_path, config):
+        self.title = title
+        self.preset_path = preset_path
+        self.config = config
+
+
+class Setlist:
+    """Lista de canciones de un show.
+
+    Todas las tablas se validan y compilan al cargar el setlist (al empezar el show), así que
+    cambiar de canción es solo un intercambio de referencia. La posición se guarda en un hilo
+    de fondo para no escribir a disco desde el hilo MIDI.
+    """
+
+    def __init__(self, state_file):
+        self.state_file = state_file
+        self.path = None
+        self.name = ""
+        self.songs = []
+        self.index = -1
+        self.next_cc = None
+        self.prev_cc = None
+        self.gesture_cc = None
+        self.tables = []
+        self.positions = queue.Queue()
+        self.worker = threading.Thread(target=self._persist_loop, daemon=True)
+        self.worker.start()
+
+    def load(self, path):
+        """Carga y valida todo el setlist. Devuelve la lista de errores encontrados"""
+        data = FileManager.load_configuration(path)
+        if not isinstance(data, dict) or not isinstance(data.get("songs"), list):
+            return [f"{path}: formato de setlist inválido"]
+
+        base_dir = os.path.dirname(os.path.abspath(path))
+        errors = []
+        controls = {}
+        for key in ("next_cc", "prev_cc", "gesture_cc"):
+            controls[key] = cc_value(data.get(key), key, errors)
+        songs = []
+        tables = []
+        for position, entry in enumerate(data["songs"], start=1):
+            if isinstance(entry, str):
+                entry = {"preset": entry}
+            preset = entry.get("preset") if isinstance(entry, dict) else None
+            if not isinstance(preset, str) or not preset:
+                errors.append(f"#{position}: falta el preset")
+                continue
+            title = entry.get("title")
+            if title is not None and not isinstance(title, str):
+                errors.append(f"#{position}: title debe ser texto")
+                continue
+            preset_path = preset if os.path.isabs(preset) else os.path.join(base_dir, preset)
+            try:
+                config, table, load_ms = load_preset(preset_path, title or None)
+            except PresetValidationError as e:
+                errors.extend(f"#{position} {preset}: {error}" for error in e.errors)
+                continue
+            tables.append(table)
+            songs.append(SetlistSong(table.name, preset_path, config))
+
+        if errors:
+            return errors
+
+        # Solo se reemplaza el setlist activo si todo es válido
+        self.path = os.path.abspath(path)
+        self.name = data.get("name", os.path.splitext(os.path.basename(path))[0])
+        self.songs = songs
+        self.next_cc = controls["next_cc"]
+        self.prev_cc = controls["prev_cc"]
+        self.gesture_cc = controls["gesture_cc"]
+        self.tables = tables
+        self.index = -1
+        return []
+
+    def saved_position(self):
+        """Posición guardada para este setlist (0 si no hay ninguna)"""
+        state = FileManager.load_configuration(self.state_file)
+        if isinstance(state, dict) and state.get("setlist") == self.path:
+            index = state.get("index", 0)
+            if isinstance(index, int) and 0 <= index < len(self.songs):
+                return index
+        return 0
+
+    def saved_setlist_path(self):
+        state = FileManager.load_configuration(self.state_file)
+        if isinstance(state, dict):
+            return state.get("setlist")
+        return None
+
+    def select(self, index):
+        """Selecciona una canción y devuelve su tabla. Nunca escribe a disco en el hilo llamante"""
+        if not 0 <= index < len(self.songs):
+            return None
+        self.index = index
+        self.positions.put_nowait(index)
+        return self.tables[index]
+
+    def replace(self, old, new):
+        """Reemplaza la tabla de una canción (una escena capturada); devuelve si estaba"""
+        for index, table in enumerate(self.tables):
+            if table is old:
+                self.tables[index] = new
+                return True
+        return False
+
+    def current_song(self):
+        if 0 <= self.index < len(self.songs):
+            return self.songs[self.index]
+        return None
+
+    def _persist_loop(self):
+        """Hilo de fondo: guarda la última posición seleccionada"""
+        while True:
+            index = self.positions.get()
+            try:
+                FileManager.save_configuration({"setlist": self.path, "index": index}, self.state_file)
+            except Exception as e:
+                print(f"Error guardando la posición del setlist: {e}")
@@ -0,0 +1,344 @@
+import argparse
+import collections
+import gc
+import json
+import random
+import threading
+import time
+import mido
+from midi.engine import RoutingEngine
+from midi.feedback import FeedbackSync
+from midi.manager import MidiManager
+from midi.metrics import BridgeMetrics
+from midi.preset_loader import compile_preset, load_preset, PresetValidationError
+from midi.scenes import ScenePlayer
+from midi.stats import percentiles, rss_bytes
+
+SCENE_CC = 100  # CC de recall de la escena del preset sintético
+
+
+def soak_preset(index, switches=16):
+    """Preset sintético: toggles y momentary, una transformación y una escena, con estados según index"""
+    config = {"switches": {}, "scenes": {"soak": {"recall_cc": SCENE_CC, "switches": {}}}}
+    for number in range(switches):
+        control_id = f"btn_{number}"
+        config["switches"][control_id] = {
+            "input_cc": number + 20, "output_cc": number + 60,
+            "mode": "toggle" if number % 2 == 0 else "momentary", "state": (number + index) % 3 == 0,
+        }
+        config["scenes"]["soak"]["switches"][control_id] = number % 2 == index % 2
+    config["switches"]["btn_1"]["transform"] = "value if on('btn_0') else None"
+    return compile_preset(config, f"soak-{index}")[1]
+
+
+class FakeInput:
+    """Puerto de entrada falso: el generador llama a callback como lo haría el hilo de rtmidi"""
+
+    def __init__(self):
+        self.callback = None
+
+    def close(self):
+        self.callback = None
+
+
+class FakeOutput:
+    """Puerto de salida falso: mide el tiempo desde que el mensaje de entrada se generó"""
+
+    def __init__(self, soak):
+        self.soak = soak
+        self.sent = 0
+
+    def send(self, msg):
+        self.sent += 1
+        self.soak.observe_output()
+
+    def close(self):
+        pass
+
+
+class Soak:
+    """Corre el bridge contra el backend falso con tráfico realista y muestrea tendencias.
+
+    Sin --gui se arma lo mismo que corre en el hilo MIDI (MidiManager con su hilo de escucha,
+    RoutingEngine, feedback, escenas, transformaciones, cambios de preset y scrape de métricas);
+    con --gui los mensajes entran por MidiBridgeApp.on_midi_message, igual que con puertos reales.
+    """
+
+    def __init__(self, rate, seed, tables, app=None):
+        self.rate = rate
+        self.random = random.Random(seed)
+        self.tables = tables
+        self.app = app
+        self.running = False
+        self.messages = 0
+        self.current_sent_ns = 0
+        self.window = []  # Latencias de la ventana actual (se vacía en cada muestra)
+        self.samples = []
+        self.input = FakeInput()
+        self.output = FakeOutput(self)
+        if app is None:
+            self.manager = MidiManager()
+            self.engine = RoutingEngine(self.manager)
+            self.engine.swap_table(tables[0])
+            self.engine.feedback = FeedbackSync(lambda cc, value: None, pace_ms=0, batch_ms=1)
+            self.engine.scene_player = ScenePlayer(self.manager.send_cc, pace_ms=0)
+            self.metrics = BridgeMetrics(self.manager, self.engine, scene_player=self.engine.scene_player)
+            callback = self._route
+        else:
+            app.midi_manager.disconnect_ports()
+            self.manager = app.midi_manager
+            self.engine = app.routing_engine
+            self.metrics = app.metrics
+            # Las tablas del soak pasan a ser el banco de la app: los program change las alternan
+            # por activate_preset y la UI muestra los switches que reciben el tráfico
+            app.preset_bank.presets = list(tables)
+            app.preset_bank.index = -1
+            app.preset_menu.configure(values=app.preset_bank.names(), state="normal")
+            app.activate_preset(0)
+            callback = app.on_midi_message
+        self.manager.attach_ports(self.input, self.output, self._timed(callback), "soak", "soak")
+        self.probes = self._probes()
+
+    def _timed(self, callback):
+        def on_message(msg):
+            self.current_sent_ns = msg.time
+            callback(msg)
+        return on_message
+
+    def _route(self, msg):
+        """Lo mismo que hace la app en el hilo MIDI, sin UI"""
+        if msg.type == "control_change":
+            self.engine.process_cc(msg.control, msg.value)
+        elif msg.type == "program_change":
+            self.engine.swap_table(self.tables[msg.program % len(self.tables)])
+
+    def observe_output(self):
+        self.window.append(time.perf_counter_ns() - self.current_sent_ns)
+
+    def _probes(self):
+        """Tamaño de cada contenedor que podría crecer, por componente"""
+        engine = self.engine
+        probes = {
+            "manager.inbox": lambda: self.manager.inbox.qsize(),
+            "engine.activations": lambda: len(engine.activations),
+            "engine.transform_stats": lambda: len(engine.transform_stats),
+            "engine.actions": lambda: len(engine.actions),
+        }
+        if engine.feedback is not None:
+            feedback = engine.feedback
+            probes["feedback.pending"] = lambda: len(feedback.pending)
+            probes["feedback.echo"] = lambda: len(feedback.device_echo.pending)
+        if engine.scene_player is not None:
+            probes["scene_player.queue"] = lambda: engine.scene_player.queue.qsize()
+        if self.app is not None:
+            app = self.app
+            console = app.console_panel
+            probes["console.lines"] = lambda: int(console.console.index("end-1c").split(".")[0])
+            probes["console.pending"] = lambda: len(console.pending)
+            probes["tk.images"] = lambda: len(app.tk.call("image", "names"))
+            probes["tk.after"] = lambda: len(app.tk.call("after", "info"))
+            probes["recorder.buffer"] = lambda: len(app.recorder.buffer)
+        return probes
+
+    def traffic(self):
+        """Taps (press y release) sobre los switches, recalls de escena y cambios de preset"""
+        table = self.tables[0]
+        controls = sorted(table.routes)
+        interval_ns = int(1e9 / self.rate)
+        next_ns = time.perf_counter_ns()
+        while self.running:
+            roll = self.random.random()
+            if roll < 0.001:
+                messages = [mido.Message("program_change", program=self.random.randrange(len(self.tables)))]
+            elif roll < 0.01:
+                messages = [mido.Message("control_change", control=SCENE_CC, value=127),
+                            mido.Message("control_change", control=SCENE_CC, value=0)]
+            else:
+                control = self.random.choice(controls)
+                messages = [mido.Message("control_change", control=control, value=127),
+                            mido.Message("control_change", control=control, value=0)]
+            for msg in messages:
+                next_ns += interval_ns
+                remaining = next_ns - time.perf_counter_ns()
+                if remaining > 0:
+                    time.sleep(remaining / 1e9)
+                msg.time = time.perf_counter_ns()
+                callback = self.input.callback
+                if callback is None:
+                    return
+                callback(msg)
+                self.messages += 1
+
+    def sample(self, started):
+        """Una muestra: RSS, hilos, objetos por tipo, latencias de la ventana y sondas"""
+        self.metrics.render()  # Como un scrape de Prometheus
+        window, self.window = self.window, []
+        gc.collect()
+        # Las muestras anteriores crecen a propósito: no se cuentan como objetos del bridge
+        own = {id(self.samples)}
+        for previous in self.samples:
+            own.update(id(value) for value in previous.values())
+            own.add(id(previous))
+        objects = dict(collections.Counter(type(obj).__name__ for obj in gc.get_objects() if id(obj) not in own))
+        latency = percentiles(window)
+        self.samples.append({
+            "t": time.monotonic() - started,
+            "messages": self.messages,
+            "rss": rss_bytes(),
+            "threads": threading.active_count(),
+            "p50_us": latency.get("p50", 0) / 1000,
+            "p99_us": latency.get("p99", 0) / 1000,
+            "objects": objects,
+            "probes": {name: probe() for name, probe in self.probes.items()},
+        })
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.traffic, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.thread.join(timeout=2)
+        if self.app is None:
+            self.manager.disconnect_ports()
+            self.engine.feedback.close()
+            self.engine.scene_player.close()
+
+
+def slope_per_hour(points):
+    """Pendiente por mínimos cuadrados de [(segundos, valor)], en unidades por hora"""
+    if len(points) < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in points) / len(points)
+    mean_v = sum(v for _, v in points) / len(points)
+    variance = sum((t - mean_t) ** 2 for t, _ in points)
+    if not variance:
+        return 0.0
+    return sum((t - mean_t) * (v - mean_v) for t, v in points) / variance * 3600
+
+
+def analyze(samples, limits, warmup=0.2):
+    """Tendencias después del calentamiento: filas [(nombre, inicio, fin, tendencia/h, límite, ok)]"""
+    steady = samples[int(len(samples) * warmup):]
+    if len(steady) < 3:
+        steady = samples
+    first, last = steady[0], steady[-1]
+    rows = []
+
+    def check(name, key, limit, floor, scale=1.0):
+        points = [(sample["t"], key(sample) * scale) for sample in steady]
+        slope = slope_per_hour(points)
+        growth = points[-1][1] - points[0][1]
+        rows.append((name, points[0][1], points[-1][1], slope, limit, not (slope > limit and growth > floor)))
+
+    if first["rss"] is not None:
+        check("rss_mb", lambda s: s["rss"], limits.rss_mb_per_hour, 1.0, 1 / 2**20)
+    check("threads", lambda s: s["threads"], limits.thread_growth, limits.thread_growth)
+    for name in first["probes"]:
+        check(name, lambda s, name=name: s["probes"][name], limits.probe_per_hour, 50)
+
+    # Latencia: p99 mediano del último cuarto contra el del primero
+    quarter = max(1, len(steady) // 4)
+    before = sorted(sample["p99_us"] for sample in steady[:quarter])[quarter // 2]
+    after = sorted(sample["p99_us"] for sample in steady[-quarter:])[quarter // 2]
+    ratio = after / before if before else 1.0
+    rows.append(("p99_us", before, after, ratio, limits.p99_growth,
+                 not (ratio > limits.p99_growth and after - before > 100)))
+
+    growing = []
+    for type_name in set(first["objects"]) | set(last["objects"]):
+        points = [(sample["t"], sample["objects"].get(type_name, 0)) for sample in steady]
+        growth = points[-1][1] - points[0][1]
+        if growth > 0:
+            growing.append((type_name, points[0][1], points[-1][1], slope_per_hour(points)))
+    growing.sort(key=lambda item: item[3], reverse=True)
+    for type_name, start, end, slope in growing[:limits.top]:
+        rows.append((f"objects.{type_name}", start, end, slope, limits.objects_per_hour,
+                     not (slope > limits.objects_per_hour and end - start > 200)))
+    return rows
+
+
+def report(rows, samples):
+    first, last = samples[0], samples[-1]
+    hours = last["t"] / 3600
+    print(f"{last['messages']} mensajes en {last['t']:.0f} s ({last['messages'] / max(last['t'], 1e-9):.0f} msg/s), "
+          f"{len(samples)} muestras")
+    print(f"{'componente':32s} {'inicio':>12s} {'fin':>12s} {'tendencia/h':>12s} {'límite':>10s}")
+    for name, start, end, trend, limit, ok in rows:
+        print(f"{name:32s} {start:12.1f} {end:12.1f} {trend:12.1f} {limit:10.1f}  {'ok' if ok else 'CRECE'}")
+    if hours < 0.05:
+        print("Aviso: corrida corta, las tendencias por hora son extrapolaciones")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak test: memoria, objetos, hilos y latencia a lo largo del tiempo")
+    parser.add_argument("--duration", type=float, default=3600, help="Segundos")
+    parser.add_argument("--rate", type=float, default=500, help="Mensajes/s (un músico real manda pocos por segundo)")
+    parser.add_argument("--interval", type=float, default=10, help="Segundos entre muestras")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--preset", action="append", help="Presets a alternar (por defecto dos sintéticos)")
+    parser.add_argument("--gui", action="store_true", help="Incluye la ventana (necesita display)")
+    parser.add_argument("--report", help="Guarda las muestras y el análisis en este JSON")
+    parser.add_argument("--rss-mb-per-hour", type=float, default=10)
+    parser.add_argument("--objects-per-hour", type=float, default=5000, help="Por tipo de objeto")
+    parser.add_argument("--probe-per-hour", type=float, default=1000, help="Por contenedor sondeado")
+    parser.add_argument("--thread-growth", type=float, default=0)
+    parser.add_argument("--p99-growth", type=float, default=1.5, help="Cociente máximo p99 final / inicial")
+    parser.add_argument("--top", type=int, default=10, help="Tipos de objeto que más crecen a listar")
+    args = parser.parse_args()
+
+    if args.preset:
+        try:
+            tables = [load_preset(path)[1] for path in args.preset]
+        except PresetValidationError as e:
+            print(f"Preset inválido: {e}")
+            return 1
+    else:
+        tables = [soak_preset(0), soak_preset(1)]
+
+    app = None
+    if args.gui:
+        from ui.main_window import MidiBridgeApp
+        app = MidiBridgeApp()
+    soak = Soak(args.rate, args.seed, tables, app)
+    started = time.monotonic()
+    soak.sample(started)
+    soak.start()
+
+    if app is None:
+        while time.monotonic() - started < args.duration:
+            time.sleep(min(args.interval, max(0.0, args.duration - (time.monotonic() - started))))
+            soak.sample(started)
+    else:
+        def tick():
+            soak.sample(started)
+            if time.monotonic() - started < args.duration:
+                app.after(int(args.interval * 1000), tick)
+            else:
+                app.quit()
+        app.after(int(args.interval * 1000), tick)
+        app.mainloop()
+    soak.stop()
+    if app is not None:
+        app.on_closing()
+
+    rows = analyze(soak.samples, args)
+    report(rows, soak.samples)
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump({
+                "samples": [dict(sample, objects=dict(collections.Counter(sample["objects"]).most_common(50)))
+                            for sample in soak.samples],
+                "trends": [{"name": name, "start": start, "end": end, "per_hour": trend, "limit": limit, "ok": ok}
+                           for name, start, end, trend, limit, ok in rows],
+            }, f, indent=2)
+    failed = [row[0] for row in rows if not row[5]]
+    if failed:
+        print("FALLA: crecen " + ", ".join(failed))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,113 @@
+import argparse
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from config.settings import AppSettings
+from midi.network import NetworkOutput
+from midi.preset_loader import parse_json
+from midi.stats import percentiles
+
+
+def mapped_input_cc(directory):
+    """Primer CC de entrada asignado en la configuración que cargará la app (autosave primero)"""
+    for name in (AppSettings.AUTOSAVE_FILE, AppSettings.DEFAULT_CONFIG_FILE):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, "rb") as f:
+                config = parse_json(f.read())
+        except (OSError, ValueError):
+            continue
+        for switch in config.get("switches", {}).values():
+            value = str(switch.get("input_cc", ""))
+            if value.isdigit():
+                return int(value)
+    return None
+
+
+def _read_lines(stream, lines):
+    for line in stream:
+        lines.put((time.perf_counter(), line))
+    lines.put((time.perf_counter(), None))
+
+
+def run_once(directory, port, cc, timeout, interval_ms=2):
+    """Lanza main.py, le envía el CC por MIDI de red hasta que lo rutea y devuelve sus hitos en ms"""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py", "--startup-report", str(port)],
+        cwd=directory, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+    )
+    lines = queue.Queue()
+    threading.Thread(target=_read_lines, args=(process.stdout, lines), daemon=True).start()
+    output = NetworkOutput("127.0.0.1", port, redundancy=0)
+    marks = None
+    value = 127
+    try:
+        deadline = start + timeout
+        while marks is None and time.perf_counter() < deadline:
+            # Alterna 127/0 para que el switch cambie sea toggle o momentáneo y cualquiera sea su estado
+            output.send((0xB0, cc, value))
+            value = 0 if value else 127
+            try:
+                received, line = lines.get(timeout=interval_ms / 1000)
+            except queue.Empty:
+                continue
+            if line is None:
+                break
+            if line.startswith("STARTUP "):
+                marks = dict(
+                    (name, float(ms)) for name, ms in (item.split("=") for item in line.split()[1:])
+                )
+                marks["wall"] = (received - start) * 1000
+    finally:
+        output.close()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return marks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de arranque: tiempo hasta el primer mensaje ruteado")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--cc", type=int, help="CC de entrada a enviar (por defecto el primero asignado)")
+    parser.add_argument("--port", type=int, default=AppSettings.NETWORK_MIDI_PORT + 10, help="Puerto UDP de prueba")
+    parser.add_argument("--timeout", type=float, default=30, help="Segundos máximos por arranque")
+    parser.add_argument("--cold", action="store_true", help="Borra la caché de recursos antes de cada arranque")
+    parser.add_argument("--dir", default=".", help="Directorio de la app (donde está main.py)")
+    args = parser.parse_args()
+
+    cc = args.cc if args.cc is not None else mapped_input_cc(args.dir)
+    if cc is None:
+        parser.error("la configuración no tiene switches con CC de entrada; indique --cc")
+
+    results = []
+    for index in range(args.runs):
+        if args.cold:
+            cache = os.path.join(args.dir, AppSettings.RESOURCE_CACHE_FILE)
+            if os.path.exists(cache):
+                os.remove(cache)
+        marks = run_once(args.dir, args.port, cc, args.timeout)
+        if marks is None:
+            print(f"Arranque {index + 1}: sin mensaje ruteado en {args.timeout:.0f} s")
+            continue
+        results.append(marks)
+        print(f"Arranque {index + 1}: " + " ".join(f"{name}={ms:.0f}ms" for name, ms in marks.items()))
+
+    if not results:
+        sys.exit(1)
+    print(f"\n{len(results)}/{args.runs} arranques (ms desde el inicio del proceso):")
+    names = [name for name in results[0] if all(name in marks for marks in results)]
+    for name in names:
+        stats = percentiles([marks[name] for marks in results])
+        print(f"  {name:12s} " + ", ".join(f"{key} {value:.1f}" for key, value in stats.items()))
+
+
+if __name__ == "__main__":
+    main()
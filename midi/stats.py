@@ -0,0 +1,39 @@
+import time
+
+try:
+    import resource  # Solo Unix: cambios de contexto del proceso
+except ImportError:
+    resource = None
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Percentiles (nearest-rank) y máximo de una lista de valores"""
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {f"p{point}": ordered[min(len(ordered) - 1, len(ordered) * point // 100)] for point in points}
+    result["max"] = ordered[-1]
+    return result
+
+
+
+def rss_bytes():
+    """Memoria residente actual del proceso, o None si no se puede leer"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (OSError, AttributeError, ValueError, IndexError):
+        pass
+    try:
+        import psutil  # Opcional: macOS y Windows
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def process_usage():
+    """(segundos de CPU del proceso, cambios de contexto o None si la plataforma no los informa)"""
+    if resource is None:
+        return time.process_time(), None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime, usage.ru_nvcsw + usage.ru_nivcsw
\ No newline at end of file
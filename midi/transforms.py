@@ -0,0 +1,153 @@
+import ast
+import time
+from config.settings import AppSettings
+
+# Lo único que una expresión puede llamar
+SAFE_BUILTINS = {
+    "abs": abs, "min": min, "max": max, "round": round, "int": int, "bool": bool,
+    "all": all, "any": any, "len": len,
+}
+# Nombres disponibles en cada llamada (además de SAFE_BUILTINS)
+NAMES = ("value", "cc", "state", "states", "on")
+# Solo expresiones: sin atributos, lambdas, comprensiones, asignaciones ni potencias/desplazamientos
+ALLOWED_NODES = (
+    ast.Expression, ast.Name, ast.Load, ast.Constant, ast.Tuple,
+    ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd, ast.Invert,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod,
+    ast.BitAnd, ast.BitOr, ast.BitXor, ast.RShift,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.IfExp, ast.Call, ast.Subscript,
+)
+
+
+NUMERIC = (int, float)  # bool es int
+# Un texto literal solo puede ser argumento, comparando o índice (on("btn_1"), "btn_1" in states):
+# como operando de una BinOp, "x" * n o "%0999999999d" % v reservarían memoria sin límite
+TEXT_PARENTS = (ast.Call, ast.Compare, ast.Subscript)
+
+
+class TransformError(ValueError):
+    """Expresión de transformación inválida o no permitida"""
+
+
+def _mul(left, right):
+    """Multiplicación de la expresión: solo números (ni textos ni tuplas repetidos)"""
+    if not (isinstance(left, NUMERIC) and isinstance(right, NUMERIC)):
+        raise TransformError("solo se pueden multiplicar números")
+    return left * right
+
+
+class _GuardMult(ast.NodeTransformer):
+    """Reemplaza a * b por _mul(a, b): los operandos solo se conocen al evaluar (max(states) es texto)"""
+
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.Mult):
+            return node
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id="_mul", ctx=ast.Load()), args=[node.left, node.right], keywords=[]), node
+        )
+
+
+def compile_transform(source):
+    """Compila una expresión de transformación a un code object, rechazando lo que salga del sandbox"""
+    if not isinstance(source, str) or not source.strip():
+        raise TransformError("debe ser una expresión no vacía")
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise TransformError(f"sintaxis inválida: {e.msg}") from None
+    parents = {child: node for node in ast.walk(tree) for child in ast.iter_child_nodes(node)}
+    for node in ast.walk(tree):
+        if not isinstance(node, ALLOWED_NODES):
+            raise TransformError(f"no permitido: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not (node.value is None or isinstance(node.value, NUMERIC)):
+            parent = parents.get(node)
+            if isinstance(parent, ast.Tuple):
+                parent = parents.get(parent)  # "btn_0" in ("a", "b")
+            if not isinstance(node.value, str) or not isinstance(parent, TEXT_PARENTS):
+                raise TransformError(f"constante no permitida aquí: {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in NAMES and node.id not in SAFE_BUILTINS:
+            raise TransformError(f"nombre desconocido: {node.id}")
+        if isinstance(node, ast.Call) and not (isinstance(node.func, ast.Name) and (node.func.id in SAFE_BUILTINS or node.func.id == "on")):
+            raise TransformError("solo se pueden llamar funciones permitidas")
+    tree = ast.fix_missing_locations(_GuardMult().visit(tree))
+    return compile(tree, "<transform>", "eval")
+
+
+class Transform:
+    """Transformación compilada de un switch, evaluada solo para su CC de entrada.
+
+    La expresión ve value, cc, state (estado actual del switch), states (estados por id) y
+    on(id). Resultado: None/False descarta el mensaje, True lo deja pasar sin cambios y un
+    entero 0-127 reemplaza el valor antes de la lógica toggle/momentary.
+    """
+    __slots__ = ("source", "code", "globals", "slow_ns", "error_warned", "slow_warned")
+
+    def __init__(self, source):
+        self.source = source.strip()
+        self.code = compile_transform(source)
+        self.globals = {"__builtins__": SAFE_BUILTINS, "_mul": _mul}
+        self.slow_ns = AppSettings.TRANSFORM_SLOW_US * 1000
+        self.error_warned = False  # Cada tipo de aviso sale una vez por transformación
+        self.slow_warned = False
+
+    def __call__(self, cc, value, state, states):
+        result = eval(self.code, self.globals, {
+            "value": value, "cc": cc, "state": state, "states": states, "on": states.get,
+        })
+        if result is None or result is False:
+            return None
+        if result is True:
+            return value
+        if isinstance(result, int) and 0 <= result <= 127:
+            return result
+        raise TransformError(f"resultado inválido {result!r}")
+
+
+class TransformStats:
+    """Costo por mensaje de la transformación de un switch (contadores simples, hilo MIDI)"""
+    __slots__ = ("calls", "total_ns", "max_ns", "blocked", "errors")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.blocked = 0
+        self.errors = 0
+
+
+def print_warning(kind, control_id, source, detail):
+    if kind == "error":
+        print(f"Error en la transformación de {control_id} ({source!r}): {detail}")
+    else:
+        print(f"Transformación lenta en {control_id}: {detail / 1000:.0f} µs ({source!r})")
+
+
+def run_transform(transform, stats, control_id, cc, value, state, states, warn=print_warning):
+    """Evalúa la transformación midiendo su costo. Devuelve el valor a procesar o None si se descarta.
+
+    warn(tipo, control_id, fuente, detalle) recibe el primer error ("error", la excepción) y la
+    primera evaluación lenta ("slow", los ns que tardó).
+    """
+    start = time.perf_counter_ns()
+    try:
+        result = transform(cc, value, state, states)
+    except Exception as e:
+        result = None
+        stats.errors += 1
+        if not transform.error_warned:
+            transform.error_warned = True
+            warn("error", control_id, transform.source, e)
+    elapsed = time.perf_counter_ns() - start
+    stats.calls += 1
+    stats.total_ns += elapsed
+    if elapsed > stats.max_ns:
+        stats.max_ns = elapsed
+    if result is None:
+        stats.blocked += 1
+    # La primera evaluación incluye el arranque en frío del code object: no cuenta como lenta
+    if elapsed > transform.slow_ns and stats.calls > 1 and not transform.slow_warned:
+        transform.slow_warned = True
+        warn("slow", control_id, transform.source, elapsed)
+    return result
@@ -1,4 +1,11 @@
-from .switch import MidiSwitch
-from .configuration import AppConfiguration
+from utils.lazy import lazy_exports
 
-__all__ = ['MidiSwitch', 'AppConfiguration']
\ No newline at end of file
+# Exportaciones perezosas: MidiSwitch depende de customtkinter
+_EXPORTS = {
+    'MidiSwitch': '.switch',
+    'AppConfiguration': '.configuration',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -3,4 +3,15 @@ class AppConfiguration:
         self.language = "es"
         self.input_port = ""
         self.output_port = ""
-        self.switches = {}
\ No newline at end of file
+        self.switches = {}
+        self.preset_next_cc = None
+        self.preset_prev_cc = None
+        self.network_output = ""
+        self.osc_output = ""
+        self.metrics_port = None
+        self.feedback_port = ""
+        self.daw_feedback_port = ""
+        self.scenes = {}
+        self.scene_capture_cc = None
+        self.tap_tempo_cc = None
+        self.clock_start_cc = None
@@ -8,4 +8,7 @@ class MidiSwitch:
         self.output_cc_var = ctk.StringVar(value=str(10 + switch_number - 1))
         self.mode_var = ctk.StringVar(value="toggle")
         self.state = False
+        self.osc_address = None  # Sin campo en la UI: se conserva desde la configuración
+        self.osc_only = False
+        self.transform = None  # Expresión de transformación, también solo desde la configuración
         self.is_default = switch_number <= 4
\ No newline at end of file
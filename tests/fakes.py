@@ -0,0 +1,42 @@
+class FakeManager:
+    """Salida del motor para las pruebas: guarda los CC y paquetes OSC en lugar de enviarlos"""
+
+    def __init__(self):
+        self.sent = []
+        self.osc = []
+        self.osc_output = None
+        self.recorder = None
+        self.network_output = None
+
+    def send_cc(self, control, value, direction=None):
+        self.sent.append((control, value))
+        return True
+
+    def send_osc(self, packet):
+        self.osc.append(packet)
+        if self.osc_output is not None:
+            self.osc_output.queue(packet)
+
+    def is_connected(self):
+        return False
+
+    def get_input_ports_truncated(self):
+        return []
+
+    def get_output_ports_truncated(self):
+        return []
+
+
+class FakeOscOutput:
+    def __init__(self):
+        self.pending = []
+        self.flushed = []
+        self.sent = 0
+
+    def queue(self, packet):
+        self.pending.append(packet)
+
+    def flush(self):
+        self.flushed.extend(self.pending)
+        self.sent += len(self.pending)
+        self.pending = []
@@ -0,0 +1,49 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from utils.autosave import AutosaveWriter
+from utils.file_utils import FileManager
+
+
+class AutosaveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.file_path = os.path.join(self.directory, "autosave.json")
+        self.version = 0
+
+    def snapshot(self):
+        return {"version": self.version}
+
+    def test_burst_of_changes_is_written_once(self):
+        writer = AutosaveWriter(self.file_path, self.snapshot, delay_ms=50)
+        self.addCleanup(writer.stop)
+        for self.version in range(1, 11):
+            writer.mark_dirty()
+        deadline = time.monotonic() + 2
+        while writer.total_writes == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(writer.total_writes, 1)
+        self.assertEqual(FileManager.load_configuration(self.file_path), {"version": 10})
+        self.assertEqual(writer.dirty_marks, 10)
+
+    def test_stop_flushes_pending_changes(self):
+        writer = AutosaveWriter(self.file_path, self.snapshot, delay_ms=60000)
+        self.version = 3
+        writer.mark_dirty()
+        writer.stop()
+        with open(self.file_path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f), {"version": 3})
+
+    def test_failed_write_leaves_previous_file_and_no_temporaries(self):
+        FileManager.save_configuration_atomic({"version": 1}, self.file_path)
+        self.assertFalse(FileManager.save_configuration_atomic({"bad": object()}, self.file_path))
+        self.assertEqual(FileManager.load_configuration(self.file_path), {"version": 1})
+        self.assertEqual(os.listdir(self.directory), ["autosave.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
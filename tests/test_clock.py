@@ -0,0 +1,76 @@
+import sys
+import time
+import unittest
+from config.settings import AppSettings
+from midi.clock import CLOCK, START, STOP, MidiClock, TapTempo
+
+
+class TapTempoTest(unittest.TestCase):
+    def test_bpm_from_intervals(self):
+        tap = TapTempo(history=4, timeout_ms=2000, min_bpm=30, max_bpm=300)
+        self.assertIsNone(tap.tap(0))
+        self.assertAlmostEqual(tap.tap(500_000_000), 120)
+        self.assertAlmostEqual(tap.tap(1_000_000_000), 120)
+
+    def test_long_pause_starts_over(self):
+        tap = TapTempo(history=4, timeout_ms=2000, min_bpm=30, max_bpm=300)
+        tap.tap(0)
+        tap.tap(500_000_000)
+        self.assertIsNone(tap.tap(5_000_000_000))
+
+
+def wait_for(condition, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+class MidiClockTest(unittest.TestCase):
+    def setUp(self):
+        self.sent = []
+        self.clock = MidiClock(self.sent.append, spin_us=0, free_running=False)
+        self.addCleanup(self.clock.close)
+
+    def test_ticks_only_while_playing(self):
+        self.clock.set_bpm(300)
+        time.sleep(0.05)
+        self.assertEqual(self.sent, [])  # Con tempo pero detenido: el hilo no despierta
+        self.clock.start()
+        self.assertTrue(wait_for(lambda: self.sent.count(CLOCK) >= 3))
+        self.assertEqual(self.sent[0], START)
+        self.clock.stop()
+        self.assertTrue(wait_for(lambda: STOP in self.sent))
+        time.sleep(0.05)
+        count = len(self.sent)
+        time.sleep(0.05)
+        self.assertEqual(len(self.sent), count)
+
+    def test_free_running_pauses_while_idle(self):
+        self.clock.free_running = True
+        self.clock.set_bpm(300)
+        self.assertTrue(wait_for(lambda: self.clock.ticks >= 2))
+        self.clock.set_idle(True)
+        self.assertTrue(wait_for(lambda: not self.clock.ticking()))
+        time.sleep(0.05)
+        ticks = self.clock.ticks
+        time.sleep(0.05)
+        self.assertEqual(self.clock.ticks, ticks)
+        self.assertNotIn(START, self.sent)
+
+    def test_switch_interval_only_while_ticking(self):
+        previous = sys.getswitchinterval()
+        self.clock.set_bpm(300)
+        self.clock.start()
+        self.assertTrue(wait_for(lambda: self.clock.ticks > 0))
+        self.assertLessEqual(sys.getswitchinterval(), AppSettings.CLOCK_SWITCH_INTERVAL)
+        self.clock.stop()
+        self.assertTrue(wait_for(lambda: sys.getswitchinterval() == previous))
+        self.clock.start()
+        self.assertTrue(wait_for(lambda: self.clock.previous_switch_interval is not None))
+        self.clock.close()
+        self.assertEqual(sys.getswitchinterval(), previous)
+
+
+if __name__ == "__main__":
+    unittest.main()
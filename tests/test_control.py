@@ -0,0 +1,113 @@
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from midi.control import ControlApi, ControlServer
+from midi.engine import RoutingEngine
+from midi.preset_bank import PresetBank
+from midi.preset_loader import compile_preset
+from tests.fakes import FakeManager, FakeOscOutput
+
+CONFIG = {
+    "switches": {
+        "btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle", "osc_address": "/track/1/arm"},
+        "btn_1": {"input_cc": 21, "output_cc": 61, "mode": "toggle"},
+    }
+}
+
+
+def request(api, payload):
+    raw = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+    return json.loads(api.handle_line(raw))
+
+
+class ControlApiTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.engine = RoutingEngine(self.manager)
+        self.engine.swap_table(compile_preset(CONFIG, "test")[1])
+        self.bank = PresetBank()
+        self.bank.add("uno", CONFIG)
+        self.api = ControlApi(self.engine, self.bank, self.manager)
+
+    def test_set_state_sends_cc(self):
+        response = request(self.api, {"cmd": "set_state", "switch": "btn_1", "state": True})
+        self.assertTrue(response["ok"])
+        self.assertTrue(self.engine.states["btn_1"])
+        self.assertEqual(self.manager.sent, [(61, 127)])
+
+    def test_malformed_switch_is_rejected_and_server_keeps_answering(self):
+        response = request(self.api, b'{"cmd":"set_state","switch":["a"],"state":true}')
+        self.assertFalse(response["ok"])
+        self.assertEqual(request(self.api, {"cmd": "ping"})["result"], "pong")
+
+    def test_invalid_json(self):
+        self.assertFalse(request(self.api, b"{no json")["ok"])
+
+    def test_bool_index_is_not_a_preset(self):
+        self.assertFalse(request(self.api, {"cmd": "load_preset", "index": True})["ok"])
+        self.assertTrue(request(self.api, {"cmd": "load_preset", "index": 0})["ok"])
+
+    def test_batch_is_all_or_nothing(self):
+        responses = request(self.api, [
+            {"id": 1, "cmd": "set_state", "switch": "btn_0", "state": True},
+            {"id": 2, "cmd": "set_state", "switch": "btn_9", "state": True},
+        ])
+        self.assertFalse(any(response["ok"] for response in responses))
+        self.assertFalse(self.engine.states["btn_0"])
+        self.assertEqual(self.manager.sent, [])
+
+    def test_osc_is_flushed_after_api_change(self):
+        self.manager.osc_output = FakeOscOutput()
+        request(self.api, {"cmd": "set_state", "switch": "btn_0", "state": True})
+        self.assertEqual(len(self.manager.osc_output.flushed), 1)
+        self.assertEqual(self.manager.osc_output.pending, [])
+
+    def test_pedal_press_during_batch_is_not_lost(self):
+        thread = threading.Thread(
+            target=request, args=(self.api, {"cmd": "set_state", "switch": "btn_1", "state": True})
+        )
+        with self.engine.lock:
+            thread.start()
+            time.sleep(0.05)
+            self.assertTrue(thread.is_alive())  # El lote espera al motor
+            self.engine.process_cc(20, 127)  # Press del pedal mientras el lote está pendiente
+        thread.join(timeout=1)
+        self.assertTrue(self.engine.states["btn_0"])
+        self.assertTrue(self.engine.states["btn_1"])
+
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "sockets Unix")
+class ControlServerTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, True)
+        manager = FakeManager()
+        engine = RoutingEngine(manager)
+        engine.swap_table(compile_preset(CONFIG, "test")[1])
+        self.server = ControlServer(ControlApi(engine, PresetBank(), manager), os.path.join(directory, "c.sock"),
+                                    max_line=1024)
+        self.assertTrue(self.server.start())
+        self.addCleanup(self.server.stop)
+        self.client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.addCleanup(self.client.close)
+        self.client.connect(self.server.path)
+        self.client.settimeout(2)
+        self.reader = self.client.makefile("rb")
+        self.addCleanup(self.reader.close)
+
+    def test_overlong_line_is_answered_and_closed(self):
+        self.client.sendall(b'{"cmd": "ping"}\n' + b" " * 4096)
+        self.assertTrue(json.loads(self.reader.readline())["ok"])
+        self.assertFalse(json.loads(self.reader.readline())["ok"])
+        self.assertEqual(self.reader.readline(), b"")
+        self.assertEqual(self.server.clients, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+from midi.engine import RoutingEngine
+from midi.preset_bank import PresetBank
+from midi.preset_loader import compile_preset
+from tests.fakes import FakeManager
+
+CONFIG = {"switches": {
+    "btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle"},
+    "btn_1": {"input_cc": 21, "output_cc": 61, "mode": "momentary"},
+}}
+
+
+class RoutingEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.engine = RoutingEngine(self.manager)
+        self.engine.swap_table(compile_preset(CONFIG)[1])
+
+    def test_toggle_flips_on_press_only(self):
+        self.engine.process_cc(20, 127)
+        self.engine.process_cc(20, 0)
+        self.engine.process_cc(20, 127)
+        self.assertEqual(self.manager.sent, [(60, 127), (60, 0)])
+        self.assertFalse(self.engine.states["btn_0"])
+
+    def test_momentary_follows_value(self):
+        self.engine.process_cc(21, 100)
+        self.engine.process_cc(21, 127)  # Sigue presionado: sin cambio
+        self.engine.process_cc(21, 0)
+        self.assertEqual(self.manager.sent, [(61, 127), (61, 0)])
+
+    def test_unknown_cc_is_ignored(self):
+        self.assertIsNone(self.engine.process_cc(99, 127))
+        self.assertEqual(self.manager.sent, [])
+
+    def test_action_takes_precedence_over_route(self):
+        calls = []
+        self.engine.bind_action(20, lambda: calls.append("next"))
+        self.engine.bind_action("sin asignar", lambda: calls.append("never"))
+        self.engine.process_cc(20, 127)
+        self.engine.process_cc(20, 0)
+        self.assertEqual(calls, ["next"])
+        self.assertEqual(self.manager.sent, [])
+        self.engine.unbind_action(20)
+        self.assertIsNotNone(self.engine.process_cc(20, 127))
+
+    def test_swap_replaces_table_and_states_together(self):
+        previous_states = self.engine.states
+        self.engine.process_cc(20, 127)
+        other = compile_preset({"switches": {"btn_0": {"input_cc": 30, "output_cc": 70, "state": True}}}, "other")[1]
+        self.engine.swap_table(other)
+        self.assertIsNot(self.engine.states, previous_states)
+        self.assertEqual(self.engine.states, {"btn_0": True})
+        self.assertIsNone(self.engine.process_cc(20, 127))
+        self.engine.process_cc(30, 127)
+        self.assertEqual(self.manager.sent[-1], (70, 0))
+
+    def test_snapshot_config_reports_live_states(self):
+        self.engine.process_cc(20, 127)
+        switches = self.engine.snapshot_config()["switches"]
+        self.assertTrue(switches["btn_0"]["state"])
+        self.assertFalse(switches["btn_1"]["state"])
+
+
+class PresetBankTest(unittest.TestCase):
+    def test_step_wraps_around(self):
+        bank = PresetBank()
+        for name in ("a", "b", "c"):
+            bank.add(name, CONFIG)
+        self.assertEqual(bank.select(2).name, "c")
+        self.assertEqual(bank.step(1).name, "a")
+        self.assertEqual(bank.step(-1).name, "c")
+        self.assertIsNone(bank.select(3))
+        self.assertEqual(bank.find("b"), 1)
+
+    def test_empty_bank_does_not_step(self):
+        self.assertIsNone(PresetBank().step(1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+from midi.engine import RoutingEngine
+from midi.feedback import EchoFilter, FeedbackSync
+from midi.preset_loader import compile_preset
+from tests.fakes import FakeManager
+
+CONFIG = {"switches": {"btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle"}}}
+
+
+class EchoFilterTest(unittest.TestCase):
+    def test_one_echo_consumed_per_write(self):
+        echo = EchoFilter()
+        echo.note(20, 127)
+        self.assertTrue(echo.is_echo(20, 127))
+        self.assertFalse(echo.is_echo(20, 127))  # El segundo es un press real
+        self.assertEqual(echo.suppressed, 1)
+
+    def test_repeated_writes_expect_repeated_echoes(self):
+        echo = EchoFilter()
+        echo.note(20, 127)
+        echo.note(20, 127)
+        self.assertTrue(echo.is_echo(20, 127))
+        self.assertTrue(echo.is_echo(20, 127))
+        self.assertEqual(echo.pending, {})
+
+    def test_disabled_filter_never_drops(self):
+        echo = EchoFilter(enabled=False)
+        echo.note(20, 127)
+        self.assertFalse(echo.is_echo(20, 127))
+
+    def test_echo_that_never_returns_expires(self):
+        now = [0.0]
+        echo = EchoFilter(ttl_ms=300, clock=lambda: now[0])
+        echo.note(20, 127)
+        now[0] = 1.0
+        self.assertFalse(echo.is_echo(20, 127))  # Cambio real mucho después de la escritura
+        self.assertEqual((echo.pending, echo.expired), ({}, 1))
+
+    def test_failed_write_forgets_its_echo(self):
+        echo = EchoFilter()
+        echo.note(20, 0)
+        echo.forget(20, 0)
+        self.assertFalse(echo.is_echo(20, 0))
+        self.assertEqual(echo.suppressed, 0)
+
+
+class EngineEchoTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.engine = RoutingEngine(self.manager)
+        self.engine.swap_table(compile_preset(CONFIG)[1])
+
+    def test_fast_repress_is_not_taken_for_echo_by_default(self):
+        self.engine.feedback = FeedbackSync()
+        self.engine.feedback.device_echo.note(20, 127)  # LED escrito por el hilo de feedback
+        self.assertIsNotNone(self.engine.process_cc(20, 127))
+        self.assertTrue(self.engine.states["btn_0"])
+
+    def test_echoing_device_drops_only_the_echo(self):
+        self.engine.feedback = FeedbackSync(device_echoes=True)
+        self.engine.feedback.device_echo.note(20, 127)
+        self.assertIsNone(self.engine.process_cc(20, 127))
+        self.assertIsNotNone(self.engine.process_cc(20, 127))
+        self.assertTrue(self.engine.states["btn_0"])
+
+    def test_daw_echo_of_sent_value_does_not_change_state(self):
+        self.engine.feedback = FeedbackSync(daw_echoes=True)  # Puerto de feedback del DAW abierto
+        self.engine.process_cc(20, 127)  # Envía CC60=127 y lo anota como eco esperado del DAW
+        self.engine.process_cc(20, 127)  # Vuelve a apagarlo antes de que llegue el eco
+        self.assertIsNone(self.engine.apply_feedback(60, 127))
+        self.assertFalse(self.engine.states["btn_0"])
+
+    def test_sent_values_are_not_expected_back_without_a_daw_port(self):
+        self.engine.feedback = FeedbackSync()
+        self.engine.process_cc(20, 127)
+        self.engine.process_cc(20, 127)
+        self.assertEqual(self.engine.feedback.daw_echo.pending, {})
+        self.assertIsNotNone(self.engine.apply_feedback(60, 127))  # Cambio real del DAW
+        self.assertTrue(self.engine.states["btn_0"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+from midi.gestures import GestureDetector
+
+
+class GestureDetectorTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.gestures = []
+        self.detector = GestureDetector(
+            lambda: self.gestures.append("tap"), lambda: self.gestures.append("long"),
+            long_press_ms=600, clock=lambda: self.now
+        )
+
+    def press(self, held_s):
+        self.detector(127)
+        self.now += held_s
+        self.detector(0)
+
+    def test_short_and_long_presses(self):
+        self.press(0.1)
+        self.press(0.6)
+        self.assertEqual(self.gestures, ["tap", "long"])
+
+    def test_repeated_press_values_keep_first_timestamp(self):
+        self.detector(127)
+        self.now += 0.5
+        self.detector(100)  # Pedal de expresión o rebote: no reinicia la pulsación
+        self.now += 0.2
+        self.detector(0)
+        self.assertEqual(self.gestures, ["long"])
+
+    def test_release_without_press_is_ignored(self):
+        self.detector(0)
+        self.assertEqual(self.gestures, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from utils.localization import Localization
+
+LANGUAGES = {
+    "en": {"delete": "Delete", "library_status": "{shown} of {total}"},
+    "es": {"delete": "Eliminar", "library_status": "{shown} de {total}"},
+}
+
+
+class FakeWidget:
+    def __init__(self):
+        self.options = {}
+
+    def configure(self, **options):
+        self.options.update(options)
+
+
+class LocalizationTest(unittest.TestCase):
+    def setUp(self):
+        self.localization = Localization(LANGUAGES)
+
+    def test_bound_widget_follows_language(self):
+        widget = self.localization.bind(FakeWidget(), "delete")
+        self.localization.set_language("es")
+        self.assertEqual(widget.options["text"], "Eliminar")
+
+    def test_forget_drops_only_that_widget(self):
+        kept = self.localization.bind(FakeWidget(), "delete")
+        gone = self.localization.bind(FakeWidget(), "delete", "placeholder_text")
+        self.localization.forget(gone)
+        self.localization.set_language("es")
+        self.assertEqual([binding[0] for binding in self.localization.bindings], [kept])
+        self.assertEqual(gone.options["placeholder_text"], "Delete")
+
+    def test_removed_listener_is_not_called(self):
+        calls = []
+        listener = lambda: calls.append(self.localization.current_language)
+        self.localization.add_listener(listener)
+        self.localization.set_language("es")
+        self.localization.remove_listener(listener)
+        self.localization.remove_listener(listener)  # Segunda vez: no falla
+        self.localization.set_language("en")
+        self.assertEqual(calls, ["es"])
+
+    def test_format_uses_current_catalog(self):
+        self.localization.set_language("es")
+        self.assertEqual(self.localization.format("library_status", shown=1, total=3), "1 de 3")
+        self.assertEqual(self.localization.format("missing_key"), "missing_key")
+
+
+if __name__ == "__main__":
+    unittest.main()
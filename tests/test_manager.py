@@ -0,0 +1,43 @@
+import threading
+import unittest
+from midi.manager import MidiManager
+
+
+class FakePort:
+    def __init__(self, fail=False):
+        self.fail = fail
+
+    def send(self, msg):
+        if self.fail:
+            raise IOError("puerto cerrado")
+
+
+class MidiManagerCountersTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = MidiManager()
+        self.manager.listening = True
+        self.manager.output_name = "out"
+
+    def test_sends_from_several_threads_are_all_counted(self):
+        self.manager.output_port = FakePort()
+
+        def sender():
+            for value in range(2000):
+                self.manager.send_cc(20, value % 128)
+
+        threads = [threading.Thread(target=sender) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.manager.output_counts(), {"out": 8000})
+
+    def test_failed_send_counts_an_error(self):
+        self.manager.output_port = FakePort(fail=True)
+        self.assertFalse(self.manager.send_cc(20, 127))
+        self.assertFalse(self.manager.send_realtime(0xF8))
+        self.assertEqual((self.manager.send_errors, self.manager.output_counts()), (2, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from midi.network import NetworkInput, NetworkOutput, HEADER, MAGIC, KIND_JOURNAL, parse_address
+
+
+class NetworkTest(unittest.TestCase):
+    def setUp(self):
+        self.delivered = []
+        self.input = NetworkInput(0, self.delivered.append, host="127.0.0.1")
+        self.addCleanup(self.input.close)
+        self.output = NetworkOutput("127.0.0.1", 9, redundancy=2, journal_ms=60000)
+        self.addCleanup(self.output.close)
+        self.packets = []
+        self.output._sendto = self.packets.append  # Se captura en lugar de enviar
+
+    def test_parse_address(self):
+        self.assertEqual(parse_address("10.0.0.2:6000"), ("10.0.0.2", 6000))
+        self.assertEqual(parse_address("studio", 7000), ("studio", 7000))
+
+    def test_in_order_stream_is_delivered_once(self):
+        for value in (1, 2, 3):
+            self.output.send((0xB0, 20, value))
+        for packet in self.packets:
+            self.input._handle(packet, 0)
+        self.input._handle(self.packets[-1], 0)  # Duplicado
+        self.assertEqual(self.delivered, [(0xB0, 20, 1), (0xB0, 20, 2), (0xB0, 20, 3)])
+        self.assertEqual(self.input.duplicates, 1)
+
+    def test_lost_datagram_is_recovered_from_redundancy(self):
+        self.output.send((0xB0, 20, 1))
+        self.output.send((0xC0, 5))
+        self.output.send((0xB0, 20, 3))
+        self.input._handle(self.packets[0], 0)
+        self.input._handle(self.packets[2], 0)  # Se perdió el segundo
+        self.assertEqual(self.delivered, [(0xB0, 20, 1), (0xC0, 5), (0xB0, 20, 3)])
+        self.assertEqual((self.input.recovered, self.input.lost), (1, 0))
+
+    def test_journal_repairs_only_stale_controllers(self):
+        self.input._handle(HEADER.pack(MAGIC, 0, 1, 1, 0) + bytes((0xB0, 20, 1)), 0)
+        journal = HEADER.pack(MAGIC, KIND_JOURNAL, 2, 1, 0) + bytes((0xB0, 20, 1, 0xB0, 21, 9))
+        self.input._handle(journal, 0)
+        self.assertEqual(self.delivered, [(0xB0, 20, 1), (0xB0, 21, 9)])
+        self.assertEqual(self.input.journal_fixes, 1)
+
+    def test_malformed_packets_are_ignored(self):
+        for packet in (
+            b"",
+            b"MV",
+            HEADER.pack(b"XX", 0, 1, 1, 0) + bytes(3),
+            HEADER.pack(MAGIC, 7, 1, 1, 0) + bytes((0xB0, 20, 1)),
+            HEADER.pack(MAGIC, 0, 5, 1, 0) + bytes((0xB0, 20, 1)),  # Cantidad mayor que el contenido
+        ):
+            self.input._handle(packet, 0)
+        self.assertEqual(self.delivered, [])
+        self.assertIsNone(self.input.last_seq)
+
+
+if __name__ == "__main__":
+    unittest.main()
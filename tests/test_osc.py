@@ -0,0 +1,97 @@
+import socket
+import struct
+import threading
+import unittest
+from midi.engine import RoutingEngine
+from midi.osc import OscOutput, encode_bundle, encode_message, encode_string, is_valid_address
+from midi.preset_loader import compile_preset
+from tests.fakes import FakeManager
+
+
+class OscEncodingTest(unittest.TestCase):
+    def test_strings_are_null_terminated_and_aligned(self):
+        self.assertEqual(encode_string("abc"), b"abc\0")
+        self.assertEqual(encode_string("abcd"), b"abcd\0\0\0\0")
+
+    def test_message_arguments(self):
+        packet = encode_message("/a", 1, 0.5, "x")
+        self.assertEqual(packet, b"/a\0\0,ifs\0\0\0\0" + struct.pack(">if", 1, 0.5) + b"x\0\0\0")
+        self.assertEqual(len(packet) % 4, 0)
+
+    def test_bundle_prefixes_each_packet_with_its_size(self):
+        first, second = encode_message("/a", 1), encode_message("/bb", 0)
+        bundle = encode_bundle([first, second])
+        self.assertTrue(bundle.startswith(b"#bundle\0"))
+        self.assertEqual(bundle[16:20], struct.pack(">i", len(first)))
+        self.assertEqual(bundle[20 + len(first) + 4:], second)
+
+    def test_address_validation(self):
+        self.assertTrue(is_valid_address("/track/1/arm"))
+        for address in ("track", "/a b", "/a#", "/a,b", None, 3):
+            self.assertFalse(is_valid_address(address))
+
+
+class OscOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(self.receiver.close)
+        self.receiver.bind(("127.0.0.1", 0))
+        self.receiver.settimeout(2)
+        self.output = OscOutput(*self.receiver.getsockname())
+        self.addCleanup(self.output.close)
+
+    def test_single_packet_is_sent_bare(self):
+        self.output.queue(encode_message("/a", 1))
+        self.output.flush()
+        self.assertEqual(self.receiver.recv(1024), encode_message("/a", 1))
+
+    def test_batch_is_sent_as_one_bundle(self):
+        packets = [encode_message("/a", 1), encode_message("/b", 0)]
+        for packet in packets:
+            self.output.queue(packet)
+        self.output.flush()
+        self.output.flush()  # Sin pendientes: no envía nada
+        self.assertEqual(self.receiver.recv(1024), encode_bundle(packets))
+        self.assertEqual((self.output.sent, self.output.bundles), (2, 1))
+
+    def test_packets_queued_during_flush_are_not_lost(self):
+        self.output.socket.close()
+        self.output.socket = FakeSocket()
+        packet = encode_message("/a", 1)
+
+        def producer():
+            for _ in range(2000):
+                self.output.queue(packet)
+
+        producers = [threading.Thread(target=producer) for _ in range(4)]
+        for thread in producers:
+            thread.start()
+        while any(thread.is_alive() for thread in producers):
+            self.output.flush()
+        self.output.flush()
+        self.assertEqual(self.output.sent, 8000)
+
+
+class FakeSocket:
+    def sendto(self, data, address):
+        pass
+
+    def close(self):
+        pass
+
+
+class EngineOscTest(unittest.TestCase):
+    def test_osc_only_switch_skips_midi(self):
+        manager = FakeManager()
+        engine = RoutingEngine(manager)
+        engine.swap_table(compile_preset({"switches": {"btn_0": {
+            "input_cc": 20, "output_cc": 60, "mode": "toggle", "osc_address": "/fx", "osc_only": True
+        }}})[1])
+        engine.process_cc(20, 127)
+        engine.process_cc(20, 127)
+        self.assertEqual(manager.sent, [])
+        self.assertEqual(manager.osc, [encode_message("/fx", 1), encode_message("/fx", 0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from utils.preset_library import PresetLibrary
+
+
+class PresetLibraryTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, True)
+        self.directory = os.path.join(self.root, "presets")
+        os.makedirs(os.path.join(self.directory, "live"))
+        self.index_file = os.path.join(self.root, "index.json")
+        self.write("live/rock.json", {"name": "Rock", "device": "Chocolate",
+                                      "switches": {"btn_0": {"input_cc": 4, "output_cc": 60}}})
+        self.write("clean.json", {"switches": {"btn_0": {"input_cc": 5, "output_cc": "x"}}})
+        self.write("broken.json", None)
+
+    def write(self, name, config):
+        with open(os.path.join(self.directory, name), "w", encoding="utf-8") as f:
+            f.write("{" if config is None else json.dumps(config))
+
+    def test_scan_indexes_valid_presets_and_skips_broken(self):
+        library = PresetLibrary(self.index_file)
+        library.scan(self.directory)
+        self.assertEqual(sorted(entry.name for entry in library.entries.values()), ["Rock", "clean"])
+        self.assertEqual(library.last_scan_parsed, 2)
+
+    def test_rescan_only_rereads_changed_files(self):
+        PresetLibrary(self.index_file).scan(self.directory)
+        library = PresetLibrary(self.index_file)  # Parte del índice guardado
+        self.assertFalse(library.scan(self.directory))
+        self.assertEqual(library.last_scan_parsed, 0)
+
+    def test_search_matches_every_token(self):
+        library = PresetLibrary(self.index_file)
+        library.scan(self.directory)
+        self.assertEqual([entry.name for entry in library.search("chocolate cc4")], ["Rock"])
+        self.assertEqual([entry.name for entry in library.search("")], ["clean", "Rock"])
+        self.assertEqual(library.search("cc60 clean"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
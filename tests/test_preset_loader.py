@@ -0,0 +1,86 @@
+import json
+import os
+import tempfile
+import unittest
+from config.settings import AppSettings
+from midi.preset_loader import compile_preset, load_preset, PresetValidationError
+
+
+def switch(input_cc, output_cc, **extra):
+    return dict({"input_cc": input_cc, "output_cc": output_cc, "mode": "toggle"}, **extra)
+
+
+class CompilePresetTest(unittest.TestCase):
+    def test_valid_preset_compiles_routes(self):
+        config, table = compile_preset({"switches": {
+            "btn_0": switch("20", 60),
+            "btn_1": switch(21, 61, mode="momentary", state=True),
+        }}, "show")
+        self.assertEqual(table.name, "show")
+        self.assertEqual(sorted(table.routes), [20, 21])
+        self.assertTrue(table.routes[20].is_toggle)
+        self.assertFalse(table.routes[21].is_toggle)
+        self.assertEqual(table.initial_states, {"btn_0": False, "btn_1": True})
+        self.assertEqual(config["switches"]["btn_0"]["input_cc"], "20")
+
+    def test_unassigned_input_keeps_switch_without_route(self):
+        _, table = compile_preset({"switches": {"btn_0": switch("No asignado", 60)}})
+        self.assertEqual(table.routes, {})
+        self.assertIn("btn_0", table.initial_states)
+
+    def test_all_errors_are_reported_together(self):
+        with self.assertRaises(PresetValidationError) as raised:
+            compile_preset({"switches": {
+                "btn_0": switch(20, 200),
+                "btn_1": switch(21, 61, mode="togglish"),
+                "pedal": switch(22, 62),
+                "btn_3": switch(True, 63),
+            }})
+        errors = raised.exception.errors
+        self.assertEqual(len(errors), 4)
+        self.assertTrue(any("btn_1.mode" in error for error in errors))
+
+    def test_invalid_transform_rejects_preset(self):
+        with self.assertRaises(PresetValidationError):
+            compile_preset({"switches": {"btn_0": switch(20, 60, transform="__import__('os')")}})
+
+    def test_scene_recall_cc_cannot_shadow_a_switch(self):
+        with self.assertRaises(PresetValidationError):
+            compile_preset({
+                "switches": {"btn_0": switch(20, 60)},
+                "scenes": {"intro": {"recall_cc": 20, "switches": {"btn_0": True}}},
+            })
+
+    def test_duplicate_input_cc_rejects_preset(self):
+        with self.assertRaises(PresetValidationError) as raised:
+            compile_preset({"switches": {"btn_0": switch(20, 60), "btn_1": switch(20, 61)}})
+        self.assertEqual(raised.exception.errors, ["btn_1.input_cc: el CC 20 ya lo usa btn_0"])
+
+    def test_too_many_switches_rejects_preset(self):
+        switches = {f"btn_{index}": switch("No asignado", 60) for index in range(AppSettings.MAX_SWITCHES + 1)}
+        with self.assertRaises(PresetValidationError) as raised:
+            compile_preset({"switches": switches})
+        self.assertIn("como máximo", raised.exception.errors[0])
+
+
+class LoadPresetTest(unittest.TestCase):
+    def test_load_from_disk_uses_file_name(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "balada.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"switches": {"btn_0": switch(20, 60)}}, f)
+            _, table, load_ms = load_preset(path)
+        self.assertEqual(table.name, "balada")
+        self.assertGreaterEqual(load_ms, 0)
+
+    def test_unreadable_file_is_a_validation_error(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "roto.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("{roto")
+            with self.assertRaises(PresetValidationError):
+                load_preset(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+import unittest
+from utils.profiler import ProfileSession
+
+
+class FakeApp:
+    def __init__(self, metrics_server=None):
+        self.metrics_server = metrics_server
+        self.lag_probe_paused = False
+        self.probing = False
+        self.loop_lag = None
+
+    def start_lag_probe(self):
+        self.probing = True
+
+    def stop_lag_probe(self):
+        self.probing = False
+
+    def after(self, ms, func):
+        pass
+
+
+class ProfileSessionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+
+    def run_session(self, app):
+        session = ProfileSession(self.directory, 0, interval_ms=1)
+        session.start(app)
+        self.assertTrue(app.probing)
+        session.finish()
+
+    def test_finish_stops_the_lag_probe_it_started(self):
+        app = FakeApp()
+        self.run_session(app)
+        self.assertFalse(app.probing)
+
+    def test_metrics_server_keeps_the_lag_probe(self):
+        app = FakeApp(metrics_server=object())
+        self.run_session(app)
+        self.assertTrue(app.probing)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from midi.engine import RoutingEngine
+from midi.preset_loader import compile_preset
+from midi.recorder import (
+    SessionReader, SessionRecorder, DIRECTION_IN, DIRECTION_OUT, DIRECTION_OUT_EXTRA,
+    FILE_HEADER_V1, MAGIC, RECORD, RECORD_V2
+)
+from midi.replay import ReplayEngine, load_events
+from tests.fakes import FakeManager
+
+CONFIG = {"switches": {
+    "btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle"},
+    "btn_1": {"input_cc": 21, "output_cc": 61, "mode": "toggle"},
+}}
+
+
+class RecordingManager(FakeManager):
+    """Salida falsa que graba como MidiManager"""
+
+    def send_cc(self, control, value, direction=DIRECTION_OUT):
+        if self.recorder is not None:
+            self.recorder.record(direction, (0xB0, int(control), value))
+        return super().send_cc(control, value, direction)
+
+
+class RecorderReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, True)
+        self.manager = RecordingManager()
+        self.engine = RoutingEngine(self.manager)
+        self.table = compile_preset(CONFIG)[1]
+        # Sesión restaurada: btn_0 arranca encendido
+        self.engine.swap_table(self.table, {"btn_0": True, "btn_1": False})
+
+    def record_session(self):
+        recorder = SessionRecorder(self.directory, 1 << 20, 5, engine=self.engine)
+        self.assertTrue(recorder.start())
+        self.manager.recorder = recorder
+        recorder.record(DIRECTION_IN, (0xB0, 20, 127))
+        self.engine.process_cc(20, 127)
+        self.manager.send_cc(61, 127, DIRECTION_OUT_EXTRA)  # Ráfaga de escena / API
+        recorder.stop()
+        return recorder.file_path
+
+    def test_header_round_trips_initial_state(self):
+        reader = SessionReader(self.record_session())
+        try:
+            self.assertEqual(reader.initial_state, {"preset": self.table.name,
+                                                    "states": {"btn_0": True, "btn_1": False}})
+            self.assertEqual(reader.summary()["out_extra"], 1)
+        finally:
+            reader.close()
+
+    def test_replay_from_recorded_state_matches(self):
+        events, initial_state = load_events(self.record_session())
+        result = ReplayEngine(self.table, initial_state=initial_state).run(events)
+        self.assertEqual(result.produced, [(0xB0, 60, 0)])
+        self.assertTrue(result.matches)
+
+    def test_replay_without_initial_state_diverges(self):
+        events, initial_state = load_events(self.record_session())
+        self.assertFalse(ReplayEngine(self.table).run(events).matches)
+
+    def test_rotation_carries_current_state(self):
+        recorder = SessionRecorder(self.directory, 1, 5, engine=self.engine)
+        self.assertTrue(recorder.start())
+        first = recorder.file_path
+        self.engine.process_cc(20, 127)  # btn_0 se apaga antes de rotar
+        recorder.record(DIRECTION_IN, (0xB0, 20, 127))
+        time.sleep(0.002)  # Nombres de archivo distintos
+        recorder._flush()
+        recorder.stop()
+        self.assertNotEqual(recorder.file_path, first)
+        reader = SessionReader(recorder.file_path)
+        try:
+            self.assertEqual(reader.initial_state["states"]["btn_0"], False)
+        finally:
+            reader.close()
+
+    def test_reads_version_1_recordings(self):
+        path = os.path.join(self.directory, "old.mvrec")
+        with open(path, "wb") as f:
+            f.write(FILE_HEADER_V1.pack(MAGIC, 1, 0, 0))
+            f.write(RECORD_V2.pack(5, DIRECTION_IN, 3, bytes((0xB0, 20, 127))))
+        events, initial_state = load_events(path)
+        self.assertIsNone(initial_state)
+        self.assertEqual(events, [(5, DIRECTION_IN, (0xB0, 20, 127))])
+
+    def test_records_are_16_bytes(self):
+        self.assertEqual(RECORD.size, 16)
+        reader = SessionReader(self.record_session())
+        try:
+            self.assertEqual(os.path.getsize(reader.file_path), reader.offset + 3 * RECORD.size)
+        finally:
+            reader.close()
+
+    def test_records_from_other_threads_are_not_lost(self):
+        recorder = SessionRecorder(self.directory, 1 << 20, 5, flush_interval_ms=1)
+        self.assertTrue(recorder.start())
+
+        def producer():
+            for value in range(2000):
+                recorder.record(DIRECTION_OUT_EXTRA, (0xB0, 7, value % 128))
+
+        threads = [threading.Thread(target=producer) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        recorder.stop()
+        self.assertEqual(recorder.records_written, 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from midi.engine import RoutingEngine
+from midi.preset_bank import PresetBank
+from midi.preset_loader import compile_preset
+from midi.scenes import ScenePlayer
+from tests.fakes import FakeManager
+
+CONFIG = {
+    "switches": {
+        "btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle"},
+        "btn_1": {"input_cc": 21, "output_cc": 61, "mode": "toggle"},
+    },
+    "scenes": {
+        "verse": {"recall_cc": 40, "switches": {"btn_0": True, "btn_1": False}, "values": {"7": 90}},
+        "chorus": {"recall_cc": 41, "switches": {"btn_0": False}, "values": {"11": 64}},
+    },
+}
+
+
+class SceneRecallTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = FakeManager()
+        self.engine = RoutingEngine(self.manager)
+        self.engine.swap_table(compile_preset(CONFIG)[1])
+
+    def test_recall_sends_only_values_that_differ(self):
+        self.engine.process_cc(21, 127)  # btn_1 encendido: CC61=127 ya enviado
+        self.manager.sent = []
+        self.engine.process_cc(40, 127)
+        self.assertEqual(sorted(self.manager.sent), [(7, 90), (60, 127), (61, 0)])
+        self.assertEqual(self.engine.states, {"btn_0": True, "btn_1": False})
+        self.manager.sent = []
+        self.engine.process_cc(40, 127)  # Nada cambió desde el último recall
+        self.assertEqual(self.manager.sent, [])
+
+    def test_release_does_not_recall(self):
+        self.engine.process_cc(40, 0)
+        self.assertEqual(self.manager.sent, [])
+
+    def test_armed_press_captures_current_states(self):
+        self.engine.process_cc(21, 127)
+        self.engine.arm_capture()
+        self.engine.process_cc(40, 127)
+        scene = self.engine.table.config["scenes"]["verse"]
+        self.assertEqual(scene["switches"], {"btn_0": False, "btn_1": True})
+        self.assertEqual(scene["values"], {"7": 90})  # CC7 nunca se envió: conserva el valor guardado
+        self.assertFalse(self.engine.capture_armed)
+
+    def test_capture_keeps_every_known_output_cc(self):
+        self.engine.process_cc(41, 127)  # CC11=64 enviado por otra escena
+        self.engine.arm_capture()
+        self.engine.process_cc(40, 127)
+        scene = self.engine.table.config["scenes"]["verse"]
+        self.assertEqual(scene["values"], {"7": 90, "11": 64})
+        self.assertEqual(scene["switches"], {"btn_0": False, "btn_1": False})
+
+    def test_capture_survives_a_preset_change(self):
+        bank = PresetBank()
+        bank.add("a", CONFIG)
+        bank.add("b", {"switches": {}})
+        self.engine.on_capture = bank.replace
+        self.engine.swap_table(bank.select(0))
+        self.engine.process_cc(21, 127)
+        self.engine.arm_capture()
+        self.engine.process_cc(40, 127)
+        self.engine.swap_table(bank.select(1))
+        self.engine.swap_table(bank.select(0))
+        self.assertEqual(self.engine.table.config["scenes"]["verse"]["switches"], {"btn_0": False, "btn_1": True})
+        self.assertEqual(self.engine.table.scenes[40].states, {"btn_0": False, "btn_1": True})
+
+
+class ScenePlayerTest(unittest.TestCase):
+    def test_burst_is_sent_in_order(self):
+        sent = []
+        done = threading.Event()
+        player = ScenePlayer(lambda cc, value: sent.append((cc, value)), pace_ms=0,
+                             on_done=lambda scene, count, elapsed_ns: done.set())
+        self.addCleanup(player.close)
+        player.play("verse", [(60, 127), (61, 0), (7, 90)], 0)
+        self.assertTrue(done.wait(2))
+        self.assertEqual(sent, [(60, 127), (61, 0), (7, 90)])
+        self.assertEqual((player.recalls, player.sent), (1, 3))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import struct
+import tempfile
+import unittest
+from utils.session_state import SEQ_OFFSET, SessionStateFile, truncate_utf8
+
+
+class SessionStateFileTest(unittest.TestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "session.state")
+
+    def reopen(self, state):
+        state.close()
+        state = SessionStateFile(self.path)
+        self.addCleanup(state.close)
+        return state, state.open()
+
+    def test_round_trip(self):
+        state = SessionStateFile(self.path)
+        self.assertIsNone(state.open())
+        state.set_preset(2, "Balada")
+        state.set_switches({0: True, 3: True})
+        state.set_switch(3, False)
+        state.set_cc(20, 127)
+        state, snapshot = self.reopen(state)
+        self.assertFalse(snapshot.torn)
+        self.assertEqual((snapshot.preset_index, snapshot.preset_name), (2, "Balada"))
+        self.assertEqual(snapshot.switch_states, {0: True})
+        self.assertEqual(snapshot.cc_values, {20: 127})
+
+    def test_torn_write_is_reported_and_parity_reset(self):
+        state = SessionStateFile(self.path)
+        state.open()
+        state.set_switch(1, True)
+        state._begin()  # El proceso muere a mitad de una escritura
+        state, snapshot = self.reopen(state)
+        self.assertTrue(snapshot.torn)
+        self.assertEqual(struct.unpack_from("<I", state.map, SEQ_OFFSET)[0] % 2, 0)
+        state.set_switch(1, True)
+        state, snapshot = self.reopen(state)
+        self.assertFalse(snapshot.torn)
+
+    def test_switch_beyond_slots_is_reported_once(self):
+        state = SessionStateFile(self.path)
+        self.addCleanup(state.close)
+        state.open()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            state.set_switches({130: True, 1: True})
+            state.set_switches({130: True})
+        self.assertEqual(output.getvalue().count("130"), 1)
+
+    def test_name_is_truncated_on_a_character_boundary(self):
+        encoded = truncate_utf8("a" * 31 + "ñ", 32)
+        self.assertEqual(encoded, b"a" * 31)
+        self.assertEqual(truncate_utf8("Intro", 32), b"Intro")
+
+    def test_snapshot_matches_preset_by_stored_name(self):
+        state = SessionStateFile(self.path)
+        state.open()
+        long_name = "Concierto acústico " * 3
+        state.set_preset(0, long_name)
+        state, snapshot = self.reopen(state)
+        self.assertTrue(snapshot.matches(long_name))
+        self.assertFalse(snapshot.matches("Balada"))  # El banco cambió entre sesiones
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from midi.setlist import Setlist
+
+PRESET = {"switches": {"btn_0": {"input_cc": 20, "output_cc": 60, "mode": "toggle"}}}
+
+
+class SetlistTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.addCleanup(self.folder.cleanup)
+        for name in ("intro", "balada"):
+            self.write(f"{name}.json", PRESET)
+        self.setlist = Setlist(os.path.join(self.folder.name, "state.json"))
+
+    def write(self, name, data):
+        path = os.path.join(self.folder.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        return path
+
+    def test_titles_name_the_tables(self):
+        path = self.write("show.json", {"songs": [{"preset": "intro.json", "title": "Abre"}, "balada.json"],
+                                        "gesture_cc": "30"})
+        self.assertEqual(self.setlist.load(path), [])
+        self.assertEqual([song.title for song in self.setlist.songs], ["Abre", "balada"])
+        self.assertEqual(self.setlist.select(0).name, "Abre")
+        self.assertEqual(self.setlist.select(1).name, "balada")
+        self.assertEqual(self.setlist.gesture_cc, 30)
+
+    def test_invalid_footswitch_ccs_reject_the_setlist(self):
+        path = self.write("show.json", {"songs": ["intro.json"], "next_cc": 200, "prev_cc": True,
+                                        "gesture_cc": "tap"})
+        errors = self.setlist.load(path)
+        self.assertEqual(len(errors), 3)
+        self.assertEqual(self.setlist.songs, [])
+
+    def test_invalid_preset_rejects_the_whole_setlist(self):
+        self.write("roto.json", {"switches": {"btn_0": {"input_cc": 20, "output_cc": 300}}})
+        path = self.write("show.json", {"songs": ["intro.json", "roto.json"]})
+        self.assertTrue(self.setlist.load(path))
+        self.assertEqual(self.setlist.songs, [])
+
+    def test_position_is_persisted_in_background(self):
+        path = self.write("show.json", {"songs": ["intro.json", "balada.json"]})
+        self.setlist.load(path)
+        self.setlist.select(1)
+        deadline = time.monotonic() + 2
+        while self.setlist.saved_position() != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.setlist.saved_position(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
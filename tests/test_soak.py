@@ -0,0 +1,26 @@
+import time
+import unittest
+from midi.soak import Soak, slope_per_hour, soak_preset
+
+
+class SoakTest(unittest.TestCase):
+    def test_slope_per_hour(self):
+        self.assertAlmostEqual(slope_per_hour([(0, 0), (1800, 5), (3600, 10)]), 10)
+        self.assertEqual(slope_per_hour([(0, 3)]), 0.0)
+
+    def test_own_samples_are_not_counted_as_growth(self):
+        soak = Soak(100, 0, [soak_preset(0), soak_preset(1)])
+        try:
+            started = time.monotonic()
+            for _ in range(5):
+                soak.sample(started)
+        finally:
+            soak.manager.disconnect_ports()
+            soak.engine.feedback.close()
+            soak.engine.scene_player.close()
+        counts = [sample["objects"].get("dict", 0) for sample in soak.samples]
+        self.assertEqual(len(set(counts[1:])), 1, counts)
+
+
+if __name__ == "__main__":
+    unittest.main()
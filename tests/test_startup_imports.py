@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class StartupImportsTest(unittest.TestCase):
+    def test_routing_core_does_not_import_the_ui_toolkit(self):
+        code = ("import sys, main, ui, models, utils, midi.bridge; "
+                "print(sorted({'customtkinter', 'PIL', 'tkinter'} & set(sys.modules)))")
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
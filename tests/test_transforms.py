@@ -0,0 +1,52 @@
+import unittest
+from midi.transforms import Transform, TransformError, TransformStats, run_transform
+
+
+class TransformSandboxTest(unittest.TestCase):
+    def test_rejects_what_leaves_the_sandbox(self):
+        for source in ("__import__('os')", "value.__class__", "open('x')", "[x for x in states]",
+                       "lambda: 1", "2 ** 1000000", "value << 1000", "", "value +"):
+            with self.subTest(source=source), self.assertRaises(TransformError):
+                Transform(source)
+
+    def test_result_semantics(self):
+        self.assertIsNone(Transform("None")(20, 127, False, {}))
+        self.assertIsNone(Transform("value > 200")(20, 127, False, {}))
+        self.assertEqual(Transform("True")(20, 100, False, {}), 100)
+        self.assertEqual(Transform("127 - value")(20, 27, False, {}), 100)
+
+    def test_reads_other_switch_states(self):
+        transform = Transform("value if on('btn_0') else None")
+        self.assertIsNone(transform(21, 127, False, {"btn_0": False}))
+        self.assertEqual(transform(21, 127, False, {"btn_0": True}), 127)
+
+    def test_text_cannot_be_repeated(self):
+        for source in ('"x" * 99999999999', '99999999999 * "x"', '("x",) * 99999999999', 'b"x" * 2',
+                       '"%099999999d" % value', '"x" + "y"'):
+            with self.subTest(source=source), self.assertRaises(TransformError):
+                Transform(source)
+        with self.assertRaises(TransformError):  # Solo se sabe al evaluar: max(states) es un texto
+            Transform("max(states) * 99999999999")(20, 127, False, {"btn_0": True})
+        self.assertEqual(Transform("value * 2 // 4")(20, 100, False, {}), 50)
+        self.assertIsNone(Transform('None if "btn_0" in ("btn_0", "btn_1") else value')(20, 1, False, {}))
+
+    def test_out_of_range_result_is_an_error(self):
+        with self.assertRaises(TransformError):
+            Transform("value + 100")(20, 127, False, {})
+
+
+class RunTransformTest(unittest.TestCase):
+    def test_error_and_slow_warnings_are_separate_and_once(self):
+        warnings = []
+        transform = Transform("value // (value - 127) + 10")
+        transform.slow_ns = -1  # Toda evaluación cuenta como lenta
+        stats = TransformStats()
+        warn = lambda kind, control_id, source, detail: warnings.append((kind, control_id))
+        for value in (127, 127, 10, 10):
+            run_transform(transform, stats, "btn_0", 20, value, False, {}, warn)
+        self.assertEqual(warnings, [("error", "btn_0"), ("slow", "btn_0")])
+        self.assertEqual((stats.calls, stats.errors), (4, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,17 @@
-from .main_window import MidiBridgeApp
-from .controls_panel import ControlsPanel
-from .midi_ports import MidiPortsPanel
-from .console import ConsolePanel
-from .gradient_banner import AnimatedBanner, WaveBanner, ShiftingBanner, GradientBanner
+from utils.lazy import lazy_exports
 
-__all__ = ['MidiBridgeApp', 'ControlsPanel', 'MidiPortsPanel', 'ConsolePanel', 'AnimatedBanner', 'WaveBanner', 'ShiftingBanner', 'GradientBanner']
\ No newline at end of file
+# Exportaciones perezosas (PEP 562): importar el paquete no carga customtkinter ni PIL
+_EXPORTS = {
+    'MidiBridgeApp': '.main_window',
+    'ControlsPanel': '.controls_panel',
+    'MidiPortsPanel': '.midi_ports',
+    'ConsolePanel': '.console',
+    'AnimatedBanner': '.gradient_banner',
+    'WaveBanner': '.gradient_banner',
+    'ShiftingBanner': '.gradient_banner',
+    'GradientBanner': '.gradient_banner',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
@@ -1,10 +1,16 @@
+import collections
 import customtkinter as ctk
 from tkinter import scrolledtext
+from config.settings import AppSettings
 
 class ConsolePanel(ctk.CTkFrame):
     def __init__(self, parent, localization):
         super().__init__(parent)
         self.localization = localization
+        self.max_lines = AppSettings.CONSOLE_MAX_LINES
+        # Líneas a insertar (se puede llenar desde el hilo MIDI); lo que no entraría en la consola se descarta
+        self.pending = collections.deque(maxlen=self.max_lines)
+        self.flush_scheduled = False
         self.build_ui()
     
     def build_ui(self):
@@ -12,7 +18,24 @@ class ConsolePanel(ctk.CTkFrame):
         self.console.pack(fill="both", expand=True)
     
     def log(self, message):
+        """Encola la línea; las pendientes se insertan juntas cuando el loop de Tk queda libre"""
+        self.pending.append(message)
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.after_idle(self.flush)
+
+    def flush(self):
+        self.flush_scheduled = False
+        lines = []
+        while self.pending:
+            lines.append(self.pending.popleft())
+        if not lines:
+            return
         self.console.configure(state="normal")
-        self.console.insert("end", message + "\n")
+        self.console.insert("end", "\n".join(lines) + "\n")
+        # Sesiones largas: el widget no crece sin límite
+        excess = int(self.console.index("end-1c").split(".")[0]) - 1 - self.max_lines
+        if excess > 0:
+            self.console.delete("1.0", f"{excess + 1}.0")
         self.console.configure(state="disabled")
         self.console.yview("end")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from models.switch import MidiSwitch
+from config.settings import AppSettings
 
 class ControlsPanel(ctk.CTkFrame):
     def __init__(self, parent, localization, on_learn_callback, on_delete_callback, styles):
@@ -8,109 +9,190 @@ class ControlsPanel(ctk.CTkFrame):
         self.on_learn_callback = on_learn_callback
         self.on_delete_callback = on_delete_callback
         self.styles = styles
-        self.switch_frames = {}
+        self.visible_rows = AppSettings.VISIBLE_SWITCH_ROWS
+        self.switch_list = []      # Modelo completo (puede tener cientos de switches)
+        self.first_visible = 0
+        self.rows = []             # Filas de widgets reutilizadas (como máximo visible_rows)
+        self.switch_frames = {}    # control_id -> fila, solo para los switches visibles
+        self.learning_manager = None
         self.build_ui()
+        self.localization.add_listener(self.update_all_texts_fast)
     
     def build_ui(self):
         """Construye la interfaz del panel de controles"""
         # Frame para contener los switches
         self.switches_container = ctk.CTkFrame(self, border_width=1, corner_radius=2)
-        self.switches_container.pack(fill="x", pady=5)
+        self.switches_container.pack(side="left", fill="x", expand=True, pady=5)
+        
+        # Scrollbar propia: solo se desplaza la ventana de switches visibles
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.on_scrollbar)
+        
+        self.switches_container.bind("<Enter>", self._bind_mousewheel)
+        self.switches_container.bind("<Leave>", self._unbind_mousewheel)
+
+    def _bind_mousewheel(self, event=None):
+        self.bind_all("<MouseWheel>", self.on_mousewheel)
+        self.bind_all("<Button-4>", lambda e: self.scroll_to(self.first_visible - 1))
+        self.bind_all("<Button-5>", lambda e: self.scroll_to(self.first_visible + 1))
+
+    def _unbind_mousewheel(self, event=None):
+        self.unbind_all("<MouseWheel>")
+        self.unbind_all("<Button-4>")
+        self.unbind_all("<Button-5>")
+
+    def on_mousewheel(self, event):
+        self.scroll_to(self.first_visible - (1 if event.delta > 0 else -1))
+
+    def on_scrollbar(self, *args):
+        """Callback de la scrollbar ('moveto', fracción) o ('scroll', n, unidad)"""
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self.switch_list)))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll_to(self.first_visible + int(args[1]) * step)
+
+    def scroll_to(self, first_visible):
+        """Mueve la ventana visible y reasocia las filas existentes"""
+        max_first = max(0, len(self.switch_list) - self.visible_rows)
+        first_visible = max(0, min(max_first, first_visible))
+        if first_visible != self.first_visible:
+            self.first_visible = first_visible
+            self.render()
+
+    def update_scrollbar(self):
+        total = len(self.switch_list)
+        if total <= self.visible_rows:
+            self.scrollbar.pack_forget()
+            return
+        if not self.scrollbar.winfo_manager():
+            self.scrollbar.pack(side="right", fill="y", pady=5)
+        self.scrollbar.set(self.first_visible / total, (self.first_visible + self.visible_rows) / total)
+
+    def render(self):
+        """Asocia las filas de widgets a los switches de la ventana visible"""
+        window = self.switch_list[self.first_visible:self.first_visible + self.visible_rows]
+        self.switch_frames = {}
+        for index, switch in enumerate(window):
+            if index == len(self.rows):
+                self.rows.append(self.create_row())
+            row = self.rows[index]
+            self.bind_row(row, switch)
+            if not row['frame'].winfo_manager():
+                row['frame'].pack(pady=5, padx=10, fill="x")
+            self.switch_frames[switch.control_id] = row
+            self.refresh_switch_ui(switch.control_id)
+        
+        # Las filas sobrantes quedan ocultas para reutilizarlas
+        for row in self.rows[len(window):]:
+            if row['frame'].winfo_manager():
+                row['frame'].pack_forget()
+        
+        self.update_scrollbar()
+        if self.learning_manager is not None and self.learning_manager.learning_mode:
+            self.update_learning_ui(self.learning_manager)
 
     def add_switch(self, switch):
-        """Agrega un switch a la interfaz"""
+        """Agrega un switch al modelo y lo muestra desplazando la ventana si hace falta"""
+        self.switch_list.append(switch)
+        if len(self.switch_list) > self.first_visible + self.visible_rows:
+            self.first_visible = len(self.switch_list) - self.visible_rows
+        self.render()
+
+    def create_row(self):
+        """Crea los widgets de una fila de switch (sin asociarla a ningún switch)"""
+        row = {}
         frame = ctk.CTkFrame(self.switches_container, border_width=1, corner_radius=2)
-        frame.pack(pady=5, padx=10, fill="x")
         
         # Botón principal del switch
         btn = ctk.CTkButton(
             frame, 
-            text=f"{self.localization.t('switch')} {switch.switch_number}", 
+            text="", 
             fg_color=self.styles["switch_states"]["unassigned"],
             state="disabled",
-            command=lambda sid=switch.control_id: self.on_learn_callback(sid, False)
+            command=lambda: self.on_learn_callback(row['switch'].control_id, False)
         )
         btn.pack(side="left", padx=5, pady=5)
         
         # SELECTOR DE MODO - CON TRADUCCIÓN
         mode_display_values = [self.localization.t("toggle"), self.localization.t("momentary")]
-        mode_var = switch.mode_var
 
         def on_mode_change(new_display_value):
             # Convertir texto mostrado a valor interno
             if new_display_value == self.localization.t("toggle"):
-                mode_var.set("toggle")
+                row['switch'].mode_var.set("toggle")
             elif new_display_value == self.localization.t("momentary"):
-                mode_var.set("momentary")
-        
-        # Configurar valor inicial del display
-        current_internal_value = mode_var.get()
-        if current_internal_value == "toggle":
-            current_display_value = self.localization.t("toggle")
-        else:
-            current_display_value = self.localization.t("momentary")
+                row['switch'].mode_var.set("momentary")
         
         mode_menu = ctk.CTkOptionMenu(
             frame, 
             values=mode_display_values,
-            variable=ctk.StringVar(value=current_display_value),
+            variable=ctk.StringVar(value=mode_display_values[0]),
             command=on_mode_change
         )
         mode_menu.pack(side="right", padx=5)
         
         # Campo CC Entrada
-        ctk.CTkLabel(frame, text=self.localization.t("input_cc")).pack(side="left", padx=(10, 2))
-        entry_cc = ctk.CTkEntry(frame, width=100, textvariable=switch.input_cc_var, state="readonly")
+        input_label = self.localization.bind(ctk.CTkLabel(frame), "input_cc")
+        input_label.pack(side="left", padx=(10, 2))
+        entry_cc = ctk.CTkEntry(frame, width=100, state="readonly")
         entry_cc.pack(side="left", padx=5)
         
         # Campo CC Salida
-        ctk.CTkLabel(frame, text=self.localization.t("output_cc")).pack(side="left", padx=(10, 2))
-        entry_cc_out = ctk.CTkEntry(frame, width=80, textvariable=switch.output_cc_var)
+        output_label = self.localization.bind(ctk.CTkLabel(frame), "output_cc")
+        output_label.pack(side="left", padx=(10, 2))
+        entry_cc_out = ctk.CTkEntry(frame, width=80)
         entry_cc_out.pack(side="left", padx=5)
         
-        # Botón eliminar (solo para switches no por defecto)
-        if not switch.is_default:
-            delete_btn = ctk.CTkButton(
-                frame, 
-                text=self.localization.t("delete"), 
-                width=60, 
-                fg_color=self.styles["buttons"]["delete"]["fg_color"],
-                command=lambda sid=switch.control_id: self.on_delete_callback(sid)
-            )
-            delete_btn.pack(side="left", padx=5)
+        # Botón eliminar (se muestra solo para switches no por defecto)
+        delete_btn = ctk.CTkButton(
+            frame, 
+            width=60, 
+            fg_color=self.styles["buttons"]["delete"]["fg_color"],
+            command=lambda: self.on_delete_callback(row['switch'].control_id)
+        )
+        self.localization.bind(delete_btn, "delete")
         
-        # Guardar referencia
-        self.switch_frames[switch.control_id] = {
+        row.update({
             'frame': frame,
             'button': btn,
             'mode_menu': mode_menu,
+            'input_label': input_label,
+            'output_label': output_label,
             'input_entry': entry_cc,
             'output_entry': entry_cc_out,
-            'switch': switch
-        }
-        
-        # Actualizar UI del switch
-        self.refresh_switch_ui(switch.control_id)
+            'delete_button': delete_btn,
+            'switch': None,
+            'rendered': None
+        })
+        return row
+
+    def bind_row(self, row, switch):
+        """Asocia una fila (nueva o reciclada) a un switch"""
+        if row['switch'] is switch:
+            return
+        row['switch'] = switch
+        row['input_entry'].configure(textvariable=switch.input_cc_var)
+        row['output_entry'].configure(textvariable=switch.output_cc_var)
+        if switch.is_default:
+            row['delete_button'].pack_forget()
+        elif not row['delete_button'].winfo_manager():
+            row['delete_button'].pack(side="left", padx=5)
+        row['rendered'] = None
 
     def delete_switch(self, control_id):
         """Elimina un switch de la interfaz"""
-        if control_id in self.switch_frames:
-            self.switch_frames[control_id]['frame'].destroy()
-            del self.switch_frames[control_id]
+        self.switch_list = [switch for switch in self.switch_list if switch.control_id != control_id]
+        self.sync_switches(self.switch_list)
     
     def clear_switches(self):
-        """Limpia todos los switches de la interfaz"""
-        # Destruir todos los frames de switches
-        for control_id in list(self.switch_frames.keys()):
-            self.switch_frames[control_id]['frame'].destroy()
-        
-        # Limpiar el diccionario
-        self.switch_frames.clear()
-        
-        # Reconstruir el contenedor
-        self.switches_container.destroy()
-        self.switches_container = ctk.CTkFrame(self)
-        self.switches_container.pack(fill="x", pady=5)
+        """Limpia todos los switches de la interfaz (las filas quedan ocultas para reutilizarse)"""
+        self.sync_switches([])
+
+    def sync_switches(self, switches):
+        """Sincroniza la lista visible con el modelo actualizando solo lo que cambió"""
+        self.switch_list = list(switches)
+        self.first_visible = max(0, min(self.first_visible, len(self.switch_list) - self.visible_rows))
+        self.render()
 
     def refresh_switch_ui(self, control_id):
         """Actualiza la UI de un switch específico"""
@@ -118,6 +200,11 @@ class ControlsPanel(ctk.CTkFrame):
             elements = self.switch_frames[control_id]
             switch = elements['switch']
             
+            # Sincronizar el modo mostrado con el valor interno
+            mode_text = self.localization.t("toggle") if switch.mode_var.get() == "toggle" else self.localization.t("momentary")
+            if elements['mode_menu'].get() != mode_text:
+                elements['mode_menu'].set(mode_text)
+            
             input_cc_value = switch.input_cc_var.get()
             not_assigned_text = self.localization.t("not_assigned")
             
@@ -135,22 +222,23 @@ class ControlsPanel(ctk.CTkFrame):
                     switch.input_cc_var.set(not_assigned_text)
             
             if not is_assigned:
-                elements['button'].configure(
-                    text=f"{self.localization.t('switch')} {switch.switch_number}",
-                    fg_color=self.styles["switch_states"]["unassigned"],
-                    state="disabled"
-                )
+                btn_text = f"{self.localization.t('switch')} {switch.switch_number}"
+                color = self.styles["switch_states"]["unassigned"]
             else:
                 # Usar colores del JSON según el estado
                 color = self.styles["switch_states"]["assigned_on"] if switch.state else self.styles["switch_states"]["assigned_off"]
                 on_text = self.localization.t("on")
                 off_text = self.localization.t("off")
                 btn_text = f"CC{input_cc_value}→CC{switch.output_cc_var.get()}: {on_text if switch.state else off_text}"
+            
+            # Solo reconfigurar el botón si lo mostrado cambió
+            if elements['rendered'] != (btn_text, color):
                 elements['button'].configure(
                     text=btn_text,
                     fg_color=color,
                     state="disabled"
                 )
+                elements['rendered'] = (btn_text, color)
 
     def refresh_all_switches(self):
         """Actualiza todos los switches"""
@@ -159,8 +247,10 @@ class ControlsPanel(ctk.CTkFrame):
   
     def update_learning_ui(self, learning_manager):
         """Actualiza la UI durante el modo aprendizaje"""
+        self.learning_manager = learning_manager
         for control_id, elements in self.switch_frames.items():
             btn = elements['button']
+            elements['rendered'] = None
 
             if learning_manager.learning_mode:
                 btn.configure(state="normal")
@@ -188,35 +278,13 @@ class ControlsPanel(ctk.CTkFrame):
 
     def update_all_texts_fast(self):
         """Actualiza solo los textos esenciales - MÁXIMA VELOCIDAD"""
-        for control_id, elements in self.switch_frames.items():
-            switch = elements['switch']
-            
-            # Actualizar OptionMenu
-            mode_menu = elements['mode_menu']
-            current_internal_value = switch.mode_var.get()
-            new_values = [self.localization.t("toggle"), self.localization.t("momentary")]
-            
-            if current_internal_value == "toggle":
-                current_display_value = self.localization.t("toggle")
-            else:
-                current_display_value = self.localization.t("momentary")
-            
-            mode_menu.configure(values=new_values)
-            mode_menu.set(current_display_value)
-            
-            # Actualizar etiquetas de CC
-            for widget in elements['frame'].winfo_children():
-                if isinstance(widget, ctk.CTkLabel):
-                    text = widget.cget("text")
-                    if text in ["CC Entrada:", "Input CC:"]:
-                        widget.configure(text=self.localization.t("input_cc"))
-                    elif text in ["CC Salida:", "Output CC:"]:
-                        widget.configure(text=self.localization.t("output_cc"))
-            
-            # Actualizar botón de eliminar si existe
-            for widget in elements['frame'].winfo_children():
-                if isinstance(widget, ctk.CTkButton) and widget.cget("text") in ["Eliminar", "Delete"]:
-                    widget.configure(text=self.localization.t("delete"))
-            
-            # Refrescar switch (actualiza el botón principal)
+        new_values = [self.localization.t("toggle"), self.localization.t("momentary")]
+        
+        # Etiquetas y botón eliminar los actualiza el registro de Localization;
+        # aquí solo queda lo que depende del estado de cada fila
+        for elements in self.rows:
+            elements['mode_menu'].configure(values=new_values)
+        
+        # Refrescar switches visibles (modo mostrado y botón principal)
+        for control_id in self.switch_frames:
             self.refresh_switch_ui(control_id)
\ No newline at end of file
@@ -50,6 +50,7 @@ class AnimatedBanner:
     
     def __init__(self, banner_frame):
         self.banner_frame = banner_frame
+        self.gradient_photo = None  # Un único CTkImage: cada frame solo le cambia la imagen
         self.animating = False
         self.animation_thread = None
         self.gradient_label = None
@@ -76,9 +77,11 @@ class AnimatedBanner:
             height = self.banner_frame.winfo_height() or 120
             
             gradient_image = GradientCreator.create_gradient_banner(width, height, colors)
-            gradient_photo = ctk.CTkImage(gradient_image, size=(width, height))
-            
-            self.gradient_label.configure(image=gradient_photo)
+            if self.gradient_photo is None:
+                self.gradient_photo = ctk.CTkImage(gradient_image, size=(width, height))
+                self.gradient_label.configure(image=self.gradient_photo)
+            else:
+                self.gradient_photo.configure(light_image=gradient_image, size=(width, height))
                     
         except Exception as e:
             print(f"Error actualizando colores: {e}")
@@ -233,12 +236,15 @@ def create_animated_banner(parent, animation_type="breathing"):
     gradient_photo_ref = None
     
     def create_gradient_image(width, height, colors=None):
-        """Función auxiliar para crear la imagen de gradiente"""
+        """Función auxiliar para crear la imagen de gradiente (reutiliza el CTkImage en cada frame)"""
         nonlocal gradient_photo_ref
         gradient_image = GradientCreator.create_gradient_banner(width, height, colors)
-        gradient_photo = ctk.CTkImage(gradient_image, size=(width, height))
-        gradient_photo_ref = gradient_photo  # Mantener referencia
-        return gradient_photo
+        if gradient_photo_ref is None:
+            gradient_photo_ref = ctk.CTkImage(gradient_image, size=(width, height))
+        else:
+            # El CTkImage avisa a su label; no se crea otro PhotoImage por frame ni se re-registra el callback
+            gradient_photo_ref.configure(light_image=gradient_image, size=(width, height))
+        return gradient_photo_ref
     
     # Crear gradiente inicial
     initial_photo = create_gradient_image(800, 120)
@@ -279,8 +285,7 @@ def create_animated_banner(parent, animation_type="breathing"):
         try:
             width = banner_frame.winfo_width() or 800
             height = banner_frame.winfo_height() or 120
-            new_photo = create_gradient_image(width, height, colors)
-            gradient_label.configure(image=new_photo)
+            create_gradient_image(width, height, colors)
         except Exception as e:
             print(f"Error en actualización: {e}")
     
@@ -1,54 +1,105 @@
 import customtkinter as ctk
-import os, sys
+import os
 import json
+import time
 from tkinter import filedialog
 
-from utils.localization import Localization
-from midi.manager import MidiManager
+from midi.bridge import BridgeCore
 from midi.learning import LearningManager
+from midi.routing import switch_slot
+from midi.preset_loader import compile_preset, load_preset, PresetValidationError
+from midi.setlist import Setlist
+from midi.gestures import GestureDetector
 from ui.midi_ports import MidiPortsPanel
 from ui.controls_panel import ControlsPanel
 from ui.console import ConsolePanel
-from ui.gradient_banner import create_animated_banner, GradientBanner
+from midi.control import ControlApi, ControlServer
+from midi.metrics import BridgeMetrics, Histogram, MetricsServer, LAG_BUCKETS_NS
+from midi.clock import MidiClock, TapTempo
 from utils.file_utils import FileManager
+from utils.autosave import AutosaveWriter
+from utils.resources import resource_path
+from utils.idle import IdleGovernor
 from models.configuration import AppConfiguration
 from models.switch import MidiSwitch
-from config.settings import AppSettings
-
-def resource_path(relative_path):
-    """ Get absolute path to resource, works for dev and for PyInstaller """
-    try:
-        base_path = sys._MEIPASS
-    except Exception:
-        base_path = os.path.abspath(".")
-
-    return os.path.join(base_path, relative_path)
-
-
-
-ctk.set_appearance_mode("dark")  # o "light" o "system"
-
-# Ruta al tema personalizado (por ejemplo, themes/custom_theme.json)
-theme_path = os.path.join(os.path.dirname(__file__), "..", "config", "custom_theme.json")
-ctk.set_default_color_theme(theme_path)
 
 
+def configure_theme():
+    """Tema de customtkinter; se aplica al crear la ventana, no al importar el módulo"""
+    ctk.set_appearance_mode("dark")  # o "light" o "system"
+    # Ruta al tema personalizado (por ejemplo, themes/custom_theme.json)
+    ctk.set_default_color_theme(os.path.join(os.path.dirname(__file__), "..", "config", "custom_theme.json"))
 
 
 class MidiBridgeApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, core=None):
+        # El ruteo (BridgeCore) se arma antes que la ventana: el pedal ya funciona mientras carga la UI
+        core = core or BridgeCore()
+        configure_theme()
         super().__init__()
 
+        self.core = core
+        self.startup = core.startup
+        self.startup_report = core.startup_report
+        self.ui_ready = False
+        self.startup_log = core.startup_log  # Mensajes previos a la consola
+        self.is_connected = core.is_connected
+        self.session_routed = core.session_routed
         self.animated_banner = None
-
-        # Inicializar componentes
-        self.localization = Localization()
-        self.midi_manager = MidiManager()
+        self.banner_frame = None
+
+        self.settings = core.settings
+        self.resources = core.resources
+        self.localization = core.localization
+        self.midi_manager = core.midi_manager
+        self.routing_engine = core.routing_engine
+        self.scene_player = core.scene_player
+        self.scene_player.on_done = self.on_scene_played
+        self.routing_engine.on_scene = self.on_scene_changed
+        self.routing_engine.on_capture = self.on_scene_table_captured
+        self.routing_engine.on_transform_warning = self.on_transform_warning
+        self.preset_bank = core.preset_bank
+        self.session_state = core.session_state
+        self.recorder = core.recorder
+        self.startup_config = core.startup_config
+        previous_session = core.previous_session
+
+        # Tap tempo y reloj MIDI (el hilo del reloj arranca con el primer tempo)
+        self.tap_tempo = TapTempo()
+        self.midi_clock = MidiClock(self.midi_manager.send_realtime)
         self.learning_manager = LearningManager()
         self.file_manager = FileManager()
-        self.settings = AppSettings()
+        self.preset_library = None
+        self.preset_library_window = None
         self.configuration = AppConfiguration()
-        
+        self.setlist = Setlist(self.settings.SETLIST_STATE_FILE)
+
+        self.autosave = AutosaveWriter(
+            self.settings.AUTOSAVE_FILE,
+            self.routing_engine.snapshot_config,
+            self.settings.AUTOSAVE_DELAY_MS
+        )
+
+        # API de control local para automatización
+        self.control_api = ControlApi(
+            self.routing_engine, self.preset_bank, self.midi_manager, self.on_control_applied
+        )
+        self.control_server = ControlServer(self.control_api)
+        self.control_server.start()
+
+        # Métricas opcionales (se activan con metrics_port en la configuración)
+        self.loop_lag = Histogram(LAG_BUCKETS_NS)
+        self.metrics_server = None
+        self.lag_probe_id = None
+        self.lag_probe_paused = False
+        self.autosave_report_id = None
+
+        # Reposo: sin MIDI ni interacción se detienen animaciones y temporizadores
+        self.governor = IdleGovernor(self, self.settings.IDLE_AFTER_MS, self.enter_idle, self.exit_idle)
+        self.metrics = BridgeMetrics(
+            self.midi_manager, self.routing_engine, self.autosave, self.loop_lag, self.governor, self.scene_player,
+            self.midi_clock
+        )
 
         # Cargar estilos desde JSON
         self.app_styles = self.load_app_styles()
@@ -62,23 +113,47 @@ class MidiBridgeApp(ctk.CTk):
 
         # Estado de la aplicación
         self.switches = {}
-        self.is_connected = False
+        self._applying_configuration = False
+        self._routing_rebuild_pending = False
+        self._routing_errors = None  # Últimos errores informados al recompilar desde la UI
         
         self.build_ui_with_banner()
+        self.localization.add_listener(self.update_ui_texts)
         self.initialize_default_switches()
+        for message in self.startup_log:
+            self.console_panel.log(message)
+        self.startup_log = []
         self.load_configuration_auto()
+        if self.midi_manager.is_connected():
+            self.show_connected(self.midi_manager.input_name, self.midi_manager.output_name)
+        self.resume_setlist()
+        self.restore_session(previous_session)
+        self.ui_ready = True
+        self.core.attach(self.on_midi_message)
+        if self.core.routed:
+            self.autosave.mark_dirty()  # Estados cambiados desde el pedal mientras cargaba la UI
+            if self.startup_report:
+                self.after(0, self.finish_startup_report)
+        self.startup.mark("ui")
+        self.after(0, self.startup.mark, "mainloop")
+        
+        self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.autosave_report_id = self.after(self.settings.AUTOSAVE_REPORT_MS, self.report_autosave)
+        for sequence in ("<Any-KeyPress>", "<Any-ButtonPress>", "<Motion>"):
+            self.bind_all(sequence, self.on_user_activity, add="+")
+        self.governor.start()
     
     def build_ui_with_banner(self):
-        """Construye la interfaz con banner gradiente"""
+        """Construye la interfaz; el banner gradiente se crea después del primer frame"""
         # Frame principal
         main_frame = ctk.CTkFrame(self, fg_color="transparent")
         main_frame.pack(fill="both", expand=True, padx=0, pady=0)
 
-        # Crear banner animado (elige el tipo: "breathing", "shifting", "wave")
-        banner_frame, self.animated_banner = create_animated_banner(
-            main_frame, 
-            animation_type="breathing"  # ← Elige tu animación favorita
-        )
+        # Lugar reservado para el banner (misma altura, sin imagen todavía)
+        self.banner_frame = ctk.CTkFrame(main_frame, height=120, corner_radius=0)
+        self.banner_frame.pack(fill="x", padx=0, pady=0)
+        self.banner_frame.pack_propagate(False)
+        self.after(self.settings.BANNER_DELAY_MS, self.build_banner)
 
         # Contenido principal (tu UI existente)
         content_frame = ctk.CTkFrame(main_frame, corner_radius=0)
@@ -86,46 +161,16 @@ class MidiBridgeApp(ctk.CTk):
         
         self.build_main_content(content_frame)
 
-    def build_ui(self):
-        """Construye la interfaz principal"""
-        # Frame principal
-        main_frame = ctk.CTkFrame(self)
-        main_frame.pack(fill="both", expand=True, padx=8, pady=8)
-
-        # Título
-        ctk.CTkLabel(main_frame, text=self.localization.t("app_title"), 
-                    font=("Arial", 20, "bold")).pack(pady=8)
-
-        # Panel de configuración
-        self.config_frame = ctk.CTkFrame(main_frame, corner_radius=2)
-        self.config_frame.pack(pady=8, padx=8, fill="x")
-        self.build_configuration_panel()
-
-        # Panel de controles MIDI - ¡PASAR LOS ESTILOS!
-        self.controls_panel = ControlsPanel(
-            self.config_frame, 
-            self.localization, 
-            self.on_learn_request, 
-            self.on_delete_switch,
-            self.app_styles
-        )
-        self.controls_panel.pack(fill="x", pady=5)
-
-        # Botón agregar switch con manejo seguro
-        add_switch_style = self.app_styles.get("buttons", {}).get("add_switch", {})
-        self.add_switch_btn = ctk.CTkButton(
-            self.config_frame, 
-            text=f"+ {self.localization.t('add_switch')}", 
-            command=self.add_new_switch, 
-            fg_color=add_switch_style.get("fg_color", "#28a745")
-        )
-        self.add_switch_btn.pack(pady=10)
-        self.update_add_button_state()
-
+    def build_banner(self):
+        """Crea el banner animado (PIL se importa recién acá)"""
+        from ui.gradient_banner import create_animated_banner
 
-        # Consola
-        self.console_panel = ConsolePanel(main_frame, self.localization)
-        self.console_panel.pack(fill="both", expand=True, pady=10, padx=10)
+        # Crear banner animado (elige el tipo: "breathing", "shifting", "wave")
+        _, self.animated_banner = create_animated_banner(
+            self.banner_frame, 
+            animation_type="breathing"  # ← Elige tu animación favorita
+        )
+        self.startup.mark("banner")
 
     def create_header_banner(self, parent):
         """Crea el banner header con animación"""
@@ -176,7 +221,7 @@ class MidiBridgeApp(ctk.CTk):
         input_container = ctk.CTkFrame(row2_frame, fg_color="transparent")
         input_container.pack(side="left", padx=6)
         
-        ctk.CTkLabel(input_container, text=self.localization.t("input_midi")).pack(side="left", padx=(0, 6))
+        self.localization.bind(ctk.CTkLabel(input_container), "input_midi").pack(side="left", padx=(0, 6))
         self.input_menu = ctk.CTkOptionMenu(
             input_container, 
             values=self.get_input_ports(),
@@ -190,7 +235,7 @@ class MidiBridgeApp(ctk.CTk):
         output_container = ctk.CTkFrame(row2_frame, fg_color="transparent")
         output_container.pack(side="right", padx=6)
         
-        ctk.CTkLabel(output_container, text=self.localization.t("output_midi")).pack(side="left", padx=(0, 6))
+        self.localization.bind(ctk.CTkLabel(output_container), "output_midi").pack(side="left", padx=(0, 6))
         self.output_menu = ctk.CTkOptionMenu(
             output_container, 
             values=self.get_output_ports(),
@@ -240,40 +285,92 @@ class MidiBridgeApp(ctk.CTk):
 
         self.save_btn = ctk.CTkButton(
             button_container2, 
-            text=self.localization.t("save_config"), 
             command=self.save_configuration,
             fg_color=self.app_styles["buttons"]["save"]["fg_color"],
             width=120,
             height=32,
             corner_radius=4
         )
+        self.localization.bind(self.save_btn, "save_config")
         self.save_btn.pack(side="left", padx=6)
 
         self.load_btn = ctk.CTkButton(
             button_container2, 
-            text=self.localization.t("load_config"), 
             command=self.load_configuration,
             fg_color=self.app_styles["buttons"]["load"]["fg_color"],
             width=120,
             height=32,
             corner_radius=4
         )
+        self.localization.bind(self.load_btn, "load_config")
         self.load_btn.pack(side="left", padx=6)
 
+        # Banco de presets precompilados
+        preset_names = self.preset_bank.names()
+        self.preset_menu = ctk.CTkOptionMenu(
+            button_container2,
+            values=preset_names or [self.localization.t("no_presets")],
+            command=self.on_preset_selected,
+            state="normal" if preset_names else "disabled",
+            width=160,
+            height=32,
+            corner_radius=4
+        )
+        if 0 <= self.preset_bank.index < len(preset_names):
+            self.preset_menu.set(preset_names[self.preset_bank.index])
+        self.preset_menu.pack(side="left", padx=6)
+
+        self.library_btn = ctk.CTkButton(
+            button_container2,
+            command=self.open_preset_library,
+            fg_color=self.app_styles["buttons"]["load"]["fg_color"],
+            width=120,
+            height=32,
+            corner_radius=4
+        )
+        self.localization.bind(self.library_btn, "preset_library")
+        self.library_btn.pack(side="left", padx=6)
+
+        # Fila 5: Setlist - CENTRADO
+        row5_frame = ctk.CTkFrame(self.config_frame, corner_radius=2, fg_color="transparent")
+        row5_frame.pack(fill="x", pady=(0, 20))
+
+        button_container3 = ctk.CTkFrame(row5_frame, fg_color="transparent")
+        button_container3.pack(expand=True, anchor="center")
+
+        self.setlist_btn = ctk.CTkButton(
+            button_container3,
+            command=self.load_setlist,
+            fg_color=self.app_styles["buttons"]["load"]["fg_color"],
+            width=120,
+            height=32,
+            corner_radius=4
+        )
+        self.localization.bind(self.setlist_btn, "load_setlist")
+        self.setlist_btn.pack(side="left", padx=6)
+
+        self.prev_song_btn = ctk.CTkButton(
+            button_container3, text="◀", command=lambda: self.step_song(-1),
+            width=40, height=32, corner_radius=4
+        )
+        self.prev_song_btn.pack(side="left", padx=6)
+
+        self.song_label = ctk.CTkLabel(button_container3, text=self.get_song_text(), width=220)
+        self.song_label.pack(side="left", padx=6)
+
+        self.next_song_btn = ctk.CTkButton(
+            button_container3, text="▶", command=lambda: self.step_song(1),
+            width=40, height=32, corner_radius=4
+        )
+        self.next_song_btn.pack(side="left", padx=6)
+
     def load_app_styles(self):
-            """Carga los estilos específicos de la aplicación (no el tema CTk)"""
-            try:
-                styles_path = resource_path("config/styles.json")
-                with open(styles_path, 'r', encoding='utf-8') as f:
-                    styles = json.load(f)
-                    
-                # Combinar con valores por defecto
-                default_styles = self.get_default_app_styles()
-                return self.merge_styles(default_styles, styles)
-                
-            except Exception as e:
-                print(f"Error cargando estilos de aplicación: {e}")
+            """Estilos específicos de la aplicación (no el tema CTk), ya parseados en la caché de recursos"""
+            styles = self.resources.get("styles")
+            if not isinstance(styles, dict):
                 return self.get_default_app_styles()
+            # Combinar con valores por defecto
+            return self.merge_styles(self.get_default_app_styles(), styles)
 
     def build_main_content(self, parent):
             """Construye el contenido principal debajo del banner"""
@@ -329,13 +426,15 @@ class MidiBridgeApp(ctk.CTk):
             control_id = f"btn_{i}"
             switch = MidiSwitch(control_id, i + 1)
             self.switches[control_id] = switch
+            self.watch_switch(switch)
             self.controls_panel.add_switch(switch)
+        self.schedule_routing_rebuild()
 
     def change_language(self, language):
         """Cambia el idioma de la aplicación - VERSIÓN OPTIMIZADA"""
         if language != self.localization.current_language:
-            self.localization.current_language = language
-            self.update_ui_texts()
+            self.localization.set_language(language)
+            self.schedule_routing_rebuild()
 
     def merge_styles(self, default, loaded):
         """Combina estilos por defecto con los cargados"""
@@ -386,6 +485,11 @@ class MidiBridgeApp(ctk.CTk):
                     "active_button": "#ffc107",
                     "waiting_button": "#17a2b8",
                     "available_button": "#6f42c1"
+                },
+                "preset_library": {
+                    "list_bg": "#2b2b2b",
+                    "list_fg": "#f8f9fa",
+                    "select_bg": "#007bff"
                 }
             }
 
@@ -393,10 +497,93 @@ class MidiBridgeApp(ctk.CTk):
 
     def on_closing(self):
         """Método para cerrar la aplicación correctamente"""
+        self.governor.stop()
         if self.animated_banner:
             self.animated_banner.stop_animation()
+        self.autosave.stop()
+        self.recorder.stop()
+        self.control_server.stop()
+        self.stop_metrics()
+        self.routing_engine.feedback = None
+        self.midi_manager.close_feedback()
+        self.scene_player.close()
+        self.midi_clock.close()
+        self.midi_manager.close_network_output()
+        self.midi_manager.close_network_input()
+        self.midi_manager.close_osc_output()
+        self.session_state.close()
         self.destroy()
 
+    def start_metrics(self, port):
+        """Levanta el endpoint /metrics y la medición del retraso del loop de Tk"""
+        self.metrics_server = MetricsServer(port, self.metrics.render)
+        if self.metrics_server.start():
+            self.start_lag_probe()
+        else:
+            self.metrics_server = None
+
+    def stop_metrics(self):
+        if self.metrics_server:
+            self.metrics_server.stop()
+            self.metrics_server = None
+            self.stop_lag_probe()
+
+    def start_lag_probe(self):
+        if self.lag_probe_id is None:
+            self.lag_expected = time.perf_counter_ns() + self.settings.LOOP_LAG_PROBE_MS * 1_000_000
+            self.lag_probe_id = self.after(self.settings.LOOP_LAG_PROBE_MS, self.probe_loop_lag)
+
+    def stop_lag_probe(self):
+        if self.lag_probe_id is not None:
+            self.after_cancel(self.lag_probe_id)
+            self.lag_probe_id = None
+
+    def probe_loop_lag(self):
+        """Compara cuándo corrió el callback con cuándo debía correr"""
+        now = time.perf_counter_ns()
+        self.loop_lag.observe(max(0, now - self.lag_expected))
+        self.lag_expected = now + self.settings.LOOP_LAG_PROBE_MS * 1_000_000
+        self.lag_probe_id = self.after(self.settings.LOOP_LAG_PROBE_MS, self.probe_loop_lag)
+
+    def report_autosave(self):
+        """Informa periódicamente las escrituras a disco del autosave"""
+        writes = self.autosave.writes_per_minute()
+        if writes:
+            self.console_panel.log(self.localization.format("autosave_stats",
+                writes=writes, last_ms=self.autosave.last_write_ms, max_ms=self.autosave.max_write_ms
+            ))
+        self.autosave_report_id = self.after(self.settings.AUTOSAVE_REPORT_MS, self.report_autosave)
+
+    def on_user_activity(self, event=None):
+        self.governor.activity()
+
+    def enter_idle(self):
+        """Reposo: detiene el banner, la medición del loop, los reportes, el vaciado del grabador y el reloj libre"""
+        if self.animated_banner:
+            self.animated_banner.stop_animation()
+        self.lag_probe_paused = self.lag_probe_id is not None
+        self.stop_lag_probe()
+        if self.autosave_report_id is not None:
+            self.after_cancel(self.autosave_report_id)
+            self.autosave_report_id = None
+        self.recorder.set_idle(True)
+        self.midi_clock.set_idle(True)
+
+    def exit_idle(self, summary):
+        """Primer MIDI o interacción tras el reposo: se reanuda todo y se informa el consumo en reposo"""
+        self.recorder.set_idle(False)
+        self.midi_clock.set_idle(False)
+        if self.animated_banner:
+            self.animated_banner.start_animation()
+        if self.lag_probe_paused:
+            self.start_lag_probe()
+        self.autosave_report_id = self.after(self.settings.AUTOSAVE_REPORT_MS, self.report_autosave)
+        wakeups = summary["wakeups_per_s"]
+        self.console_panel.log(self.localization.format("idle_report",
+            seconds=summary["seconds"], cpu=summary["cpu_percent"],
+            wakeups="?" if wakeups is None else f"{wakeups:.1f}"
+        ))
+
 
 
 
@@ -443,29 +630,6 @@ class MidiBridgeApp(ctk.CTk):
 
 
 
-    def rebuild_ui(self):
-        """Reconstruye completamente la interfaz"""
-        # Guardar estado actual
-        was_connected = self.is_connected
-        
-        # Reconstruir UI
-        for widget in self.winfo_children():
-            widget.destroy()
-        
-        self.build_ui()
-        
-        # Restaurar switches
-        for control_id, switch in self.switches.items():
-            self.controls_panel.add_switch(switch)
-        
-        # Restaurar estado de conexión
-        if was_connected:
-            self.connect_btn.configure(text=self.localization.t("disconnect"), fg_color="red")
-            self.learn_btn.configure(
-                state="normal",
-                    fg_color=self.app_styles["buttons"]["learn"]["ready_fg_color"]
-        )
-
     def on_learn_request(self, control_id, is_output=False):
         """Maneja solicitud de aprendizaje - VERSIÓN CORREGIDA"""
         self.console_panel.log(f"DEBUG: on_learn_request - control_id: {control_id}, is_output: {is_output}")
@@ -478,7 +642,7 @@ class MidiBridgeApp(ctk.CTk):
         if (self.learning_manager.learning_mode and 
             self.learning_manager.learning_control_id == control_id):
             self.learning_manager.learning_control_id = None
-            self.console_panel.log(self.localization.t("learn_cancelled").format(control_id=control_id))  # ← CAMBIADO
+            self.console_panel.log(self.localization.format("learn_cancelled", control_id=control_id))  # ← CAMBIADO
             self.update_learning_ui()
             return
         
@@ -486,10 +650,10 @@ class MidiBridgeApp(ctk.CTk):
         self.learning_manager.learning_mode = True
         if is_output:
             self.learning_manager.start_learning_output(control_id)
-            self.console_panel.log(self.localization.t("debug_learning_output").format(control_id=control_id))  # ← CAMBIADO
+            self.console_panel.log(self.localization.format("debug_learning_output", control_id=control_id))  # ← CAMBIADO
         else:
             self.learning_manager.start_learning_input(control_id)
-            self.console_panel.log(self.localization.t("debug_learning_input").format(control_id=control_id))  # ← CAMBIADO
+            self.console_panel.log(self.localization.format("debug_learning_input", control_id=control_id))  # ← CAMBIADO
         
         self.update_learning_ui()
 
@@ -507,7 +671,7 @@ class MidiBridgeApp(ctk.CTk):
         if control_id in self.switches:
             # No permitir eliminar switches por defecto
             if self.switches[control_id].is_default:
-                self.console_panel.log(self.localization.t("cannot_delete_default").format(  # ← CAMBIADO
+                self.console_panel.log(self.localization.format("cannot_delete_default",   # ← CAMBIADO
                     default_switches=self.settings.DEFAULT_SWITCHES
                 ))
                 return
@@ -515,7 +679,8 @@ class MidiBridgeApp(ctk.CTk):
             del self.switches[control_id]
             self.controls_panel.delete_switch(control_id)
             self.update_add_button_state()
-            self.console_panel.log(self.localization.t("switch_deleted").format(control_id=control_id))  # ← CAMBIADO
+            self.schedule_routing_rebuild()
+            self.console_panel.log(self.localization.format("switch_deleted", control_id=control_id))  # ← CAMBIADO
 
 
 
@@ -527,7 +692,7 @@ class MidiBridgeApp(ctk.CTk):
     def add_new_switch(self):
         """Agrega un nuevo switch"""
         if len(self.switches) >= self.settings.MAX_SWITCHES:
-            self.console_panel.log(self.localization.t("max_switches_reached").format(  # ← CAMBIADO
+            self.console_panel.log(self.localization.format("max_switches_reached",   # ← CAMBIADO
                 max_switches=self.settings.MAX_SWITCHES
             ))
             return
@@ -539,10 +704,12 @@ class MidiBridgeApp(ctk.CTk):
         control_id = f"btn_{next_id}"
         switch = MidiSwitch(control_id, next_id + 1)
         self.switches[control_id] = switch
+        self.watch_switch(switch)
         self.controls_panel.add_switch(switch)
         self.update_add_button_state()
+        self.schedule_routing_rebuild()
         
-        self.console_panel.log(self.localization.t("new_switch_added").format(control_id=control_id))  # ← CAMBIADO
+        self.console_panel.log(self.localization.format("new_switch_added", control_id=control_id))  # ← CAMBIADO
 
     def update_add_button_state(self):
         """Actualiza estado del botón agregar"""
@@ -573,23 +740,27 @@ class MidiBridgeApp(ctk.CTk):
         output_port = self.output_menu.get()
         
         if self.midi_manager.connect_ports(input_port, output_port, self.on_midi_message):
-            self.is_connected = True
-            self.connect_btn.configure(
-                text=self.localization.t("disconnect"), 
-                fg_color=self.app_styles["buttons"]["connect"]["connected_fg_color"]
-            )
-            self.learn_btn.configure(
-                state="normal",
-                fg_color=self.app_styles["buttons"]["load"]["fg_color"]
-            )
-            self.console_panel.log(self.localization.t("connected_to").format(  # ← CAMBIADO
-                input_port=input_port, output_port=output_port
-            ))
+            self.show_connected(input_port, output_port)
             return True
         else:
             self.console_panel.log(self.localization.t("error_connecting_ports"))  # ← CAMBIADO
             return False
 
+    def show_connected(self, input_port, output_port):
+        """Refleja en la UI los puertos ya abiertos (desde el botón o desde el arranque)"""
+        self.is_connected = True
+        self.connect_btn.configure(
+            text=self.localization.t("disconnect"), 
+            fg_color=self.app_styles["buttons"]["connect"]["connected_fg_color"]
+        )
+        self.learn_btn.configure(
+            state="normal",
+            fg_color=self.app_styles["buttons"]["load"]["fg_color"]
+        )
+        self.console_panel.log(self.localization.format("connected_to",   # ← CAMBIADO
+            input_port=input_port, output_port=output_port
+        ))
+
 
 
 
@@ -620,8 +791,16 @@ class MidiBridgeApp(ctk.CTk):
 
     def on_midi_message(self, msg):
         """Maneja mensajes MIDI entrantes"""
+        self.governor.activity()
+        if not self.ui_ready:
+            # Arranque: los puertos ya están abiertos pero la UI no existe; solo se rutea
+            if msg.type == "control_change" and self.routing_engine.process_cc(msg.control, msg.value):
+                self.on_routed()
+            return
         if msg.type == "control_change":
             self.handle_cc_message(msg)
+        elif msg.type == "program_change":
+            self.activate_preset(msg.program)
 
     def handle_cc_message(self, msg):
         """Maneja mensajes CC específicos"""
@@ -649,14 +828,14 @@ class MidiBridgeApp(ctk.CTk):
             # Aprendiendo CC de salida
             if control_id in self.switches:
                 self.switches[control_id].output_cc_var.set(str(control))
-                self.console_panel.log(self.localization.t("output_cc_assigned").format(  # ← CAMBIADO
+                self.console_panel.log(self.localization.format("output_cc_assigned",   # ← CAMBIADO
                     control_id=control_id, control=control
                 ))
         else:
             # Aprendiendo CC de entrada
             if control_id in self.switches:
                 self.switches[control_id].input_cc_var.set(str(control))
-                self.console_panel.log(self.localization.t("input_cc_assigned").format(  # ← CAMBIADO
+                self.console_panel.log(self.localization.format("input_cc_assigned",   # ← CAMBIADO
                     control_id=control_id, control=control
                 ))
         
@@ -675,75 +854,329 @@ class MidiBridgeApp(ctk.CTk):
 
 
     def handle_normal_mapping(self, control, value):
-        """Maneja mapeo normal de CC - VERSIÓN OPTIMIZADA"""
-        # Buscar switch
-        matching_switch = None
-        for switch in self.switches.values():
-            try:
-                input_cc_value = switch.input_cc_var.get()
-                if (input_cc_value != self.localization.t("not_assigned") and 
-                    int(input_cc_value) == control):
-                    matching_switch = switch
-                    break
-            except ValueError:
-                continue
-
-        if not matching_switch:
+        """Maneja mapeo normal de CC usando la tabla precompilada del motor"""
+        result = self.routing_engine.process_cc(control, value)
+        if result is None:
             return
 
-        mode = matching_switch.mode_var.get().lower()
-        old_state = matching_switch.state
+        route, state = result
+        self.on_routed()
+        matching_switch = self.switches.get(route.control_id)
+        if matching_switch is not None:
+            matching_switch.state = state
+            self.controls_panel.refresh_switch_ui(route.control_id)
+
+        state_text = self.localization.t("on") if state else self.localization.t("off")
+        if route.send_midi:
+            output_value = 127 if state else 0
+            self.console_panel.log(self.localization.format("midi_out",   # ← CAMBIADO
+                output_cc=route.output_cc, output_value=output_value, 
+                state=state_text
+            ))
+        if route.osc_address:
+            self.console_panel.log(self.localization.format("osc_out",
+                address=route.osc_address, value=int(state), state=state_text
+            ))
 
-        # Lógica de estado
-        if "toggle" in mode:
-            # TOGGLE: Solo en press (valor > 0)
-            if value > 0:
-                matching_switch.state = not old_state
-            else:
-                return  # Ignorar release
+    def on_routed(self):
+        """Marca el primer mensaje ruteado; con --startup-report informa los hitos y cierra"""
+        self.autosave.mark_dirty()
+        if self.startup.mark("first_route") and self.startup_report:
+            self.after(0, self.finish_startup_report)
+
+    def finish_startup_report(self):
+        print(self.startup.report(), flush=True)
+        self.on_closing()
+
+    def watch_switch(self, switch):
+        """Recompila el ruteo cuando cambian los campos editables de un switch"""
+        for var in (switch.input_cc_var, switch.output_cc_var, switch.mode_var):
+            var.trace_add("write", lambda *args: self.schedule_routing_rebuild())
+
+    def schedule_routing_rebuild(self):
+        """Agrupa varios cambios de la UI en una sola recompilación"""
+        if self._applying_configuration or self._routing_rebuild_pending:
+            return
+        self._routing_rebuild_pending = True
+        self.after_idle(self.rebuild_routing)
+
+    def rebuild_routing(self):
+        """Compila la configuración de la UI y la activa conservando los estados"""
+        self._routing_rebuild_pending = False
+        try:
+            _, table = compile_preset(self.build_config_dict(), self.routing_engine.table.name)
+        except PresetValidationError as e:
+            # Se conserva la tabla activa; los mismos errores no se repiten en cada tecla
+            if e.errors != self._routing_errors:
+                self._routing_errors = e.errors
+                self.console_panel.log(self.localization.t("routing_invalid"))
+                for error in e.errors:
+                    self.console_panel.log(f"  {error}")
+            return
+        self._routing_errors = None
+        self.routing_engine.swap_table(table, self.routing_engine.states)
+        self.autosave.mark_dirty()
+
+    def on_preset_selected(self, name):
+        """Activa el preset elegido en el menú del banco"""
+        index = self.preset_bank.find(name)
+        if index >= 0:
+            self.activate_preset(index)
+
+    def step_preset(self, offset):
+        """Avanza o retrocede en el banco (llamado desde el footswitch)"""
+        if self.preset_bank.presets:
+            self.activate_preset((self.preset_bank.index + offset) % len(self.preset_bank.presets))
+
+    def activate_preset(self, index):
+        """Activa un preset del banco sin cerrar los puertos MIDI"""
+        table = self.preset_bank.select(index)
+        if table is None:
+            return
+        # Intercambio atómico: puede ejecutarse directamente en el hilo MIDI
+        swap_ns = self.routing_engine.swap_table(table)
+        self.session_state.set_preset(index, table.name)
+        self.autosave.mark_dirty()
+        self.after(0, self.on_preset_activated, table, swap_ns)
+
+    def load_setlist(self):
+        """Carga un setlist desde archivo"""
+        file_path = filedialog.askopenfilename(
+            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            title=self.localization.t("load_setlist")
+        )
+        if file_path:
+            self.load_setlist_from_file(file_path)
+
+    def resume_setlist(self):
+        """Retoma el último setlist en la posición guardada"""
+        path = self.setlist.saved_setlist_path()
+        if path and os.path.exists(path):
+            self.load_setlist_from_file(path)
+
+    def load_setlist_from_file(self, file_path):
+        """Valida el setlist completo antes de activarlo"""
+        previous_ccs = (self.setlist.next_cc, self.setlist.prev_cc, self.setlist.gesture_cc)
+        errors = self.setlist.load(file_path)
+        if errors:
+            self.console_panel.log(self.localization.t("setlist_invalid"))
+            for error in errors:
+                self.console_panel.log(f"  {error}")
+            return
+
+        for control in previous_ccs:
+            self.routing_engine.unbind_action(control)
+        self.routing_engine.bind_action(self.setlist.next_cc, lambda: self.step_song(1))
+        self.routing_engine.bind_action(self.setlist.prev_cc, lambda: self.step_song(-1))
+        self.routing_engine.bind_handler(self.setlist.gesture_cc, GestureDetector(
+            on_tap=lambda: self.step_song(1),
+            on_long_press=lambda: self.step_song(-1)
+        ))
+
+        self.console_panel.log(self.localization.format("setlist_loaded",
+            name=self.setlist.name, songs=len(self.setlist.songs)
+        ))
+        self.activate_song(self.setlist.saved_position())
+
+    def step_song(self, offset):
+        """Siguiente/anterior canción (llamado desde la UI o el hilo MIDI)"""
+        if self.setlist.songs:
+            self.activate_song(max(0, min(len(self.setlist.songs) - 1, self.setlist.index + offset)))
+
+    def activate_song(self, index):
+        """Activa el preset de una canción sin bloquear el hilo MIDI"""
+        table = self.setlist.select(index)
+        if table is None:
+            return
+        swap_ns = self.routing_engine.swap_table(table)
+        self.session_state.set_preset(-1, table.name)
+        self.session_state.set_song(index)
+        self.autosave.mark_dirty()
+        self.after(0, self.on_song_activated, table, swap_ns)
+
+    def on_song_activated(self, table, swap_ns):
+        """Sincroniza la UI con la canción activa"""
+        self.apply_preset_fields(table.config)
+        self.song_label.configure(text=self.get_song_text())
+        self.console_panel.log(self.localization.format("song_activated",
+            position=self.setlist.index + 1, total=len(self.setlist.songs),
+            title=table.name, swap_us=swap_ns / 1000
+        ))
+
+    def restore_session(self, snapshot):
+        """Retoma preset/canción y estados de la sesión anterior guardados en el archivo mapeado"""
+        if snapshot is None or snapshot.torn:
+            return
+        if self.setlist.songs and 0 <= snapshot.song_index < len(self.setlist.songs):
+            if not snapshot.matches(self.setlist.tables[snapshot.song_index].name):
+                self.log_session_mismatch(snapshot)
+                return
+            if snapshot.song_index != self.setlist.index:
+                self.activate_song(snapshot.song_index)
+        elif snapshot.preset_index >= 0:
+            # El índice solo vale si el banco no cambió; si no, se busca el preset por nombre
+            index = snapshot.preset_index
+            if not (index < len(self.preset_bank.presets) and snapshot.matches(self.preset_bank.presets[index].name)):
+                index = next((i for i, table in enumerate(self.preset_bank.presets) if snapshot.matches(table.name)), -1)
+            if index < 0:
+                self.log_session_mismatch(snapshot)
+                return
+            self.activate_preset(index)
+        elif self.session_routed and not self.setlist.songs:
+            # Los estados ya se restauraron en el motor antes de la UI (y pueden haber cambiado desde el pedal)
+            self.after(0, self.sync_engine_states)
+            self.console_panel.log(self.localization.format("session_restored",
+                switches=sum(self.routing_engine.states.values()), ccs=len(snapshot.cc_values)
+            ))
+            return
+        elif not snapshot.matches(self.routing_engine.table.name):
+            self.log_session_mismatch(snapshot)
+            return
+        # Se encola después de la activación para que los estados queden por encima del preset
+        self.after(0, self.apply_session_states, snapshot)
+
+    def log_session_mismatch(self, snapshot):
+        """Los estados guardados eran de un preset que ya no está: no se aplican a otro"""
+        self.console_panel.log(self.localization.format("session_preset_missing", name=snapshot.preset_name))
+
+    def apply_session_states(self, snapshot):
+        """Aplica los estados de los switches guardados en la sesión anterior"""
+        if snapshot.torn:
+            return
+        table = self.routing_engine.table
+        states = {
+            control_id: snapshot.switch_states.get(switch_slot(control_id), False)
+            for control_id in table.initial_states
+        }
+        self.routing_engine.swap_table(table, states)
+        for control_id, state in states.items():
+            if control_id in self.switches:
+                self.switches[control_id].state = state
+        self.controls_panel.refresh_all_switches()
+        self.console_panel.log(self.localization.format("session_restored",
+            switches=sum(states.values()), ccs=len(snapshot.cc_values)
+        ))
+
+    def on_control_applied(self, table, preset_index, swap_ns):
+        """Un lote de la API de control ya está activo en el motor (hilo del servidor)"""
+        self.governor.activity()
+        if preset_index is not None:
+            self.session_state.set_preset(preset_index, table.name)
+            self.after(0, self.on_preset_activated, table, swap_ns)
+        self.autosave.mark_dirty()
+        self.after(0, self.sync_engine_states)
+
+    def on_scene_changed(self, scene, changed, captured):
+        """Escena recuperada o capturada en el motor (hilo MIDI)"""
+        self.autosave.mark_dirty()
+        if captured:
+            self.after(0, self.on_scene_captured, scene)
         else:
-            # MOMENTARY: Seguir valor
-            matching_switch.state = value > 0
-        
-        # Solo enviar MIDI si el estado cambió
-        if matching_switch.state != old_state:
-            self.controls_panel.refresh_switch_ui(matching_switch.control_id)
-            
-            try:
-                output_cc = int(matching_switch.output_cc_var.get())
-                output_value = 127 if matching_switch.state else 0
-                self.midi_manager.send_cc(output_cc, output_value)
-                self.console_panel.log(self.localization.t("midi_out").format(  # ← CAMBIADO
-                    output_cc=output_cc, output_value=output_value, 
-                    state=self.localization.t("on") if matching_switch.state else self.localization.t("off")
-                ))
-            except ValueError:
-                pass
+            self.after(0, self.sync_engine_states)
+
+    def on_scene_table_captured(self, old, new):
+        """La captura vuelve a la entrada del banco o del setlist (hilo MIDI), así sobrevive al cambio de preset"""
+        self.setlist.replace(old, new)
+        self.preset_bank.replace(old, new)
+
+    def on_scene_captured(self, scene):
+        self.configuration.scenes = self.routing_engine.table.config.get("scenes", {})
+        self.console_panel.log(self.localization.format("scene_captured",
+            name=scene.name, switches=len(self.routing_engine.states)
+        ))
+
+    def on_scene_played(self, scene, sent, elapsed_ns):
+        """La ráfaga de la escena terminó de enviarse (hilo del reproductor de escenas)"""
+        if self.ui_ready:
+            self.console_panel.log(self.localization.format("scene_recalled",
+                name=scene.name, ccs=sent, total_ms=elapsed_ns / 1e6
+            ))
+
+    def on_transform_warning(self, kind, control_id, source, detail):
+        """Primer error o primera evaluación lenta de una transformación (hilo MIDI)"""
+        message = self.core.transform_warning_text(kind, control_id, source, detail)
+        if self.ui_ready:
+            self.after(0, self.console_panel.log, message)
+        else:
+            self.startup_log.append(message)  # Se vuelca a la consola cuando se construye
+
+    def on_tap_tempo(self):
+        """Press del switch de tap tempo (hilo MIDI)"""
+        bpm = self.tap_tempo.tap()
+        if bpm is not None:
+            self.midi_clock.set_bpm(bpm)
+            self.after(0, lambda: self.console_panel.log(self.localization.format("tempo_set", bpm=bpm)))
+
+    def on_clock_transport(self):
+        """Press del switch de Start/Stop del reloj (hilo MIDI)"""
+        if self.midi_clock.bpm is None:
+            return  # Sin tempo todavía: primero hay que marcarlo
+        key = "clock_started" if self.midi_clock.toggle_transport() else "clock_stopped"
+        self.after(0, lambda: self.console_panel.log(self.localization.format(key, bpm=self.midi_clock.bpm)))
+
+    def configure_feedback(self):
+        """Abre (o cierra) el espejo de estados hacia los LEDs y desde el DAW y sincroniza todos los LEDs"""
+        self.routing_engine.feedback = None
+        self.midi_manager.close_feedback()
+        if not (self.configuration.feedback_port or self.configuration.daw_feedback_port):
+            return
+        feedback = self.midi_manager.open_feedback(
+            self.configuration.feedback_port, self.configuration.daw_feedback_port, self.on_daw_feedback
+        )
+        if feedback is not None:
+            feedback.mirror(*self.routing_engine.active)
+            self.routing_engine.feedback = feedback
+
+    def on_daw_feedback(self, msg):
+        """Estado informado por el DAW en su salida (hilo del backend MIDI)"""
+        if msg.type != "control_change":
+            return
+        result = self.routing_engine.apply_feedback(msg.control, msg.value)
+        if result is None:
+            return
+        route, state = result
+        self.governor.activity()
+        self.autosave.mark_dirty()
+        if self.ui_ready:
+            self.after(0, self.show_switch_state, route.control_id, state)
+
+    def show_switch_state(self, control_id, state):
+        switch = self.switches.get(control_id)
+        if switch is not None:
+            switch.state = state
+            self.controls_panel.refresh_switch_ui(control_id)
+
+    def sync_engine_states(self):
+        """Refleja en la UI los estados de los switches activos en el motor"""
+        for control_id, state in self.routing_engine.states.items():
+            if control_id in self.switches:
+                self.switches[control_id].state = state
+        self.controls_panel.refresh_all_switches()
+
+    def get_song_text(self):
+        """Texto de la canción actual del setlist"""
+        song = self.setlist.current_song()
+        if song is None:
+            return self.localization.t("no_setlist")
+        return f"{self.setlist.index + 1}/{len(self.setlist.songs)} {song.title}"
+
+    def on_preset_activated(self, table, swap_ns):
+        """Sincroniza la UI con el preset ya activo en el motor"""
+        self.apply_configuration(table.config)
+        self.preset_menu.set(table.name)
+        self.console_panel.log(self.localization.format("preset_activated",
+            name=table.name, swap_us=swap_ns / 1000
+        ))
 
     def update_ui_texts(self):
-        """Actualiza solo los textos de la UI - VERSIÓN RÁPIDA"""
-        # Botones principales
+        """Actualiza los textos que dependen del estado (los fijos los aplica el registro de Localization)"""
         self.connect_btn.configure(text=self.localization.t("connect") if not self.is_connected else self.localization.t("disconnect"))
-        self.learn_btn.configure(text=self.localization.t("learn_controls"))
-        self.save_btn.configure(text=self.localization.t("save_config"))
-        self.load_btn.configure(text=self.localization.t("load_config"))
-        self.add_switch_btn.configure(text=f"+ {self.localization.t('add_switch')}")
-        
-        # Labels de configuración
-        for widget in self.config_frame.winfo_children():
-            if isinstance(widget, ctk.CTkFrame):
-                for child in widget.winfo_children():
-                    if isinstance(child, ctk.CTkLabel):
-                        text = child.cget("text")
-                        if text in ["Idioma:", "Language:"]:
-                            child.configure(text=self.localization.t("language"))
-                        elif text in ["Entrada MIDI:", "MIDI Input:"]:
-                            child.configure(text=self.localization.t("input_midi"))
-                        elif text in ["Salida MIDI:", "MIDI Output:"]:
-                            child.configure(text=self.localization.t("output_midi"))
-        
-        # Actualizar controles (solo lo esencial)
-        self.controls_panel.update_all_texts_fast()
+        self.learn_btn.configure(text=self.localization.t("cancel_learn") if self.learning_manager.learning_mode else self.localization.t("learn_controls"))
+        self.update_add_button_state()
+        self.song_label.configure(text=self.get_song_text())
+        if not self.preset_bank.presets:
+            self.preset_menu.configure(values=[self.localization.t("no_presets")])
+            self.preset_menu.set(self.localization.t("no_presets"))
 
 
 
@@ -781,14 +1214,36 @@ class MidiBridgeApp(ctk.CTk):
 
 
 
-    def save_configuration(self):
-        """Guarda la configuración actual"""
+    def build_config_dict(self):
+        """Construye el diccionario de configuración a partir del estado actual"""
         config = {
             "language": self.localization.current_language,
             "input_port": self.input_menu.get(),
             "output_port": self.output_menu.get(),
             "switches": {}
         }
+        if self.configuration.preset_next_cc is not None:
+            config["preset_next_cc"] = self.configuration.preset_next_cc
+        if self.configuration.preset_prev_cc is not None:
+            config["preset_prev_cc"] = self.configuration.preset_prev_cc
+        if self.configuration.network_output:
+            config["network_output"] = self.configuration.network_output
+        if self.configuration.osc_output:
+            config["osc_output"] = self.configuration.osc_output
+        if self.configuration.metrics_port:
+            config["metrics_port"] = self.configuration.metrics_port
+        if self.configuration.feedback_port:
+            config["feedback_port"] = self.configuration.feedback_port
+        if self.configuration.daw_feedback_port:
+            config["daw_feedback_port"] = self.configuration.daw_feedback_port
+        if self.configuration.scenes:
+            config["scenes"] = self.configuration.scenes
+        if self.configuration.scene_capture_cc is not None:
+            config["scene_capture_cc"] = self.configuration.scene_capture_cc
+        if self.configuration.tap_tempo_cc is not None:
+            config["tap_tempo_cc"] = self.configuration.tap_tempo_cc
+        if self.configuration.clock_start_cc is not None:
+            config["clock_start_cc"] = self.configuration.clock_start_cc
         
         for control_id, switch in self.switches.items():
             config["switches"][control_id] = {
@@ -797,6 +1252,16 @@ class MidiBridgeApp(ctk.CTk):
                 "mode": switch.mode_var.get(),
                 "state": switch.state
             }
+            if switch.osc_address:
+                config["switches"][control_id]["osc_address"] = switch.osc_address
+                config["switches"][control_id]["osc_only"] = switch.osc_only
+            if switch.transform:
+                config["switches"][control_id]["transform"] = switch.transform
+        return config
+
+    def save_configuration(self):
+        """Guarda la configuración actual"""
+        config = self.build_config_dict()
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".json",
@@ -819,41 +1284,75 @@ class MidiBridgeApp(ctk.CTk):
         if file_path:
             self.load_config_from_file(file_path)
 
+    def open_preset_library(self):
+        """Abre la biblioteca de presets (el índice se crea la primera vez)"""
+        if self.preset_library_window is not None and self.preset_library_window.winfo_exists():
+            self.preset_library_window.focus()
+            return
+        from ui.preset_library import PresetLibraryWindow
+        from utils.preset_library import PresetLibrary
+
+        if self.preset_library is None:
+            self.preset_library = PresetLibrary(self.settings.PRESET_INDEX_FILE)
+        self.preset_library_window = PresetLibraryWindow(
+            self,
+            self.localization,
+            self.preset_library,
+            self.preset_library.directory or self.settings.PRESET_LIBRARY_DIR,
+            self.load_config_from_file,
+            self.app_styles
+        )
+
     def load_configuration_auto(self):
-        """Carga configuración automáticamente al iniciar"""
+        """Carga configuración automáticamente al iniciar (el último autosave tiene prioridad)"""
+        if self.startup_config is not None:
+            # Ya compilada y activa en el motor desde BridgeCore.load_startup_routing: solo se refleja en la UI
+            file_path, config, load_ms = self.startup_config
+            self.startup_config = None
+            self.apply_configuration(config)
+            self.console_panel.log(f"{self.localization.t('config_loaded')}: {file_path} ({load_ms:.2f} ms)")
+            return
         config_path = self.settings.DEFAULT_CONFIG_FILE
+        if os.path.exists(self.settings.AUTOSAVE_FILE):
+            config_path = self.settings.AUTOSAVE_FILE
         if os.path.exists(config_path):
             self.load_config_from_file(config_path)
 
     def load_config_from_file(self, file_path):
         """Carga configuración desde archivo específico"""
-        config = self.file_manager.load_configuration(file_path)
-        if not config:
+        # Validar y compilar antes de tocar nada del bridge en ejecución
+        try:
+            config, table, load_ms = load_preset(file_path)
+        except PresetValidationError as e:
             self.console_panel.log(self.localization.t("error_loading_config"))  # ← CAMBIADO
+            for error in e.errors:
+                self.console_panel.log(f"  {error}")
             return
         
-        # Guardar estado de conexión
-        was_connected = self.is_connected
-        if was_connected:
-            self.disconnect_ports()
+        # Activar el ruteo sin cerrar los puertos
+        self.routing_engine.swap_table(table)
+        self.session_state.set_preset(-1, table.name)
         
         # Cargar configuración
         self.apply_configuration(config)
         
-        # Reconectar si estaba conectado
-        if was_connected:
-            self.after(100, self.connect_ports)
-        
-        self.console_panel.log(f"{self.localization.t('config_loaded')}: {file_path}")
+        self.console_panel.log(f"{self.localization.t('config_loaded')}: {file_path} ({load_ms:.2f} ms)")
 
 
 
     def apply_configuration(self, config):
         """Aplica configuración cargada"""
-        # Idioma
+        self._applying_configuration = True
+        try:
+            self._apply_configuration(config)
+        finally:
+            self._applying_configuration = False
+
+    def _apply_configuration(self, config):
+        # Idioma (solo se actualizan los textos, sin reconstruir la ventana)
         if "language" in config and config["language"] != self.localization.current_language:
-            self.localization.current_language = config["language"]
-            self.rebuild_ui()
+            self.change_language(config["language"])
+            self.language_menu.set(config["language"])
         
         # Puertos MIDI
         if "input_port" in config:
@@ -861,24 +1360,100 @@ class MidiBridgeApp(ctk.CTk):
         if "output_port" in config:
             self.output_menu.set(config["output_port"])
         
-        # Switches
-        self.switches.clear()
-        if "switches" in config:
-            for control_id, switch_config in config["switches"].items():
+        # Salida MIDI por red ("host:puerto"); solo se reabre si cambió
+        if "network_output" in config and config["network_output"] != self.configuration.network_output:
+            self.configuration.network_output = config["network_output"]
+            if self.configuration.network_output:
+                self.midi_manager.open_network_output(self.configuration.network_output)
+            else:
+                self.midi_manager.close_network_output()
+        if "osc_output" in config and config["osc_output"] != self.configuration.osc_output:
+            self.configuration.osc_output = config["osc_output"]
+            if self.configuration.osc_output:
+                self.midi_manager.open_osc_output(self.configuration.osc_output)
+            else:
+                self.midi_manager.close_osc_output()
+        if "metrics_port" in config and config["metrics_port"] != self.configuration.metrics_port:
+            self.configuration.metrics_port = config["metrics_port"]
+            self.stop_metrics()
+            if self.configuration.metrics_port:
+                self.start_metrics(self.configuration.metrics_port)
+        # LEDs del controlador y feedback del DAW; solo se reabren si cambió alguno
+        feedback_changed = False
+        for key in ("feedback_port", "daw_feedback_port"):
+            if key in config and config[key] != getattr(self.configuration, key):
+                setattr(self.configuration, key, config[key])
+                feedback_changed = True
+        if feedback_changed:
+            self.configure_feedback()
+
+        self._apply_preset_fields(config)
+
+    def apply_preset_fields(self, config):
+        """Aplica solo lo que cambia entre presets (switches, escenas y footswitches de acción).
+
+        Sin idioma, puertos ni salidas: es lo que corre en el hilo de Tk al cambiar de canción.
+        """
+        self._applying_configuration = True
+        try:
+            self._apply_preset_fields(config)
+        finally:
+            self._applying_configuration = False
+
+    def _apply_preset_fields(self, config):
+        # Switches: se reutilizan los existentes y solo se tocan los campos que cambian
+        new_switches = {}
+        for control_id, switch_config in config.get("switches", {}).items():
+            switch = self.switches.get(control_id)
+            if switch is None:
                 switch = MidiSwitch(control_id, int(control_id.split('_')[1]) + 1)
-                switch.input_cc_var.set(switch_config.get("input_cc", self.localization.t("not_assigned")))
-                switch.output_cc_var.set(switch_config.get("output_cc", str(10 + int(control_id.split('_')[1]))))
-                switch.mode_var.set(switch_config.get("mode", "toggle"))
-                switch.state = switch_config.get("state", False)
-                self.switches[control_id] = switch
-        
-        # Actualizar UI
-        self.controls_panel.clear_switches()
-        for switch in self.switches.values():
-            self.controls_panel.add_switch(switch)
+                self.watch_switch(switch)
+            self.set_if_changed(switch.input_cc_var, switch_config.get("input_cc", self.localization.t("not_assigned")))
+            self.set_if_changed(switch.output_cc_var, switch_config.get("output_cc", str(10 + int(control_id.split('_')[1]))))
+            self.set_if_changed(switch.mode_var, switch_config.get("mode", "toggle"))
+            switch.state = switch_config.get("state", False)
+            switch.osc_address = switch_config.get("osc_address")
+            switch.osc_only = switch_config.get("osc_only", False)
+            switch.transform = switch_config.get("transform")
+            new_switches[control_id] = switch
+        self.switches = new_switches
+        
+        # Footswitches de navegación del banco
+        if "preset_next_cc" in config or "preset_prev_cc" in config:
+            self.routing_engine.unbind_action(self.configuration.preset_next_cc)
+            self.routing_engine.unbind_action(self.configuration.preset_prev_cc)
+            self.configuration.preset_next_cc = config.get("preset_next_cc")
+            self.configuration.preset_prev_cc = config.get("preset_prev_cc")
+            self.routing_engine.bind_action(self.configuration.preset_next_cc, lambda: self.step_preset(1))
+            self.routing_engine.bind_action(self.configuration.preset_prev_cc, lambda: self.step_preset(-1))
+        
+        # Escenas: son parte del preset, como los switches
+        self.configuration.scenes = config.get("scenes", {})
+        if "scene_capture_cc" in config:
+            self.routing_engine.unbind_action(self.configuration.scene_capture_cc)
+            self.configuration.scene_capture_cc = config["scene_capture_cc"]
+            self.routing_engine.bind_action(self.configuration.scene_capture_cc, self.routing_engine.arm_capture)
+
+        # Tap tempo y arranque/parada del reloj MIDI
+        if "tap_tempo_cc" in config or "clock_start_cc" in config:
+            self.routing_engine.unbind_action(self.configuration.tap_tempo_cc)
+            self.routing_engine.unbind_action(self.configuration.clock_start_cc)
+            self.configuration.tap_tempo_cc = config.get("tap_tempo_cc")
+            self.configuration.clock_start_cc = config.get("clock_start_cc")
+            self.routing_engine.bind_action(self.configuration.tap_tempo_cc, self.on_tap_tempo)
+            self.routing_engine.bind_action(self.configuration.clock_start_cc, self.on_clock_transport)
+
+        # Actualizar UI de forma incremental
+        self.controls_panel.sync_switches(list(self.switches.values()))
         
         self.update_add_button_state()
 
+    @staticmethod
+    def set_if_changed(var, value):
+        """Evita escrituras (y redibujados) cuando el valor no cambió"""
+        if var.get() != str(value):
+            var.set(value)
+
     def __del__(self):
         """Destructor - asegura que los puertos MIDI se cierren"""
         if self.is_connected:
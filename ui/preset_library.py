@@ -0,0 +1,150 @@
+import queue
+import threading
+import tkinter as tk
+import customtkinter as ctk
+from tkinter import filedialog
+from config.settings import AppSettings
+
+
+class PresetLibraryWindow(ctk.CTkToplevel):
+    """Ventana de búsqueda en la biblioteca de presets indexada"""
+
+    def __init__(self, parent, localization, library, directory, on_load_callback, styles):
+        super().__init__(parent)
+        self.localization = localization
+        self.library = library
+        self.directory = directory
+        self.on_load_callback = on_load_callback
+        self.styles = styles["preset_library"]
+        self.results = []
+        self._filter_pending = None
+        # El worker solo avisa por esta cola; Tk la revisa desde su propio hilo
+        self.scan_done = queue.SimpleQueue()
+        self.scanning = False
+        self.rescan_pending = False
+        self._poll_id = None
+        self.geometry("640x480")
+        self.build_ui()
+        # Título y estado dependen del idioma; el registro se limpia al cerrar la ventana
+        self.localization.add_listener(self.update_texts, owner=self)
+        self.update_texts()
+        self.rescan()
+
+    def build_ui(self):
+        top_frame = ctk.CTkFrame(self, fg_color="transparent")
+        top_frame.pack(fill="x", padx=10, pady=10)
+
+        self.search_var = ctk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_filter())
+        search_entry = self.localization.bind(
+            ctk.CTkEntry(top_frame, textvariable=self.search_var), "search_presets", "placeholder_text"
+        )
+        search_entry.pack(side="left", fill="x", expand=True, padx=(0, 6))
+
+        self.localization.bind(
+            ctk.CTkButton(top_frame, width=120, command=self.choose_directory), "choose_folder"
+        ).pack(side="left")
+
+        # Listbox nativo: maneja cientos de filas sin crear un widget por preset
+        list_frame = ctk.CTkFrame(self)
+        list_frame.pack(fill="both", expand=True, padx=10)
+        self.listbox = tk.Listbox(
+            list_frame, bg=self.styles["list_bg"], fg=self.styles["list_fg"],
+            selectbackground=self.styles["select_bg"],
+            borderwidth=0, highlightthickness=0, activestyle="none"
+        )
+        scrollbar = ctk.CTkScrollbar(list_frame, command=self.listbox.yview)
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.bind("<Double-Button-1>", lambda event: self.load_selected())
+
+        bottom_frame = ctk.CTkFrame(self, fg_color="transparent")
+        bottom_frame.pack(fill="x", padx=10, pady=10)
+        self.status_label = ctk.CTkLabel(bottom_frame, text="")
+        self.status_label.pack(side="left")
+        self.localization.bind(
+            ctk.CTkButton(bottom_frame, width=120, command=self.load_selected), "load_config"
+        ).pack(side="right")
+
+    def update_texts(self):
+        self.title(self.localization.t("preset_library"))
+        if self.scanning:
+            self.status_label.configure(text=self.localization.t("indexing"))
+        else:
+            self.show_status()
+
+    def choose_directory(self):
+        directory = filedialog.askdirectory(initialdir=self.directory)
+        if directory:
+            self.directory = directory
+            self.rescan()
+
+    def rescan(self):
+        """Refresca el índice en segundo plano (solo relee los archivos modificados)"""
+        if self.scanning:
+            # Un solo recorrido a la vez: el pedido se atiende cuando termine el actual
+            self.rescan_pending = True
+            return
+        self.scanning = True
+        self.rescan_pending = False
+        self.status_label.configure(text=self.localization.t("indexing"))
+        threading.Thread(target=self.scan_worker, args=(self.directory,), daemon=True).start()
+        self._poll_id = self.after(AppSettings.PRESET_SCAN_POLL_MS, self.poll_scan)
+
+    def scan_worker(self, directory):
+        """Hilo del indexado: no toca ningún widget"""
+        try:
+            self.library.scan(directory)
+        except Exception as e:
+            print(f"Error indexando presets en {directory}: {e}")
+        self.scan_done.put(directory)
+
+    def poll_scan(self):
+        try:
+            self.scan_done.get_nowait()
+        except queue.Empty:
+            self._poll_id = self.after(AppSettings.PRESET_SCAN_POLL_MS, self.poll_scan)
+            return
+        self._poll_id = None
+        self.on_scan_finished()
+
+    def on_scan_finished(self):
+        self.scanning = False
+        if self.rescan_pending:
+            self.rescan()  # Se cambió de carpeta durante el recorrido
+            return
+        self.apply_filter()
+
+    def destroy(self):
+        for pending in (self._poll_id, self._filter_pending):
+            if pending is not None:
+                self.after_cancel(pending)
+        self._poll_id = self._filter_pending = None
+        super().destroy()
+
+    def schedule_filter(self):
+        """Agrupa las pulsaciones de teclado antes de filtrar"""
+        if self._filter_pending is not None:
+            self.after_cancel(self._filter_pending)
+        self._filter_pending = self.after(120, self.apply_filter)
+
+    def apply_filter(self):
+        self._filter_pending = None
+        self.results = self.library.search(self.search_var.get())
+        self.listbox.delete(0, "end")
+        for entry in self.results:
+            ccs = ", ".join(str(cc) for cc in entry.ccs)
+            self.listbox.insert("end", f"{entry.name}  —  {entry.device}  —  CC {ccs}")
+        self.show_status()
+
+    def show_status(self):
+        self.status_label.configure(text=self.localization.format("library_status",
+            shown=len(self.results), total=len(self.library.entries),
+            scan_ms=self.library.last_scan_ms, parsed=self.library.last_scan_parsed
+        ))
+
+    def load_selected(self):
+        selection = self.listbox.curselection()
+        if selection:
+            self.on_load_callback(self.results[selection[0]].path)
@@ -1,4 +1,11 @@
-from .localization import Localization
-from .file_utils import FileManager
+from .lazy import lazy_exports
 
-__all__ = ['Localization', 'FileManager']
\ No newline at end of file
+# Exportaciones perezosas: las herramientas sin interfaz no arrastran customtkinter
+_EXPORTS = {
+    'Localization': '.localization',
+    'FileManager': '.file_utils',
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__ = lazy_exports(__name__, _EXPORTS)
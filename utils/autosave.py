@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import deque
+from utils.file_utils import FileManager
+
+
+class AutosaveWriter:
+    """Guardado diferido en segundo plano: agrupa cambios y escribe de forma atómica"""
+
+    def __init__(self, file_path, snapshot_provider, delay_ms):
+        self.file_path = file_path
+        self.snapshot_provider = snapshot_provider
+        self.delay = delay_ms / 1000
+        self.pending = False
+        self.wakeup = threading.Event()
+        self.running = True
+        self.write_times = deque()
+        self.last_write_ms = 0.0
+        self.max_write_ms = 0.0
+        self.total_writes = 0
+        self.dirty_marks = 0
+        self.thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self.thread.start()
+
+    def mark_dirty(self):
+        """Marca la configuración como modificada (barato: se puede llamar desde el hilo MIDI)"""
+        self.pending = True
+        self.dirty_marks += 1
+        self.wakeup.set()
+
+    def flush(self):
+        """Escribe inmediatamente si hay cambios pendientes (al cerrar la aplicación)"""
+        if self.pending:
+            self.pending = False
+            self._write()
+
+    def stop(self):
+        self.running = False
+        self.wakeup.set()
+        self.thread.join(timeout=1)
+        self.flush()
+
+    def writes_per_minute(self):
+        cutoff = time.monotonic() - 60
+        while self.write_times and self.write_times[0] < cutoff:
+            self.write_times.popleft()
+        return len(self.write_times)
+
+    def _writer_loop(self):
+        while self.running:
+            self.wakeup.wait()
+            self.wakeup.clear()
+            if not self.running:
+                break
+            # Ventana de agrupación: los cambios que llegan mientras tanto se escriben juntos
+            time.sleep(self.delay)
+            self.flush()
+
+    def _write(self):
+        try:
+            snapshot = self.snapshot_provider()
+        except Exception as e:
+            print(f"Error generando snapshot de autosave: {e}")
+            return
+        start = time.perf_counter()
+        if FileManager.save_configuration_atomic(snapshot, self.file_path):
+            self.last_write_ms = (time.perf_counter() - start) * 1000
+            self.max_write_ms = max(self.max_write_ms, self.last_write_ms)
+            self.total_writes += 1
+            self.write_times.append(time.monotonic())
@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 from models.configuration import AppConfiguration
 
 class FileManager:
@@ -18,4 +19,23 @@ class FileManager:
             with open(file_path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
-            return None
\ No newline at end of file
+            return None
+    
+    @staticmethod
+    def save_configuration_atomic(config, file_path):
+        """Escribe en un temporal del mismo directorio y lo renombra (nunca deja un JSON a medias)"""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(config, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, file_path)
+            return True
+        except Exception as e:
+            print(f"Error guardando {file_path}: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
\ No newline at end of file
@@ -0,0 +1,83 @@
+import time
+from midi.stats import process_usage
+
+
+class IdleGovernor:
+    """Pasa la app a bajo consumo tras un período sin MIDI ni interacción y la despierta al primer evento.
+
+    Mientras hay actividad no hay temporizador periódico: se programa un único chequeo para el
+    momento en que vencería el período. En reposo no queda ningún temporizador propio.
+    """
+
+    def __init__(self, widget, idle_after_ms, on_idle, on_wake):
+        self.widget = widget
+        self.idle_after = idle_after_ms / 1000
+        self.on_idle = on_idle
+        self.on_wake = on_wake  # Recibe el resumen del período de reposo
+        self.last_activity = time.monotonic()
+        self.idle = False
+        self.waking = False
+        self.check_id = None
+        # Instrumentación
+        self.transitions = 0
+        self.idle_seconds = 0.0
+        self.idle_start = None
+
+    def start(self):
+        self._schedule(self.idle_after)
+
+    def stop(self):
+        if self.check_id is not None:
+            self.widget.after_cancel(self.check_id)
+            self.check_id = None
+
+    def activity(self):
+        """Barato y seguro desde cualquier hilo: solo anota la hora y, si estaba en reposo, agenda el despertar"""
+        self.last_activity = time.monotonic()
+        if self.idle and not self.waking:
+            self.waking = True
+            self.widget.after(0, self._wake)
+
+    def _schedule(self, seconds):
+        self.check_id = self.widget.after(max(1, int(seconds * 1000)), self._check)
+
+    def _check(self):
+        self.check_id = None
+        last_activity = self.last_activity
+        quiet = time.monotonic() - last_activity
+        if quiet < self.idle_after:
+            self._schedule(self.idle_after - quiet)
+            return
+        self.idle = True
+        self.transitions += 1
+        cpu, switches = process_usage()
+        self.idle_start = (time.monotonic(), cpu, switches)
+        self.on_idle()
+        if self.last_activity != last_activity and not self.waking:
+            self.activity()  # Llegó un mensaje mientras entraba en reposo
+
+    def _wake(self):
+        self.waking = False
+        if not self.idle:
+            return
+        self.idle = False
+        self.on_wake(self.idle_summary())
+        self.idle_start = None
+        self._schedule(self.idle_after)
+
+    def idle_summary(self):
+        """Duración, % de CPU y despertares por segundo del período de reposo en curso"""
+        started, cpu_start, switches_start = self.idle_start
+        seconds = time.monotonic() - started
+        cpu, switches = process_usage()
+        self.idle_seconds += seconds
+        return {
+            "seconds": seconds,
+            "cpu_percent": (cpu - cpu_start) / seconds * 100 if seconds else 0.0,
+            "wakeups_per_s": (switches - switches_start) / seconds if seconds and switches is not None else None,
+        }
+
+    def total_idle_seconds(self):
+        if self.idle and self.idle_start is not None:
+            return self.idle_seconds + time.monotonic() - self.idle_start[0]
+        return self.idle_seconds
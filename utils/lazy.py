@@ -0,0 +1,15 @@
+import importlib
+
+
+def lazy_exports(package, exports):
+    """__getattr__ de módulo (PEP 562) que importa cada exportación recién al usarla.
+
+    exports: {nombre: submódulo relativo}. Uso en un __init__.py:
+        __getattr__ = lazy_exports(__name__, _EXPORTS)
+    """
+    def __getattr__(name):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        return getattr(importlib.import_module(module, package), name)
+    return __getattr__
@@ -1,26 +1,21 @@
-import json, os, sys
+import json
+from utils.resources import resource_path
 
 class Localization:
-    def __init__(self):
-        self.languages = {}
+    def __init__(self, languages=None):
+        self.languages = languages   # Contenido crudo de languages.json (se lee una vez o llega ya parseado)
+        self.catalogs = {}           # Catálogos precompilados por idioma (perezosos)
         self.current_language = "en"
-        self.load_languages()
+        self.catalog = {}
+        self.formatters = {}
+        self.bindings = []           # (widget, clave, opción, constructor de texto)
+        self.listeners = []
+        self.set_language(self.current_language)
 
-
-
-    def resource_path(self, relative_path):
-        """ Get absolute path to resource, works for dev and for PyInstaller """
-        try:
-            base_path = sys._MEIPASS
-        except Exception:
-            base_path = os.path.abspath(".")
-
-        return os.path.join(base_path, relative_path)
-    
     def load_languages(self):
         """Carga los idiomas desde el archivo JSON"""
         try:
-            path = self.resource_path('config/languages.json')
+            path = resource_path('config/languages.json')
             with open(path, 'r', encoding='utf-8') as f:
                 self.languages = json.load(f)
         except FileNotFoundError:
@@ -82,6 +77,80 @@ class Localization:
                 }
             }
     
+    def get_catalog(self, language):
+        """Devuelve (catálogo, formateadores) de un idioma, compilándolo la primera vez"""
+        compiled = self.catalogs.get(language)
+        if compiled is None:
+            if self.languages is None:
+                self.load_languages()
+            catalog = dict(self.languages.get(language, {}))
+            # Plantillas con parámetros: se resuelven una sola vez a str.format
+            formatters = {key: text.format for key, text in catalog.items() if "{" in text}
+            compiled = self.catalogs[language] = (catalog, formatters)
+        return compiled
+
+    def set_language(self, language):
+        """Cambia de idioma y actualiza una vez cada widget registrado"""
+        self.catalog, self.formatters = self.get_catalog(language)
+        self.current_language = language
+        alive = []
+        for binding in self.bindings:
+            widget, key, option, build = binding
+            try:
+                widget.configure(**{option: build(self.t(key))})
+                alive.append(binding)
+            except Exception:
+                pass  # Widget destruido: se descarta del registro
+        self.bindings = alive
+        for listener in self.listeners:
+            listener()
+
+    def bind(self, widget, key, option="text", build=None):
+        """Registra un widget que muestra la clave `key` y le aplica el texto actual"""
+        build = build or (lambda text: text)
+        if not any(bound is widget for bound, *rest in self.bindings):
+            self._on_destroy(widget, lambda: self.forget(widget))
+        self.bindings.append((widget, key, option, build))
+        widget.configure(**{option: build(self.t(key))})
+        return widget
+
+    def forget(self, widget):
+        """Saca del registro los textos de un widget"""
+        self.bindings = [binding for binding in self.bindings if binding[0] is not widget]
+
+    def add_listener(self, callback, owner=None):
+        """Callback para textos dinámicos que dependen del estado (no solo de una clave).
+
+        Si se indica `owner`, el callback se descarta cuando ese widget se destruye.
+        """
+        self.listeners.append(callback)
+        if owner is not None:
+            self._on_destroy(owner, lambda: self.remove_listener(callback))
+
+    def remove_listener(self, callback):
+        if callback in self.listeners:
+            self.listeners.remove(callback)
+
+    @staticmethod
+    def _on_destroy(widget, callback):
+        """Ejecuta callback al destruirse el widget, sin esperar al próximo cambio de idioma"""
+        import tkinter  # Solo se llega aquí con widgets reales: el núcleo sin UI no lo importa
+
+        if not isinstance(widget, tkinter.Misc):
+            return
+        # Misc.bind y no widget.bind: customtkinter redirige este último a sus lienzos internos.
+        # <Destroy> también llega por los hijos de una ventana, por eso se compara event.widget.
+        tkinter.Misc.bind(
+            widget, "<Destroy>", lambda event: callback() if str(event.widget) == str(widget) else None, "+"
+        )
+
     def t(self, key):
         """Traduce una clave al idioma actual"""
-        return self.languages.get(self.current_language, {}).get(key, key)
\ No newline at end of file
+        return self.catalog.get(key, key)
+
+    def format(self, key, **kwargs):
+        """Traduce y formatea un mensaje con el formateador precompilado del idioma"""
+        formatter = self.formatters.get(key)
+        if formatter is None:
+            return self.t(key)
+        return formatter(**kwargs)
\ No newline at end of file
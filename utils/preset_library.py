@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import time
+from utils.file_utils import FileManager
+
+INDEX_VERSION = 1
+
+
+class PresetEntry:
+    """Metadatos de un preset en el índice (el preset completo se carga solo al elegirlo)"""
+
+    def __init__(self, path, name, device, input_port, output_port, ccs, mtime, size, content_hash):
+        self.path = path
+        self.name = name
+        self.device = device
+        self.input_port = input_port
+        self.output_port = output_port
+        self.ccs = ccs
+        self.mtime = mtime
+        self.size = size
+        self.content_hash = content_hash
+        self.search_text = " ".join(
+            [name, device, input_port, output_port] + [f"cc{cc}" for cc in ccs]
+        ).lower()
+
+    @classmethod
+    def from_file(cls, path, stat):
+        with open(path, 'rb') as f:
+            raw = f.read()
+        config = json.loads(raw.decode('utf-8'))
+        if not isinstance(config, dict):
+            raise ValueError("el preset no es un objeto JSON")
+        ccs = set()
+        for switch_config in config.get("switches", {}).values():
+            for key in ("input_cc", "output_cc"):
+                try:
+                    ccs.add(int(switch_config.get(key)))
+                except (TypeError, ValueError):
+                    pass
+        return cls(
+            path,
+            config.get("name") or os.path.splitext(os.path.basename(path))[0],
+            str(config.get("device") or config.get("input_port", "")),
+            str(config.get("input_port", "")),
+            str(config.get("output_port", "")),
+            sorted(ccs),
+            stat.st_mtime,
+            stat.st_size,
+            hashlib.sha1(raw).hexdigest()
+        )
+
+    def to_dict(self):
+        return {
+            "name": self.name, "device": self.device,
+            "input_port": self.input_port, "output_port": self.output_port,
+            "ccs": self.ccs, "mtime": self.mtime, "size": self.size, "hash": self.content_hash
+        }
+
+    @classmethod
+    def from_dict(cls, path, data):
+        return cls(
+            path, data["name"], data["device"], data["input_port"], data["output_port"],
+            data["ccs"], data["mtime"], data["size"], data["hash"]
+        )
+
+
+class PresetLibrary:
+    """Índice persistente de un directorio de presets, refrescado por mtime"""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.directory = None
+        self.entries = {}
+        self.last_scan_ms = 0.0
+        self.last_scan_parsed = 0
+
+    def load_index(self, directory):
+        """Carga el índice guardado si corresponde al mismo directorio"""
+        self.directory = os.path.abspath(directory)
+        self.entries = {}
+        data = FileManager.load_configuration(self.index_file)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return
+        if data.get("directory") != self.directory:
+            return
+        for path, entry in data.get("entries", {}).items():
+            try:
+                self.entries[path] = PresetEntry.from_dict(path, entry)
+            except (KeyError, TypeError):
+                continue
+
+    def scan(self, directory):
+        """Recorre el directorio y solo vuelve a leer los presets nuevos o modificados"""
+        start = time.perf_counter()
+        if self.directory != os.path.abspath(directory):
+            self.load_index(directory)
+
+        entries = {}
+        parsed = 0
+        index_path = os.path.abspath(self.index_file)
+        for path, stat in self._walk(self.directory):
+            if path == index_path:
+                continue
+            previous = self.entries.get(path)
+            if previous is not None and previous.mtime == stat.st_mtime and previous.size == stat.st_size:
+                entries[path] = previous
+                continue
+            try:
+                entries[path] = PresetEntry.from_file(path, stat)
+                parsed += 1
+            except Exception as e:
+                print(f"Preset ignorado {path}: {e}")
+
+        changed = parsed > 0 or len(entries) != len(self.entries)
+        self.entries = entries
+        if changed:
+            self.save_index()
+        self.last_scan_parsed = parsed
+        self.last_scan_ms = (time.perf_counter() - start) * 1000
+        return changed
+
+    def _walk(self, directory):
+        stack = [directory]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as iterator:
+                    for item in iterator:
+                        if item.is_dir(follow_symlinks=False):
+                            stack.append(item.path)
+                        elif item.name.lower().endswith(".json") and not item.name.startswith("."):
+                            yield os.path.abspath(item.path), item.stat()
+            except OSError as e:
+                print(f"Error leyendo {current}: {e}")
+
+    def save_index(self):
+        FileManager.save_configuration_atomic({
+            "version": INDEX_VERSION,
+            "directory": self.directory,
+            "entries": {path: entry.to_dict() for path, entry in self.entries.items()}
+        }, self.index_file)
+
+    def search(self, query):
+        """Filtra por nombre, dispositivo, puertos o CC ('cc4'); todas las palabras deben coincidir"""
+        tokens = query.lower().split()
+        results = [
+            entry for entry in self.entries.values()
+            if all(token in entry.search_text for token in tokens)
+        ]
+        results.sort(key=lambda entry: entry.name.lower())
+        return results
+
+    def load(self, path):
+        """Carga el preset completo (solo cuando se selecciona)"""
+        return FileManager.load_configuration(path)
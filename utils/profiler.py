@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+import time
+import tkinter
+
+
+class SamplingProfiler:
+    """Profiler por muestreo de todos los hilos (sys._current_frames) a intervalo fijo.
+
+    Acumula pilas colapsadas ('hilo;func (archivo:línea);...') listas para flamegraph.
+    """
+
+    def __init__(self, interval_ms=5):
+        self.interval = interval_ms / 1000
+        self.stacks = {}
+        self.samples = 0
+        self.sampling_ns = 0
+        self.started = 0.0
+        self.elapsed = 0.0
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._loop, name="profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout=1)
+        self.elapsed = time.perf_counter() - self.started
+
+    def _loop(self):
+        own_id = threading.get_ident()
+        while self.running:
+            start = time.perf_counter_ns()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ";".join(reversed(stack))
+                self.stacks[key] = self.stacks.get(key, 0) + 1
+            self.samples += 1
+            self.sampling_ns += time.perf_counter_ns() - start
+            time.sleep(self.interval)
+
+    def write_collapsed(self, file_path):
+        with open(file_path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def top_frames(self, limit=15):
+        """Funciones con más muestras en la punta de la pila (tiempo propio)"""
+        totals = {}
+        for stack, count in self.stacks.items():
+            parts = stack.split(";")
+            key = f"{parts[0]}: {parts[-1]}"
+            totals[key] = totals.get(key, 0) + count
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+class AfterMonitor:
+    """Mide cuánto bloquea el loop de Tk cada callback programado con after / after_idle"""
+
+    def __init__(self):
+        self.stats = {}
+        self.originals = None
+
+    def install(self):
+        """Envuelve Misc.after y Misc.after_idle (antes de crear la ventana)"""
+        self.originals = (tkinter.Misc.after, tkinter.Misc.after_idle)
+        original_after, original_idle = self.originals
+        monitor = self
+
+        def after(widget, ms, func=None, *args):
+            if func is None:
+                return original_after(widget, ms)
+            return original_after(widget, ms, monitor.wrap(func), *args)
+
+        def after_idle(widget, func, *args):
+            return original_idle(widget, monitor.wrap(func), *args)
+
+        tkinter.Misc.after = after
+        tkinter.Misc.after_idle = after_idle
+
+    def uninstall(self):
+        if self.originals:
+            tkinter.Misc.after, tkinter.Misc.after_idle = self.originals
+            self.originals = None
+
+    def wrap(self, func):
+        name = getattr(func, "__qualname__", repr(func))
+
+        def timed(*args):
+            start = time.perf_counter_ns()
+            try:
+                return func(*args)
+            finally:
+                self.record(name, time.perf_counter_ns() - start)
+        return timed
+
+    def record(self, name, duration_ns):
+        entry = self.stats.get(name)
+        if entry is None:
+            self.stats[name] = [1, duration_ns, duration_ns]
+        else:
+            entry[0] += 1
+            entry[1] += duration_ns
+            entry[2] = max(entry[2], duration_ns)
+
+
+class ProfileSession:
+    """Modo --profile: muestreo + monitor de callbacks durante una ventana fija"""
+
+    def __init__(self, directory, seconds, interval_ms=5):
+        self.directory = directory
+        self.seconds = seconds
+        self.profiler = SamplingProfiler(interval_ms)
+        self.monitor = AfterMonitor()
+        self.finished = False
+        self.app = None
+
+    def install(self):
+        self.monitor.install()
+
+    def start(self, app):
+        self.app = app
+        app.start_lag_probe()
+        self.profiler.start()
+        app.after(int(self.seconds * 1000), self.finish)
+
+    def finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.profiler.stop()
+        self.monitor.uninstall()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            base = os.path.join(self.directory, time.strftime("profile-%Y%m%d-%H%M%S"))
+            self.profiler.write_collapsed(base + ".collapsed")
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(self.report())
+            print(f"Perfil guardado en {base}.collapsed y {base}.txt")
+        except OSError as e:
+            print(f"Error guardando el perfil: {e}")
+        self.release_lag_probe()
+
+    def release_lag_probe(self):
+        """La medición del loop la pidió el perfil: se detiene salvo que la use el endpoint de métricas"""
+        app = self.app
+        if app is None or app.metrics_server is not None:
+            return
+        app.stop_lag_probe()
+        app.lag_probe_paused = False  # Si terminó en reposo, no se reanuda al despertar
+
+    def report(self):
+        profiler = self.profiler
+        overhead = profiler.sampling_ns / 1e9 / profiler.elapsed * 100 if profiler.elapsed else 0.0
+        lines = [
+            f"Ventana: {profiler.elapsed:.1f} s, {profiler.samples} muestras, costo del muestreo {overhead:.2f}%",
+            "",
+            "Tiempo propio (muestras por hilo: función):",
+        ]
+        lines += [f"  {count:6d}  {frame}" for frame, count in profiler.top_frames()]
+        lines += ["", "Callbacks de Tk (veces, total ms, máximo ms):"]
+        by_total = sorted(self.monitor.stats.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (count, total_ns, max_ns) in by_total[:20]:
+            lines.append(f"  {count:6d} {total_ns / 1e6:9.1f} {max_ns / 1e6:8.2f}  {name}")
+        lag = self.app.loop_lag if self.app is not None else None
+        if lag is not None and lag.count:
+            lines += ["", f"Retraso medio del loop de Tk: {lag.total / lag.count / 1e6:.2f} ms ({lag.count} mediciones)"]
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,91 @@
+import json
+import marshal
+import os
+import sys
+import time
+
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller """
+    try:
+        base_path = sys._MEIPASS
+    except Exception:
+        base_path = os.path.abspath(".")
+
+    return os.path.join(base_path, relative_path)
+
+
+class ResourceBundle:
+    """Estilos e idiomas ya parseados en un único archivo de caché (marshal, sin ejecutar código).
+
+    La caché se descarta sola si cambia la fecha o el tamaño de algún JSON de origen.
+    """
+
+    VERSION = 1
+    SOURCES = {
+        "styles": "config/styles.json",
+        "languages": "config/languages.json",
+    }
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self.data = {}
+        self.from_cache = False
+        self.load_ms = 0.0
+
+    def load(self):
+        start = time.perf_counter()
+        stamps = self._stamps()
+        cached = self._read_cache()
+        if cached is not None and cached.get("version") == self.VERSION and cached.get("stamps") == stamps:
+            self.data = cached["data"]
+            self.from_cache = True
+        else:
+            self.data = {name: self._parse(relative) for name, relative in self.SOURCES.items()}
+            self.from_cache = False
+            self._write_cache(stamps)
+        self.load_ms = (time.perf_counter() - start) * 1000
+        return self.data
+
+    def get(self, name):
+        """Contenido parseado de un recurso, o None si no se pudo leer"""
+        return self.data.get(name)
+
+    def _stamps(self):
+        stamps = {}
+        for name, relative in self.SOURCES.items():
+            try:
+                stat = os.stat(resource_path(relative))
+                stamps[name] = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamps[name] = None
+        return stamps
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_file, "rb") as f:
+                cached = marshal.load(f)
+            return cached if isinstance(cached, dict) else None
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _write_cache(self, stamps):
+        # Escritura atómica: nunca queda una caché a medio escribir
+        temp_path = self.cache_file + ".tmp"
+        try:
+            with open(temp_path, "wb") as f:
+                marshal.dump({"version": self.VERSION, "stamps": stamps, "data": self.data}, f)
+            os.replace(temp_path, self.cache_file)
+        except (OSError, ValueError) as e:
+            print(f"Error escribiendo la caché de recursos: {e}")
+
+    @staticmethod
+    def _parse(relative):
+        try:
+            with open(resource_path(relative), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Error cargando {relative}: {e}")
+            return None
@@ -0,0 +1,165 @@
+import mmap
+import os
+import struct
+import threading
+
+# Cabecera: magic, versión, secuencia, preset, canción del setlist, nombre del preset
+HEADER = struct.Struct("<4sHIhh32s")
+HEADER_SIZE = 64
+SLOTS = 128
+SWITCHES_OFFSET = HEADER_SIZE
+CC_OFFSET = SWITCHES_OFFSET + SLOTS
+FILE_SIZE = CC_OFFSET + SLOTS
+MAGIC = b"MVSS"
+VERSION = 1
+UNKNOWN = 0xFF
+SEQ_OFFSET = 6
+PRESET_OFFSET = 10
+SONG_OFFSET = 12
+NAME_OFFSET = 14
+
+
+def truncate_utf8(text, size):
+    """Codifica text en UTF-8 en como mucho size bytes sin cortar un carácter a la mitad"""
+    return text.encode("utf-8")[:size].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+class SessionSnapshot:
+    def __init__(self, sequence, preset_index, song_index, preset_name, switch_states, cc_values):
+        self.sequence = sequence
+        self.preset_index = preset_index
+        self.song_index = song_index
+        self.preset_name = preset_name
+        self.switch_states = switch_states
+        self.cc_values = cc_values
+
+    def matches(self, name):
+        """True si el preset guardado se llama name (el archivo guarda el nombre truncado)"""
+        return self.preset_name == truncate_utf8(name, 32).decode("utf-8")
+
+    @property
+    def torn(self):
+        """True si el proceso murió en medio de una escritura"""
+        return self.sequence % 2 == 1
+
+
+class SessionStateFile:
+    """Estado de la sesión en un archivo de tamaño fijo mapeado en memoria.
+
+    Cada escritura se hace en su lugar (sin serializar JSON) entre dos incrementos
+    del contador de secuencia: impar mientras se escribe, par cuando está completo.
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.map = None
+        self.previous = None
+        self.skipped = set()  # Posiciones fuera de SLOTS ya avisadas
+
+    def open(self):
+        """Abre (o crea) el archivo y devuelve el snapshot que dejó la sesión anterior"""
+        try:
+            exists = os.path.exists(self.file_path) and os.path.getsize(self.file_path) == FILE_SIZE
+            mode = "r+b" if exists else "w+b"
+            self._file = open(self.file_path, mode)
+            if not exists:
+                self._file.write(b"\0" * FILE_SIZE)
+                self._file.flush()
+            self.map = mmap.mmap(self._file.fileno(), FILE_SIZE)
+        except Exception as e:
+            print(f"Error abriendo estado de sesión: {e}")
+            self.map = None
+            return None
+
+        self.previous = self.read()
+        if self.previous is None or self.previous.torn:
+            # Una secuencia impar invertiría la paridad de todas las escrituras siguientes
+            self._initialize()
+        return self.previous
+
+    def _initialize(self):
+        HEADER.pack_into(self.map, 0, MAGIC, VERSION, 0, -1, -1, b"")
+        self.map[SWITCHES_OFFSET:CC_OFFSET] = bytes(SLOTS)
+        self.map[CC_OFFSET:FILE_SIZE] = bytes([UNKNOWN]) * SLOTS
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self._file.close()
+            self.map = None
+
+    def read(self):
+        """Lee el estado actual (None si el archivo no es válido)"""
+        if self.map is None:
+            return None
+        magic, version, sequence, preset_index, song_index, name = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        switches = self.map[SWITCHES_OFFSET:CC_OFFSET]
+        ccs = self.map[CC_OFFSET:FILE_SIZE]
+        return SessionSnapshot(
+            sequence, preset_index, song_index,
+            name.rstrip(b"\0").decode("utf-8", errors="replace"),
+            {slot: bool(value) for slot, value in enumerate(switches) if value},
+            {cc: value for cc, value in enumerate(ccs) if value != UNKNOWN}
+        )
+
+    def _begin(self):
+        sequence = struct.unpack_from("<I", self.map, SEQ_OFFSET)[0]
+        struct.pack_into("<I", self.map, SEQ_OFFSET, (sequence + 1) & 0xFFFFFFFF)
+        return sequence
+
+    def _end(self, sequence):
+        struct.pack_into("<I", self.map, SEQ_OFFSET, (sequence + 2) & 0xFFFFFFFF)
+
+    def set_switch(self, slot, state):
+        if self.map is None or not 0 <= slot < SLOTS:
+            return
+        with self.lock:
+            sequence = self._begin()
+            self.map[SWITCHES_OFFSET + slot] = 1 if state else 0
+            self._end(sequence)
+
+    def set_switches(self, states_by_slot):
+        """Reescribe todos los estados de una vez (al activar un preset)"""
+        if self.map is None:
+            return
+        block = bytearray(SLOTS)
+        for slot, state in states_by_slot.items():
+            if not 0 <= slot < SLOTS:
+                if slot not in self.skipped:
+                    self.skipped.add(slot)
+                    print(f"Estado de sesión: el switch {slot} no entra en las {SLOTS} posiciones y no se guarda")
+                continue
+            if state:
+                block[slot] = 1
+        with self.lock:
+            sequence = self._begin()
+            self.map[SWITCHES_OFFSET:CC_OFFSET] = bytes(block)
+            self._end(sequence)
+
+    def set_cc(self, control, value):
+        if self.map is None or not 0 <= control < SLOTS:
+            return
+        with self.lock:
+            sequence = self._begin()
+            self.map[CC_OFFSET + control] = value & 0x7F
+            self._end(sequence)
+
+    def set_preset(self, index, name):
+        if self.map is None:
+            return
+        with self.lock:
+            sequence = self._begin()
+            struct.pack_into("<h", self.map, PRESET_OFFSET, index)
+            struct.pack_into("32s", self.map, NAME_OFFSET, truncate_utf8(name, 32))
+            self._end(sequence)
+
+    def set_song(self, index):
+        if self.map is None:
+            return
+        with self.lock:
+            sequence = self._begin()
+            struct.pack_into("<h", self.map, SONG_OFFSET, index)
+            self._end(sequence)
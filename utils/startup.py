@@ -0,0 +1,20 @@
+import time
+
+
+class StartupTimeline:
+    """Hitos del arranque en ms desde el inicio del proceso (solo cuenta la primera marca de cada uno)"""
+
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks = {}
+
+    def mark(self, name):
+        """Registra el hito si es la primera vez. Devuelve True si era nuevo"""
+        if name in self.marks:
+            return False
+        self.marks[name] = (time.perf_counter() - self.origin) * 1000
+        return True
+
+    def report(self):
+        """Línea 'STARTUP hito=ms ...' que lee el benchmark de arranque"""
+        return "STARTUP " + " ".join(f"{name}={ms:.1f}" for name, ms in self.marks.items())